@@ -0,0 +1,6 @@
+"""Benchmarks for the Ha Health Record integration.
+
+Run one with ``python -m pytest benchmarks/<file> -s``; results are
+printed, and only gross regressions fail.  They are not part of the test
+suite.
+"""
@@ -0,0 +1,145 @@
+"""Event loop stall while members save their records.
+
+Each member gets 10,000 records in the current month; then all members
+save them concurrently while a ticker measures the longest gap between
+event loop iterations.  The current path compacts the partition; the
+baseline is the save path before partitioning: ``_data_to_save`` returns
+every record as a list of dicts, and one ``Store`` with default options
+writes it.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Awaitable
+from typing import Any
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.ha_health_record.const import DOMAIN
+from tests.conftest import async_wait_loaded
+
+from .conftest import make_rows
+
+COUNT = 10_000
+
+
+async def _async_setup_members(
+    hass: HomeAssistant, members: int
+) -> list[MockConfigEntry]:
+    """Set up members, each with ``COUNT`` records this month."""
+    entries: list[MockConfigEntry] = []
+    start = dt_util.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    for number in range(members):
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            version=2,
+            data={"member_id": f"member_{number}", "member_name": f"Member {number}"},
+            options={
+                "record_sets": [
+                    {
+                        "record_type": "feeding",
+                        "record_name": "Feeding",
+                        "record_unit": "ml",
+                    }
+                ]
+            },
+        )
+        entry.add_to_hass(hass)
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await async_wait_loaded(hass, entry)
+        rows = make_rows(COUNT, start)
+        await entry.runtime_data.async_import_records(
+            [(row["ts"], row) for row in rows], False
+        )
+        entries.append(entry)
+    await hass.async_block_till_done(wait_background_tasks=True)
+    return entries
+
+
+async def _async_measure(work: Awaitable[Any]) -> tuple[float, float]:
+    """Return the wall time and the longest loop stall of ``work``, in seconds."""
+    stalls: list[float] = []
+    done = False
+
+    async def _tick() -> None:
+        while not done:
+            started = time.perf_counter()
+            await asyncio.sleep(0)
+            stalls.append(time.perf_counter() - started)
+
+    ticker = asyncio.get_running_loop().create_task(_tick())
+    started = time.perf_counter()
+    await work
+    duration = time.perf_counter() - started
+    done = True
+    await ticker
+    return duration, max(stalls)
+
+
+async def _async_save_baseline(hass: HomeAssistant, members: int) -> None:
+    """Save every member's records the way the baseline did."""
+    start = dt_util.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    histories = [make_rows(COUNT, start) for _ in range(members)]
+    for rows in histories:
+        for row in rows:
+            # Baseline records had no epoch timestamps
+            del row["ts"], row["tz"]
+
+    async def _async_save(number: int, rows: list[dict[str, Any]]) -> None:
+        store: Store[dict[str, Any]] = Store(
+            hass, 1, f"{DOMAIN}_baseline_{number}", atomic_writes=True
+        )
+
+        def _data_to_save() -> dict[str, Any]:
+            return {
+                "record_sets": {
+                    "feeding": {
+                        "current_value": None,
+                        "current_note": "",
+                        "last_record": {},
+                    }
+                },
+                "records": rows,
+            }
+
+        await store.async_save(_data_to_save())
+
+    await asyncio.gather(
+        *(_async_save(number, rows) for number, rows in enumerate(histories))
+    )
+
+
+@pytest.mark.parametrize("members", [1, 3])
+async def test_compaction_stall(hass: HomeAssistant, members: int) -> None:
+    """Measure the longest loop stall of concurrent saves, baseline and current."""
+    baseline_duration, baseline_stall = await _async_measure(
+        _async_save_baseline(hass, members)
+    )
+
+    entries = await _async_setup_members(hass, members)
+    for entry in entries:
+        storage = entry.runtime_data._storage
+        storage.async_mark_dirty(entry.runtime_data.records.timestamp_at(0))
+    duration, stall = await _async_measure(
+        asyncio.gather(
+            *(entry.runtime_data._storage.async_compact() for entry in entries)
+        )
+    )
+
+    loop_times = [
+        entry.runtime_data._storage.last_compaction["loop_time"] * 1000
+        for entry in entries
+    ]
+    print(
+        f"\n{members} member(s), {COUNT} records each:"
+        f"\n  baseline:   wall {baseline_duration * 1000:.0f} ms, "
+        f"max stall {baseline_stall * 1000:.1f} ms"
+        f"\n  compaction: wall {duration * 1000:.0f} ms, "
+        f"max stall {stall * 1000:.1f} ms, "
+        f"loop time per compaction {', '.join(f'{t:.1f}' for t in loop_times)} ms"
+    )
@@ -0,0 +1,53 @@
+"""Memory taken by the record history: list of dicts versus columns.
+
+Both hold the same 10,000 records decoded from their stored JSON.  The
+list of dicts is what the history was kept as before ``RecordStore``.
+Strings the columns share with the decoded rows (type names, notes) are
+not counted against them.
+"""
+from __future__ import annotations
+
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+from homeassistant.helpers.json import json_bytes
+from homeassistant.util.json import json_loads
+
+from custom_components.ha_health_record.record_store import RecordStore
+
+from .conftest import make_rows
+
+COUNT = 10_000
+
+
+def _traced(build: Callable[[], Any]) -> tuple[Any, int]:
+    """Return the result of ``build`` and the bytes it still holds."""
+    tracemalloc.start()
+    try:
+        result = build()
+        return result, tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+
+def test_record_memory() -> None:
+    """Compare the bytes per record of both representations."""
+    encoded = json_bytes(make_rows(COUNT))
+
+    rows, dict_bytes = _traced(lambda: json_loads(encoded))
+    store, column_bytes = _traced(lambda: _load(rows))
+
+    assert len(store) == COUNT
+    print(
+        f"\n{COUNT} records: list of dicts {dict_bytes / COUNT:.0f} B/row, "
+        f"columns {column_bytes / COUNT:.0f} B/row"
+    )
+    assert column_bytes < dict_bytes / 3
+
+
+def _load(rows: list[dict[str, Any]]) -> RecordStore:
+    """Return a store holding the rows."""
+    store = RecordStore()
+    store.load(rows)
+    return store
@@ -0,0 +1,69 @@
+"""Reading stored records with and without persisted epoch timestamps.
+
+Rows carrying ``ts``/``tz`` are read as they are; rows without them, as
+written before they were persisted, have their ISO timestamp parsed.
+Each figure is the best of five runs over 10,000 records.
+"""
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from typing import Any
+
+from custom_components.ha_health_record.record_store import RecordStore, record_time
+
+from .conftest import make_rows
+
+COUNT = 10_000
+RUNS = 5
+
+
+def _best(run: Callable[[Any], Any], setup: Callable[[], Any] = lambda: None) -> float:
+    """Return the fastest of ``RUNS`` runs, in milliseconds.
+
+    Each run is passed a fresh result of ``setup``, which is not timed.
+    """
+    timings: list[float] = []
+    for _ in range(RUNS):
+        prepared = setup()
+        started = time.perf_counter()
+        run(prepared)
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def _store(rows: list[dict[str, Any]]) -> RecordStore:
+    """Return a store holding the rows."""
+    store = RecordStore()
+    store.load(rows)
+    return store
+
+
+def test_record_times() -> None:
+    """Compare loading, merging into 10,000 other records and timestamp extraction."""
+    stored = make_rows(COUNT)
+    parsed = [
+        {key: value for key, value in row.items() if key not in ("ts", "tz")}
+        for row in stored
+    ]
+    existing = make_rows(COUNT)
+
+    results: dict[str, tuple[float, float]] = {
+        "RecordStore.load": (
+            _best(lambda _: RecordStore().load(parsed)),
+            _best(lambda _: RecordStore().load(stored)),
+        ),
+        "RecordStore.merge": (
+            _best(lambda store: store.merge(parsed), lambda: _store(existing)),
+            _best(lambda store: store.merge(stored), lambda: _store(existing)),
+        ),
+        "record_time": (
+            _best(lambda _: [record_time(row) for row in parsed]),
+            _best(lambda _: [record_time(row) for row in stored]),
+        ),
+    }
+
+    print(f"\n{COUNT} records, best of {RUNS}: parsed -> stored")
+    for name, (before, after) in results.items():
+        print(f"  {name:<18} {before:6.1f} ms -> {after:6.1f} ms")
+    assert results["record_time"][1] < results["record_time"][0]
@@ -0,0 +1,35 @@
+"""Fixtures for Ha Health Record benchmarks."""
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timedelta
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.ha_health_record.record_store import datetime_to_micros
+from tests.conftest import auto_enable_custom_integrations  # noqa: F401
+
+pytest_plugins = "pytest_homeassistant_custom_component"
+
+
+def make_rows(count: int, start: datetime | None = None) -> list[dict[str, Any]]:
+    """Return stored record rows, 20 seconds apart, every fifth with a note."""
+    start = start or datetime(2024, 1, 1, tzinfo=dt_util.UTC)
+    rows: list[dict[str, Any]] = []
+    for number in range(count):
+        timestamp = start + timedelta(seconds=20 * number)
+        rows.append(
+            {
+                "id": uuid.uuid4().hex,
+                "record_type": "feeding",
+                "record_name": "Feeding",
+                "value": float(number),
+                "unit": "ml",
+                "note": "bottle" if number % 5 == 0 else "",
+                "timestamp": timestamp.isoformat(),
+                "ts": datetime_to_micros(timestamp),
+                "tz": 0,
+            }
+        )
+    return rows
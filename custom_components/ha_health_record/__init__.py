@@ -2,11 +2,14 @@
 from __future__ import annotations
 
 import logging
+from datetime import datetime
 
-from homeassistant.config_entries import ConfigEntry, ConfigEntryState
+from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.storage import Store
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.typing import ConfigType
 
 from .const import (
     CONF_MEMBER_ID,
@@ -15,11 +18,18 @@ from .const import (
     CONF_RECORD_TYPE,
     CONF_RECORD_UNIT,
     DOMAIN,
-    STORAGE_KEY,
-    STORAGE_VERSION,
 )
-from .coordinator import HealthRecordCoordinator
+from .coordinator import (
+    DATA_MEMBERS,
+    DATA_MEMBERS_REVISION,
+    HealthRecordCoordinator,
+    async_get_members,
+    next_revision,
+)
 from .panel import async_setup_panel, async_unload_panel, register_websocket_commands
+from .services import async_setup_services
+from .statistics import async_clear_statistics
+from .storage import async_prefetch, async_remove_storage
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -35,6 +45,31 @@ PLATFORMS_LIST: list[Platform] = [
 # Keys for tracking one-time setup state in hass.data
 _KEY_WS_REGISTERED = f"{DOMAIN}_ws_registered"
 _KEY_PANEL_REGISTERED = f"{DOMAIN}_panel_registered"
+# Failed loads in a row per entry_id, for the retry backoff
+_KEY_LOAD_FAILURES = f"{DOMAIN}_load_failures"
+
+LOAD_RETRY_DELAY = 30  # seconds before the first reload after a failed load
+LOAD_RETRY_MAX_DELAY = 3600  # cap of the doubling delay
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the Ha Health Record service actions.
+
+    Also starts reading every member's stored data concurrently, so
+    decoding overlaps instead of running entry by entry.
+    """
+    async_setup_services(hass)
+    async_prefetch(
+        hass,
+        [
+            entry.data[CONF_MEMBER_ID]
+            for entry in hass.config_entries.async_entries(DOMAIN)
+            if not entry.disabled_by and CONF_MEMBER_ID in entry.data
+        ],
+    )
+    return True
 
 
 async def async_migrate_entry(
@@ -81,16 +116,54 @@ async def async_migrate_entry(
 async def async_setup_entry(
     hass: HomeAssistant, entry: HaHealthRecordConfigEntry
 ) -> bool:
-    """Set up Ha Health Record from a config entry."""
-    coordinator = HealthRecordCoordinator(hass, entry)
-    try:
-        await coordinator.async_load()
-    except Exception:
-        _LOGGER.exception("Failed to load health record data for %s", entry.title)
-        return False
+    """Set up Ha Health Record from a config entry.
 
+    Stored data is loaded in the background so startup is not held up;
+    entities are unavailable, and the member not offered by the WebSocket
+    API and services, until it is loaded.  If loading fails, the entry is
+    reloaded after a delay that doubles with each failure in a row.
+    """
+    coordinator = HealthRecordCoordinator(hass, entry)
     entry.runtime_data = coordinator
 
+    async def _async_load() -> None:
+        failures = hass.data.setdefault(_KEY_LOAD_FAILURES, {})
+        try:
+            await coordinator.async_load()
+        except Exception:
+            failures[entry.entry_id] = failures.get(entry.entry_id, 0) + 1
+            delay = min(
+                LOAD_RETRY_DELAY * 2 ** (failures[entry.entry_id] - 1),
+                LOAD_RETRY_MAX_DELAY,
+            )
+            _LOGGER.exception(
+                "Failed to load health record data for %s, retrying in %d seconds",
+                entry.title,
+                delay,
+            )
+            entry.async_on_unload(async_call_later(hass, delay, _async_retry))
+            return
+        failures.pop(entry.entry_id, None)
+
+    @callback
+    def _async_retry(_now: datetime) -> None:
+        hass.config_entries.async_schedule_reload(entry.entry_id)
+
+    entry.async_create_background_task(
+        hass, _async_load(), f"{DOMAIN} load {coordinator.member_id}"
+    )
+
+    # Member lookup for the WebSocket API and services; also undone on failed setup
+    members = hass.data.setdefault(DATA_MEMBERS, {})
+    members[coordinator.member_id] = coordinator
+
+    @callback
+    def _async_remove_member() -> None:
+        members.pop(coordinator.member_id, None)
+        hass.data[DATA_MEMBERS_REVISION] = next_revision()
+
+    entry.async_on_unload(_async_remove_member)
+
     # Register WS commands once (they persist across entry reloads)
     if not hass.data.get(_KEY_WS_REGISTERED):
         register_websocket_commands(hass)
@@ -108,18 +181,9 @@ async def async_setup_entry(
             hass.data[_KEY_PANEL_REGISTERED] = False
             raise
 
-    entry.async_on_unload(entry.add_update_listener(async_update_options))
-
     return True
 
 
-async def async_update_options(
-    hass: HomeAssistant, entry: HaHealthRecordConfigEntry
-) -> None:
-    """Handle options update."""
-    await hass.config_entries.async_reload(entry.entry_id)
-
-
 async def async_unload_entry(
     hass: HomeAssistant, entry: HaHealthRecordConfigEntry
 ) -> bool:
@@ -127,12 +191,13 @@ async def async_unload_entry(
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS_LIST)
 
     if unload_ok:
+        await entry.runtime_data.async_shutdown()
+
         # Check if any other loaded entries remain
         remaining = [
-            e
-            for e in hass.config_entries.async_entries(DOMAIN)
-            if e.entry_id != entry.entry_id
-            and e.state is ConfigEntryState.LOADED
+            member_id
+            for member_id in async_get_members(hass)
+            if member_id != entry.runtime_data.member_id
         ]
 
         # Unload panel if no more entries
@@ -144,10 +209,16 @@ async def async_unload_entry(
 
 
 async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Remove a config entry and clean up its storage file."""
+    """Remove a config entry and clean up its storage files and statistics."""
+    hass.data.get(_KEY_LOAD_FAILURES, {}).pop(entry.entry_id, None)
     member_id = entry.data.get(CONF_MEMBER_ID)
     if member_id:
-        store: Store[dict] = Store(
-            hass, STORAGE_VERSION, f"{STORAGE_KEY}_{member_id}"
+        await async_remove_storage(hass, member_id)
+        async_clear_statistics(
+            hass,
+            member_id,
+            [
+                rs_data[CONF_RECORD_TYPE]
+                for rs_data in entry.options.get(CONF_RECORD_SETS, [])
+            ],
         )
-        await store.async_remove()
@@ -5,12 +5,13 @@ import logging
 
 from homeassistant.components.button import ButtonEntity
 from homeassistant.const import EntityCategory
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from . import HaHealthRecordConfigEntry
-from .const import EVENT_RECORD_LOGGED
-from .coordinator import HealthRecordCoordinator
+from .coordinator import signal_record_set_added
+from .entity import RecordSetEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -35,28 +36,25 @@ async def async_setup_entry(
 
     async_add_entities(entities)
 
+    @callback
+    def async_add_record_set(type_id: str) -> None:
+        """Add the button of a record set added at runtime."""
+        async_add_entities([RecordLogButton(coordinator=coordinator, type_id=type_id)])
 
-class RecordLogButton(ButtonEntity):
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, signal_record_set_added(coordinator.member_id), async_add_record_set
+        )
+    )
+
+
+class RecordLogButton(RecordSetEntity, ButtonEntity):
     """Button to log a record."""
 
     _attr_entity_category = EntityCategory.CONFIG
-    _attr_has_entity_name = True
     _attr_translation_key = "record_log"
-
-    def __init__(
-        self,
-        coordinator: HealthRecordCoordinator,
-        type_id: str,
-    ) -> None:
-        """Initialize the button."""
-        self._coordinator = coordinator
-        self._type_id = type_id
-        record_set = coordinator.get_record_set(type_id)
-
-        self._attr_unique_id = f"{coordinator.member_id}_{type_id}_log"
-        self._attr_translation_placeholders = {"record_name": record_set.name}
-        self._attr_device_info = coordinator.get_device_info()
-        self._attr_icon = "mdi:content-save"
+    _attr_icon = "mdi:content-save"
+    _unique_id_suffix = "log"
 
     async def async_press(self) -> None:
         """Handle the button press."""
@@ -69,19 +67,7 @@ class RecordLogButton(ButtonEntity):
         record_set = self._coordinator.get_record_set(self._type_id)
 
         # Fire event
-        self.hass.bus.async_fire(
-            EVENT_RECORD_LOGGED,
-            {
-                "member_id": self._coordinator.member_id,
-                "member_name": self._coordinator.member_name,
-                "record_type": self._type_id,
-                "record_name": record_set.name,
-                "value": record.value,
-                "unit": record_set.unit,
-                "note": record.note,
-                "timestamp": record.timestamp.isoformat() if record.timestamp else None,
-            },
-        )
+        self._coordinator.async_fire_record_logged(self._type_id, record)
 
         _LOGGER.info(
             "Record logged: %s - %s %s (note: %s)",
@@ -6,6 +6,7 @@ DOMAIN: Final = "ha_health_record"
 # Storage
 STORAGE_KEY: Final = DOMAIN
 STORAGE_VERSION: Final = 1
+STORAGE_MINOR_VERSION: Final = 2  # 2: records carry epoch "ts" and offset "tz"
 
 # Config keys
 CONF_MEMBER_NAME = "member_name"
@@ -1,17 +1,24 @@
 """Data coordinator for Ha Health Record integration."""
 from __future__ import annotations
 
+import asyncio
+import itertools
 import logging
+import time
 import uuid
+from array import array
+from collections.abc import AsyncIterator, Iterable, Iterator
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.dispatcher import async_dispatcher_send
-from homeassistant.helpers.storage import Store
+from homeassistant.helpers.json import json_bytes
 from homeassistant.util import dt as dt_util
 
 from .const import (
@@ -22,14 +29,57 @@ from .const import (
     CONF_RECORD_TYPE,
     CONF_RECORD_UNIT,
     DOMAIN,
-    STORAGE_KEY,
-    STORAGE_VERSION,
+    EVENT_RECORD_LOGGED,
+)
+from .migration import (
+    is_v1,
+    migrate_v1_states,
+    next_chunk,
+    v1_record_count,
+    v1_record_stream,
+    v1_records,
+)
+from .record_store import (
+    RecordStore,
+    datetime_to_micros,
+    micros_to_datetime,
+    offset_datetime,
+    parse_timestamp,
+    record_time,
+)
+from .rollups import PERIOD_MONTH, Rollups, compute_days, day_bounds, day_of
+from .series import lttb
+from .statistics import RecordStatistics, async_clear_statistics
+from .storage import (
+    MAX_LOADED_PARTITIONS,
+    OP_ADD,
+    OP_DELETE,
+    OP_STATE,
+    OP_UPDATE,
+    RecordStorage,
+    partition_bounds,
+    partition_key,
 )
 
 _LOGGER = logging.getLogger(__name__)
 
-SAVE_DELAY = 1  # seconds -- batches rapid operations into a single write
-MAX_RECORDS = 10_000  # oldest records are pruned beyond this limit
+type RecordPosition = tuple[int, str, str]
+
+# hass.data key of the loaded members' coordinators by member_id
+DATA_MEMBERS = f"{DOMAIN}_members"
+# hass.data key of the revision at which a member was last removed
+DATA_MEMBERS_REVISION = f"{DOMAIN}_members_revision"
+
+# Revisions are shared by all members and keep increasing across entry
+# reloads (and, being seeded from the clock, across restarts)
+_revisions = itertools.count(time.time_ns() // 1_000)
+
+# Dispatched with (action, result entries) whenever stored records change;
+# "update" entries also carry the record's "previous_timestamp"
+SIGNAL_RECORDS_CHANGED = f"{DOMAIN}_records_changed"
+CHANGE_ADD = "add"
+CHANGE_UPDATE = "update"
+CHANGE_DELETE = "delete"
 
 
 def signal_record_updated(member_id: str, type_id: str) -> str:
@@ -37,6 +87,47 @@ def signal_record_updated(member_id: str, type_id: str) -> str:
     return f"{DOMAIN}_{member_id}_{type_id}_updated"
 
 
+def signal_record_set_added(member_id: str) -> str:
+    """Return signal name for a record set added at runtime (with its type)."""
+    return f"{DOMAIN}_{member_id}_record_set_added"
+
+
+def signal_record_set_changed(member_id: str, type_id: str) -> str:
+    """Return signal name for a record set whose name or unit changed."""
+    return f"{DOMAIN}_{member_id}_{type_id}_record_set_changed"
+
+
+def signal_record_set_removed(member_id: str, type_id: str) -> str:
+    """Return signal name for a record set removed at runtime."""
+    return f"{DOMAIN}_{member_id}_{type_id}_record_set_removed"
+
+
+def signal_member_loaded(member_id: str) -> str:
+    """Return signal name for a member whose stored data finished loading."""
+    return f"{DOMAIN}_{member_id}_loaded"
+
+
+@callback
+def async_get_members(hass: HomeAssistant) -> dict[str, HealthRecordCoordinator]:
+    """Return the coordinators of all loaded members by member_id."""
+    return hass.data.get(DATA_MEMBERS, {})
+
+
+def next_revision() -> int:
+    """Return a revision higher than any returned before."""
+    return next(_revisions)
+
+
+@callback
+def async_members_revision(hass: HomeAssistant) -> int:
+    """Return the latest revision of any member or of the member list."""
+    return max(
+        hass.data.get(DATA_MEMBERS_REVISION, 0),
+        *(coordinator.revision for coordinator in async_get_members(hass).values()),
+        0,
+    )
+
+
 @dataclass
 class Record:
     """Represents a single health record entry."""
@@ -61,7 +152,9 @@ class Record:
         compatibility during migration.
         """
         timestamp = None
-        if data.get("timestamp"):
+        if isinstance(data.get("ts"), int):
+            timestamp = offset_datetime(data["ts"], data.get("tz", 0))
+        elif data.get("timestamp"):
             timestamp = dt_util.parse_datetime(data["timestamp"])
         value = data.get("value") if data.get("value") is not None else data.get("amount")
         return cls(
@@ -80,6 +173,7 @@ class RecordSet:
     unit: str
     default_value: float = 0
     default_value_mode: str = "fixed"  # "fixed" or "last_value"
+    coalesce_window: float = 0  # seconds sensor updates are folded over; 0 = off
     current_value: float | None = None
     current_note: str = ""
     last_record: Record = field(default_factory=Record)
@@ -115,25 +209,51 @@ class HealthRecordCoordinator:
         self.hass = hass
         self.entry = entry
 
-        # Records history storage (unified)
-        self.records: list[dict[str, Any]] = []
+        # Records history (unified, sorted by timestamp); holds the current
+        # partition plus whichever older partitions are loaded
+        self.records = RecordStore()
+
+        # Daily rollups per record type, covering loaded and unloaded history
+        self.rollups = Rollups()
 
         # Member info
         self.member_id: str = entry.data[CONF_MEMBER_ID]
         self.member_name: str = entry.data[CONF_MEMBER_NAME]
 
-        # Storage - unique per member
-        self._store: Store[dict[str, Any]] = Store(
-            hass,
-            STORAGE_VERSION,
-            f"{STORAGE_KEY}_{self.member_id}",
-            atomic_writes=True,
+        # Storage - snapshot, mutation journal and monthly partitions, unique per member
+        self._storage = RecordStorage(
+            hass, self.member_id, self.records, self.rollups, self._data_to_save
         )
 
+        # Hourly long-term statistics of the records in the recorder
+        self.statistics = RecordStatistics(hass, self, self._storage)
+
         # Record sets (unified)
-        self.record_sets: dict[str, RecordSet] = {}
+        self.record_sets: dict[str, RecordSet] = {
+            rs_data[CONF_RECORD_TYPE]: self._record_set_from_config(rs_data)
+            for rs_data in self._record_sets_config(entry)
+        }
+
+        # Set once stored data is loaded; seconds taken per load step
+        self.loaded = False
+        self.load_timings: dict[str, float] = {}
 
-        record_sets_config = entry.options.get(CONF_RECORD_SETS, [])
+        # Background migration of v1 records and its (done, total) progress
+        self._migration: asyncio.Task[None] | None = None
+        self.migration_progress: tuple[int, int] | None = None
+        # The v1 data and the journal entries on top of it, which reads are
+        # answered from until the migration is done
+        self._v1: tuple[dict[str, Any], list[dict[str, Any]]] | None = None
+
+        # Bumped on every change visible in get_members; the member's
+        # serialized get_members entry is cached until then
+        self.revision = next_revision()
+        self._member_json: bytes | None = None
+
+    @staticmethod
+    def _record_sets_config(entry: ConfigEntry) -> list[dict[str, Any]]:
+        """Return the record set configurations of a config entry."""
+        record_sets_config = list(entry.options.get(CONF_RECORD_SETS, []))
         if not record_sets_config:
             # Fall back to old v1 format in entry.options
             for act in entry.options.get("activity_sets", []):
@@ -148,124 +268,311 @@ class HealthRecordCoordinator:
                     CONF_RECORD_NAME: grw.get("growth_name", ""),
                     CONF_RECORD_UNIT: grw.get("growth_unit", ""),
                 })
+        return record_sets_config
 
-        for rs_data in record_sets_config:
-            type_id = rs_data[CONF_RECORD_TYPE]
-            self.record_sets[type_id] = RecordSet(
-                type_id=type_id,
-                name=rs_data[CONF_RECORD_NAME],
-                unit=rs_data[CONF_RECORD_UNIT],
-                default_value=rs_data.get("default_value", 0),
-                default_value_mode=rs_data.get("default_value_mode", "fixed"),
+    @staticmethod
+    def _record_set_from_config(rs_data: dict[str, Any]) -> RecordSet:
+        """Create a record set from its configuration."""
+        return RecordSet(
+            type_id=rs_data[CONF_RECORD_TYPE],
+            name=rs_data[CONF_RECORD_NAME],
+            unit=rs_data[CONF_RECORD_UNIT],
+            default_value=rs_data.get("default_value", 0),
+            default_value_mode=rs_data.get("default_value_mode", "fixed"),
+            coalesce_window=rs_data.get("coalesce_window", 0),
+        )
+
+    @callback
+    def async_apply_entry(self) -> None:
+        """Bring member info and record sets in line with the config entry.
+
+        Record sets are added, updated and removed in place and their
+        entities follow through dispatcher signals, so no reload (and no
+        storage re-read) is needed.  Records of a removed type are kept;
+        its statistics are removed from the recorder.
+        """
+        self._async_touch()
+        member_name = self.entry.data[CONF_MEMBER_NAME]
+        if member_name != self.member_name:
+            self.member_name = member_name
+            device_registry = dr.async_get(self.hass)
+            if device := device_registry.async_get_device(
+                identifiers={(DOMAIN, self.member_id)}
+            ):
+                device_registry.async_update_device(device.id, name=member_name)
+
+        configs = {
+            rs_data[CONF_RECORD_TYPE]: rs_data
+            for rs_data in self._record_sets_config(self.entry)
+        }
+        removed = [t for t in self.record_sets if t not in configs]
+        for type_id in removed:
+            del self.record_sets[type_id]
+            async_dispatcher_send(
+                self.hass, signal_record_set_removed(self.member_id, type_id)
             )
+        async_clear_statistics(self.hass, self.member_id, removed)
+        for type_id, rs_data in configs.items():
+            configured = self._record_set_from_config(rs_data)
+            if (record_set := self.record_sets.get(type_id)) is None:
+                self.record_sets[type_id] = configured
+                self._sync_last_record(type_id)
+                async_dispatcher_send(
+                    self.hass, signal_record_set_added(self.member_id), type_id
+                )
+                continue
+            changed = (
+                record_set.name != configured.name
+                or record_set.unit != configured.unit
+            )
+            record_set.name = configured.name
+            record_set.unit = configured.unit
+            record_set.default_value = configured.default_value
+            record_set.default_value_mode = configured.default_value_mode
+            record_set.coalesce_window = configured.coalesce_window
+            if changed:
+                async_dispatcher_send(
+                    self.hass, signal_record_set_changed(self.member_id, type_id)
+                )
 
     async def async_load(self) -> None:
+        """Load data from storage, then mark the member as loaded."""
+        started = time.perf_counter()
+        await self._async_load_data()
+        self.load_timings["total"] = time.perf_counter() - started
+        self.loaded = True
+        self._async_touch()
+        async_dispatcher_send(self.hass, signal_member_loaded(self.member_id))
+        if self._migration is None:
+            await self.statistics.async_start()
+
+    async def _async_load_data(self) -> None:
         """Load data from storage."""
-        data = await self._store.async_load()
-        if data is None:
+        started = time.perf_counter()
+        data, journal = await self._storage.async_load()
+        self.load_timings["read"] = self._storage.read_time or 0.0
+        self.load_timings["wait"] = time.perf_counter() - started
+        if data is None and not journal:
             _LOGGER.debug("No stored data for member %s", self.member_id)
             return
+        data = data or {}
 
-        # Detect v1 format and migrate
-        if "activity_sets" in data or "growth_sets" in data:
+        # Detect v1 format; its records are migrated in the background
+        if is_v1(data):
             _LOGGER.info(
                 "Detected v1 storage format for member %s, migrating to v2",
                 self.member_id,
             )
-            data = self._migrate_v1_to_v2(data)
-
-        # Load record set states
-        record_sets_data = data.get("record_sets", {})
-        for type_id, record_set in self.record_sets.items():
-            if type_id in record_sets_data:
-                record_set.load_from_dict(record_sets_data[type_id])
+            self._load_record_set_states(migrate_v1_states(data))
+            self._replay_journal([e for e in journal if e.get("op") == OP_STATE])
+            journal = [e for e in journal if e.get("op") != OP_STATE]
+            self._v1 = (data, list(journal))
+            self._storage.migrating = True
+            self._migration = self.hass.async_create_background_task(
+                self._async_migrate_v1(data, journal),
+                f"{DOMAIN} v1 migration of {self.member_id}",
+            )
+            self._migration.add_done_callback(self._async_migration_done)
+            return
 
-        # Load records history
-        self.records = data.get("records", [])
+        # Load record set states and the statistics changes not imported yet
+        self._load_record_set_states(data.get("record_sets", {}))
+        self.statistics.async_restore(data.get("statistics", {}))
+
+        # Load recent records, then replay mutations logged since the snapshot
+        started = time.perf_counter()
+        await self._storage.async_load_records(data, journal)
+        self.load_timings["records"] = time.perf_counter() - started
+        started = time.perf_counter()
+        self._replay_journal(journal)
+        for type_id in self.record_sets:
+            if self._storage.latest(type_id) is not None:
+                self._sync_last_record(type_id)
+        self.load_timings["replay"] = time.perf_counter() - started
 
         _LOGGER.debug(
-            "Loaded health record data for member %s: %d record sets, %d records",
+            "Loaded health record data for member %s: %d record sets, "
+            "%d of %d records (read %.1f ms, records %.1f ms, replay %.1f ms)",
             self.member_id,
             len(self.record_sets),
             len(self.records),
+            self._storage.total(),
+            self.load_timings["read"] * 1000,
+            self.load_timings["records"] * 1000,
+            self.load_timings["replay"] * 1000,
         )
 
-    @staticmethod
-    def _migrate_v1_to_v2(data: dict[str, Any]) -> dict[str, Any]:
-        """Migrate v1 storage format to v2.
+        if self._storage.needs_compaction:
+            await self._storage.async_compact()
+
+    async def _async_migrate_v1(
+        self, data: dict[str, Any], journal: list[dict[str, Any]]
+    ) -> None:
+        """Move v1 records into the history chunk by chunk, then save as v2.
+
+        Each chunk is converted in the executor.  The records stream in
+        time order, so once a chunk reaches a later month, the months
+        before it are complete: their files are written and they are
+        released from memory, leaving only the months being migrated
+        resident.  Meanwhile reads and
+        exports are answered from the v1 data, edits of existing records
+        wait, and the v1 snapshot is kept on disk, so an interrupted or
+        failed migration simply starts over on the next load.  The journal
+        is replayed once all records are in.
+        """
+        total = v1_record_count(data)
+        stream = v1_record_stream(data, self.member_id)
+        done = 0
+        self.migration_progress = (done, total)
+        # Months with migrated records that are not written yet
+        pending: set[str] = set()
+        while True:
+            rows, days = await self.hass.async_add_executor_job(next_chunk, stream)
+            if not rows:
+                break
+            self.records.insert_many(rows)
+            for key, key_days in days.items():
+                self.rollups.merge(key, key_days)
+                self._storage.async_mark_dirty(partition_bounds(key)[0])
+            pending.update(days)
+            # A record logged back-dated in v1 may land in a released
+            # month; that month is simply written again
+            latest = partition_key(max(row["ts"] for row in rows))
+            complete = {key for key in pending if key < latest}
+            await self._storage.async_release(complete)
+            pending -= complete
+            done += len(rows)
+            self.migration_progress = (done, total)
+            _LOGGER.debug(
+                "Migrated %d of %d v1 record(s) of member %s",
+                done,
+                total,
+                self.member_id,
+            )
+
+        await self._storage.async_load_journal_partitions(journal)
+        self._replay_journal(journal)
+        for type_id in self.record_sets:
+            if self._storage.latest(type_id) is not None:
+                self._sync_last_record(type_id)
+        self._storage.migrating = False
+        self.migration_progress = None
+        await self._storage.async_compact()
+        # Reads switch over to the migrated history
+        self._v1 = None
+        self.async_notify_updated(self.record_sets)
+        await self.statistics.async_start()
+        _LOGGER.info(
+            "Migrated %d v1 record(s) of member %s to v2", done, self.member_id
+        )
 
-        v1 had separate activity_sets/growth_sets and activity_records/growth_records.
-        v2 unifies them into record_sets and records.
+    @callback
+    def _async_migration_done(self, task: asyncio.Task[None]) -> None:
+        """Log a failed migration; reads keep using the v1 data."""
+        if not task.cancelled() and (err := task.exception()) is not None:
+            _LOGGER.error(
+                "Failed to migrate the v1 records of member %s; it is retried "
+                "on the next load",
+                self.member_id,
+                exc_info=err,
+            )
+
+    async def async_wait_migrated(self) -> None:
+        """Wait for a running v1 migration to finish.
+
+        Raises ``HomeAssistantError`` if it failed or was stopped.
         """
-        migrated_record_sets: dict[str, Any] = {}
-        migrated_records: list[dict[str, Any]] = []
-
-        # Migrate activity_sets state
-        for type_id, aset_data in data.get("activity_sets", {}).items():
-            migrated_record_sets[type_id] = {
-                "current_value": aset_data.get("current_amount"),
-                "current_note": aset_data.get("current_note", ""),
-                "last_record": {},
-            }
-            if aset_data.get("last_record"):
-                lr = aset_data["last_record"]
-                migrated_record_sets[type_id]["last_record"] = {
-                    "value": lr.get("amount"),
-                    "note": lr.get("note", ""),
-                    "timestamp": lr.get("timestamp"),
-                }
+        if self._migration is None:
+            return
+        if not self._migration.done():
+            await asyncio.wait([self._migration])
+        if self._migration.cancelled() or self._migration.exception() is not None:
+            raise HomeAssistantError(
+                f"Migration of the v1 records of member {self.member_id} failed"
+            )
 
-        # Migrate growth_sets state
-        for type_id, gset_data in data.get("growth_sets", {}).items():
-            migrated_record_sets[type_id] = {
-                "current_value": gset_data.get("current_value"),
-                "current_note": gset_data.get("current_note", ""),
-                "last_record": {},
-            }
-            if gset_data.get("last_record"):
-                lr = gset_data["last_record"]
-                migrated_record_sets[type_id]["last_record"] = {
-                    "value": lr.get("value"),
-                    "note": lr.get("note", ""),
-                    "timestamp": lr.get("timestamp"),
-                }
+    async def _async_v1_records(self, start: int, end: int) -> RecordStore | None:
+        """Return the v1 records in [start, end) while they are being migrated.
 
-        # Migrate activity_records
-        for rec in data.get("activity_records", []):
-            migrated_records.append({
-                "id": rec.get("id", uuid.uuid4().hex),
-                "record_type": rec.get("activity_type", ""),
-                "record_name": rec.get("activity_name", ""),
-                "value": rec.get("amount"),
-                "unit": rec.get("unit", ""),
-                "note": rec.get("note", ""),
-                "timestamp": rec.get("timestamp", ""),
-            })
-
-        # Migrate growth_records
-        for rec in data.get("growth_records", []):
-            migrated_records.append({
-                "id": rec.get("id", uuid.uuid4().hex),
-                "record_type": rec.get("growth_type", ""),
-                "record_name": rec.get("growth_name", ""),
-                "value": rec.get("value"),
-                "unit": rec.get("unit", ""),
-                "note": rec.get("note", ""),
-                "timestamp": rec.get("timestamp", ""),
-            })
-
-        # Sort merged records by timestamp
-        migrated_records.sort(key=lambda r: r.get("timestamp", ""))
+        Returns None once reads are answered from the migrated history.
+        """
+        if self._v1 is None:
+            return None
+        data, journal = self._v1
+        return await self.hass.async_add_executor_job(
+            v1_records, data, self.member_id, list(journal), start, end
+        )
 
-        return {
-            "record_sets": migrated_record_sets,
-            "records": migrated_records,
-        }
+    async def async_shutdown(self) -> None:
+        """Stop a running migration and write out pending journal entries."""
+        if self._migration is not None and not self._migration.done():
+            self._migration.cancel()
+        self.statistics.async_shutdown()
+        await self._storage.async_shutdown()
+
+    def _load_record_set_states(self, record_sets_data: dict[str, Any]) -> None:
+        """Load stored record set states for configured types."""
+        for type_id, record_set in self.record_sets.items():
+            if type_id in record_sets_data:
+                record_set.load_from_dict(record_sets_data[type_id])
+
+    def _replay_journal(self, journal: list[dict[str, Any]]) -> None:
+        """Apply journal entries on top of the loaded snapshot.
+
+        The rollups of the partitions the entries touch are recomputed, as
+        those in the snapshot predate the entries, and the changes are noted
+        for the statistics, which may not have imported them.
+        """
+        touched: set[str] = set()
+        for entry in journal:
+            try:
+                op = entry["op"]
+                if op in (OP_ADD, OP_UPDATE):
+                    record = entry["record"]
+                    index = self.records.find("", "", record["id"])
+                    if index is not None:
+                        old_micros = self.records.timestamp_at(index)
+                        touched.add(partition_key(old_micros))
+                        self.statistics.async_mark(
+                            self.records.type_at(index), old_micros
+                        )
+                    self._mark_dirty(index)
+                    self.records.add(record)
+                    micros = record_time(record)[0]
+                    self._storage.async_mark_dirty(micros)
+                    touched.add(partition_key(micros))
+                    self.statistics.async_mark(record["record_type"], micros)
+                elif op == OP_DELETE:
+                    index = self.records.find("", "", entry["id"])
+                    if index is not None:
+                        micros = self.records.timestamp_at(index)
+                        touched.add(partition_key(micros))
+                        self.statistics.async_mark(self.records.type_at(index), micros)
+                        self._mark_dirty(index)
+                        self.records.pop(index)
+                elif op == OP_STATE:
+                    self._load_record_set_states(entry["record_sets"])
+            except (KeyError, TypeError, ValueError):
+                _LOGGER.warning(
+                    "Skipping invalid journal entry for member %s: %s",
+                    self.member_id,
+                    entry,
+                )
+
+        for key in touched:
+            # Others are recomputed when compaction writes them
+            if self._storage.is_resident(key):
+                self.rollups.rebuild(
+                    key, self.records.samples_between(*partition_bounds(key))
+                )
 
     @callback
-    def _async_schedule_save(self) -> None:
-        """Schedule a delayed save to storage."""
-        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+    def _async_journal(self, op: str, **data: Any) -> None:
+        """Append a mutation to the storage journal."""
+        entry = {"op": op, **data}
+        self._storage.async_append(entry)
+        if self._v1 is not None:
+            self._v1[1].append(entry)
 
     @callback
     def _data_to_save(self) -> dict[str, Any]:
@@ -275,20 +582,95 @@ class HealthRecordCoordinator:
                 type_id: record_set.to_dict()
                 for type_id, record_set in self.record_sets.items()
             },
-            "records": self.records,
+            "statistics": self.statistics.pending(),
         }
 
-    def _prune_records(self) -> None:
-        """Remove oldest records if the list exceeds MAX_RECORDS."""
-        overflow = len(self.records) - MAX_RECORDS
-        if overflow > 0:
-            del self.records[:overflow]
-            _LOGGER.warning(
-                "Pruned %d oldest record(s) for member %s (limit %d)",
-                overflow,
-                self.member_id,
-                MAX_RECORDS,
-            )
+    @callback
+    def _refresh_rollup(self, type_id: str, micros: int) -> bool:
+        """Recompute the rollup bucket holding ``micros`` after an edit.
+
+        Only possible while the partition is resident; otherwise returns
+        False and leaves it to compaction, which recomputes every bucket
+        of the (dirty) partition.
+        """
+        key = partition_key(micros)
+        if not self._storage.is_resident(key):
+            return False
+        day = day_of(micros)
+        day_start, day_end = day_bounds(day)
+        partition_start, partition_end = partition_bounds(key)
+        self.rollups.refresh(
+            key,
+            type_id,
+            day,
+            self.records.samples_between(
+                max(day_start, partition_start), min(day_end, partition_end)
+            ),
+        )
+        return True
+
+    @callback
+    def _mark_dirty(self, index: int | None) -> None:
+        """Mark the partition of the record at ``index`` as changed."""
+        if index is not None:
+            self._storage.async_mark_dirty(self.records.timestamp_at(index))
+
+    @property
+    def record_count(self) -> int:
+        """Return the number of stored records, loaded or not."""
+        return self._storage.total()
+
+    @callback
+    def _async_touch(self) -> None:
+        """Bump the revision after a change visible in get_members."""
+        self.revision = next_revision()
+        self._member_json = None
+
+    def member_json(self) -> bytes:
+        """Return the member's get_members entry, serialized."""
+        if self._member_json is None:
+            self._member_json = json_bytes(self._member_dict())
+        return self._member_json
+
+    def _member_dict(self) -> dict[str, Any]:
+        """Return the member's get_members entry."""
+        return {
+            "id": self.member_id,
+            "name": self.member_name,
+            "note": self.entry.data.get("note", ""),
+            "record_sets": [
+                {
+                    "type": s.type_id,
+                    "name": s.name,
+                    "unit": s.unit,
+                    "default_value": s.default_value,
+                    "default_value_mode": s.default_value_mode,
+                    "coalesce_window": s.coalesce_window,
+                    "current_value": s.current_value,
+                    "last_record": {
+                        "value": s.last_record.value,
+                        "note": s.last_record.note,
+                        "timestamp": (
+                            s.last_record.timestamp.isoformat()
+                            if s.last_record.timestamp
+                            else None
+                        ),
+                    } if s.last_record else None,
+                }
+                for s in self.record_sets.values()
+            ],
+        }
+
+    def get_diagnostics(self) -> dict[str, Any]:
+        """Return load timings and storage statistics (no record contents)."""
+        return {
+            "loaded": self.loaded,
+            "load_timings": self.load_timings,
+            "migration_progress": self.migration_progress,
+            "revision": self.revision,
+            "record_sets": len(self.record_sets),
+            "storage": self._storage.diagnostics(),
+        }
 
     def get_device_info(self) -> DeviceInfo:
         """Return device info for this member."""
@@ -301,26 +683,27 @@ class HealthRecordCoordinator:
 
     # ── Helpers ──────────────────────────────────────────────────────
 
-    def _recalculate_current_value(self, type_id: str) -> None:
-        """Recalculate current_value for a record set from the latest record."""
+    def _sync_last_record(self, type_id: str) -> None:
+        """Point a record set's last_record at its latest stored record."""
         if type_id not in self.record_sets:
             return
 
-        # Find all records for this type, pick the most recent by timestamp
-        latest_value: float | None = None
-        latest_ts: datetime | None = None
-        for record in self.records:
-            if record.get("record_type") != type_id:
-                continue
-            try:
-                record_time = dt_util.parse_datetime(record["timestamp"])
-            except (ValueError, TypeError):
-                continue
-            if record_time is not None and (latest_ts is None or record_time > latest_ts):
-                latest_ts = record_time
-                latest_value = record.get("value")
+        latest = self._storage.latest(type_id)
+        self.record_sets[type_id].last_record = (
+            Record.from_dict(latest) if latest else Record()
+        )
+        self._async_touch()
 
-        self.record_sets[type_id].current_value = latest_value
+    def _recalculate_current_value(self, type_id: str) -> None:
+        """Recalculate current_value and last_record from the latest record."""
+        if type_id not in self.record_sets:
+            return
+
+        latest = self._storage.latest(type_id)
+        record_set = self.record_sets[type_id]
+        record_set.current_value = latest["value"] if latest else None
+        record_set.last_record = Record.from_dict(latest) if latest else Record()
+        self._async_touch()
 
     # ── Unified CRUD methods ────────────────────────────────────────
 
@@ -328,11 +711,13 @@ class HealthRecordCoordinator:
         """Set the current value for a record set."""
         if type_id in self.record_sets:
             self.record_sets[type_id].current_value = value
+            self._async_touch()
 
     def set_record_note(self, type_id: str, note: str) -> None:
         """Set the current note for a record set."""
         if type_id in self.record_sets:
             self.record_sets[type_id].current_note = note
+            self._async_touch()
 
     @callback
     def log_record(self, type_id: str, timestamp: datetime | None = None) -> Record | None:
@@ -341,69 +726,558 @@ class HealthRecordCoordinator:
             return None
 
         record_set = self.record_sets[type_id]
-        record_timestamp = timestamp or dt_util.now()
-        record = Record(
-            value=record_set.current_value,
-            note=record_set.current_note,
-            timestamp=record_timestamp,
+        record, row = self._log_record(
+            type_id, record_set.current_value, record_set.current_note, timestamp
+        )
+        self._async_journal(
+            OP_STATE, record_sets={type_id: self.record_sets[type_id].to_dict()}
+        )
+        self._async_publish(CHANGE_ADD, [row])
+
+        # Notify sensor to update
+        self.async_notify_updated([type_id])
+
+        return record
+
+    @callback
+    def log_records(
+        self,
+        entries: list[tuple[str, float | None, str, datetime | None]],
+        update_inputs: bool = True,
+    ) -> list[Record]:
+        """Log (type, value, note, timestamp) entries of configured types.
+
+        With ``update_inputs`` each entry first becomes the record set's
+        current value and note, as if entered in the input entities;
+        without, the current value and note are left alone.  Sensors are
+        not notified; call ``async_notify_updated`` once every change of
+        the batch has been applied.
+        """
+        records: list[Record] = []
+        rows: list[dict[str, Any]] = []
+        for type_id, value, note, timestamp in entries:
+            if update_inputs:
+                self.set_record_value(type_id, value)
+                self.set_record_note(type_id, note)
+            record, row = self._log_record(type_id, value, note, timestamp)
+            records.append(record)
+            rows.append(row)
+        self._async_journal(
+            OP_STATE,
+            record_sets={
+                type_id: self.record_sets[type_id].to_dict()
+                for type_id, *_ in entries
+            },
+        )
+        self._async_publish(CHANGE_ADD, rows)
+        return records
+
+    @callback
+    def async_fire_record_logged(self, type_id: str, record: Record) -> None:
+        """Fire the record logged event for a new record."""
+        record_set = self.get_record_set(type_id)
+        self.hass.bus.async_fire(
+            EVENT_RECORD_LOGGED,
+            {
+                "member_id": self.member_id,
+                "member_name": self.member_name,
+                "record_type": type_id,
+                "record_name": record_set.name if record_set else type_id,
+                "value": record.value,
+                "unit": record_set.unit if record_set else "",
+                "note": record.note,
+                "timestamp": record.timestamp.isoformat() if record.timestamp else None,
+            },
+        )
+
+    @callback
+    def async_notify_updated(self, type_ids: Iterable[str]) -> None:
+        """Tell the sensors of the given record types to update."""
+        for type_id in type_ids:
+            async_dispatcher_send(
+                self.hass,
+                signal_record_updated(self.member_id, type_id),
+            )
+
+    @callback
+    def _async_publish(
+        self, action: str, rows: list[dict[str, Any]], **extra: Any
+    ) -> None:
+        """Announce changed records to record subscribers."""
+        async_dispatcher_send(
+            self.hass,
+            SIGNAL_RECORDS_CHANGED,
+            action,
+            [{**self._entry(row), **extra} for row in rows],
         )
-        record_set.last_record = record
+
+    @callback
+    def _log_record(
+        self,
+        type_id: str,
+        value: float | None,
+        note: str,
+        timestamp: datetime | None,
+    ) -> tuple[Record, dict[str, Any]]:
+        """Store a value and note of a record set as a new record.
+
+        Returns the record and the stored row.
+        """
+        record_set = self.record_sets[type_id]
+        record_timestamp = timestamp or dt_util.now()
+        micros = datetime_to_micros(record_timestamp)
+        offset = (
+            record_timestamp
+            if record_timestamp.tzinfo
+            else record_timestamp.replace(tzinfo=dt_util.DEFAULT_TIME_ZONE)
+        ).utcoffset()
+        record = Record(value=value, note=note, timestamp=record_timestamp)
 
         # Add to records history
-        self.records.append({
+        row = {
             "id": uuid.uuid4().hex,
             "record_type": type_id,
             "record_name": record_set.name,
-            "value": record_set.current_value,
+            "value": value,
             "unit": record_set.unit,
-            "note": record_set.current_note,
+            "note": note,
             "timestamp": record_timestamp.isoformat(),
-        })
-        self._prune_records()
-
-        # Schedule save
-        self._async_schedule_save()
+            "ts": micros,
+            "tz": int(offset.total_seconds()) if offset else 0,
+        }
+        self.records.add(row)
+        self._storage.async_mark_dirty(micros)
+        self.rollups.add(partition_key(micros), type_id, micros, row["value"])
+        self.statistics.async_mark(type_id, micros)
+        self._async_journal(OP_ADD, record=row)
 
-        # Notify sensor to update
-        async_dispatcher_send(
-            self.hass,
-            signal_record_updated(self.member_id, type_id),
-        )
+        # A back-dated record does not replace a newer last_record
+        self._sync_last_record(type_id)
+        return record, row
 
-        return record
+    async def async_import_records(
+        self,
+        records: list[tuple[int, dict[str, Any]]],
+        dedupe: bool = True,
+    ) -> dict[str, int]:
+        """Import validated (epoch microseconds, record dict) pairs.
+
+        The partitions the records fall in are loaded at most
+        ``MAX_LOADED_PARTITIONS`` at a time; each group has its records
+        merged into the history in one pass, journaled, and written by a
+        compaction before the next is loaded, so a long import does not
+        pull the whole history into memory.  Record subscribers are sent
+        each group's records as it is merged, rather than the whole import
+        at once.  No events are fired and each affected sensor is
+        refreshed once.  With ``dedupe``, records
+        matching an existing or earlier imported record on (type,
+        timestamp, value) are skipped.  The given record dicts are not
+        modified.
+
+        If a group cannot be written, the import stops there: the records
+        merged so far are kept, and the result counts the records left
+        out as ``failed``.
+        """
+        await self.async_wait_migrated()
+        by_partition: dict[str, list[tuple[int, dict[str, Any]]]] = {}
+        for micros, record in records:
+            by_partition.setdefault(partition_key(micros), []).append((micros, record))
+        keys = sorted(by_partition)
+
+        imported = 0
+        duplicates = 0
+        failed = 0
+        stopped = False
+        type_ids: set[str] = set()
+        for index in range(0, len(keys), MAX_LOADED_PARTITIONS):
+            group = keys[index : index + MAX_LOADED_PARTITIONS]
+            group_records = sum(len(by_partition[key]) for key in group)
+            if stopped:
+                failed += group_records
+                continue
+            async with self._storage.async_hold(group):
+                unique: list[tuple[int, dict[str, Any]]] = []
+                for key in group:
+                    if not dedupe:
+                        unique.extend(by_partition[key])
+                        continue
+                    # Records of different partitions never match
+                    seen: set[tuple[str, int, float | None]] = {
+                        (type_id, micros, value)
+                        for micros, type_id, value in self.records.samples_between(
+                            *partition_bounds(key)
+                        )
+                    }
+                    for micros, record in by_partition[key]:
+                        identity = (record["record_type"], micros, record["value"])
+                        if identity not in seen:
+                            seen.add(identity)
+                            unique.append((micros, record))
+
+                rows = [
+                    (micros, {**record, "id": uuid.uuid4().hex})
+                    for micros, record in unique
+                ]
+                group_imported = self.records.insert_many(row for _, row in rows)
+                for micros, row in rows:
+                    type_ids.add(row["record_type"])
+                    self._storage.async_mark_dirty(micros)
+                    self.rollups.add(
+                        partition_key(micros), row["record_type"], micros, row["value"]
+                    )
+                    self.statistics.async_mark(row["record_type"], micros)
+                    self._async_journal(OP_ADD, record=row)
+            imported += group_imported
+            duplicates += group_records - group_imported
+            if not group_imported:
+                continue
+            self._async_publish(CHANGE_ADD, [row for _, row in rows])
+            try:
+                # The journal keeps the group should its compaction fail;
+                # written partitions can be evicted before the next group loads
+                await self._storage.async_flush()
+                await self._storage.async_compact()
+            except Exception:
+                _LOGGER.exception(
+                    "Failed to write imported records of member %s, "
+                    "stopping the import",
+                    self.member_id,
+                )
+                stopped = True
+
+        for type_id in type_ids:
+            self._sync_last_record(type_id)
+        self.async_notify_updated(type_ids)
+        result = {"imported": imported, "duplicates": duplicates}
+        if failed:
+            result["failed"] = failed
+        return result
 
     def get_record_set(self, type_id: str) -> RecordSet | None:
         """Get a record set by type."""
         return self.record_sets.get(type_id)
 
-    def get_records_in_range(self, start_time: datetime, end_time: datetime) -> list[dict[str, Any]]:
-        """Get all records in a time range."""
-        results: list[dict[str, Any]] = []
-
-        for record in self.records:
-            try:
-                record_time = dt_util.parse_datetime(record["timestamp"])
-                if record_time and start_time <= record_time <= end_time:
-                    type_id = record["record_type"]
-                    rs = self.record_sets.get(type_id)
-                    entry = {
-                        "member_id": self.member_id,
-                        "member_name": self.member_name,
-                        "record_type": type_id,
-                        "record_name": rs.name if rs else record.get("record_name", type_id),
-                        "value": record["value"],
-                        "unit": rs.unit if rs else record.get("unit", ""),
-                        "note": record.get("note", ""),
-                        "timestamp": record["timestamp"],
-                    }
-                    if "id" in record:
-                        entry["id"] = record["id"]
-                    results.append(entry)
-            except (ValueError, TypeError):
+    async def async_get_records_page(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        limit: int | None = None,
+        after: RecordPosition | None = None,
+        type_ids: set[str] | None = None,
+    ) -> list[tuple[RecordPosition, dict[str, Any]]]:
+        """Get records in a time range, newest first, with their positions.
+
+        A position is ``(epoch microseconds, member_id, record_id)``;
+        entries are in descending position order and start strictly after
+        ``after``.  Partitions are read newest first and reading stops once
+        ``limit`` entries are collected.
+        """
+        start = datetime_to_micros(start_time)
+        end = datetime_to_micros(end_time) + 1
+        if after is not None:
+            end = min(end, after[0] + 1)
+
+        page: list[tuple[RecordPosition, dict[str, Any]]] = []
+        if (v1 := await self._async_v1_records(start, end)) is not None:
+            self._collect_page(v1, start, end, page, limit, after, type_ids)
+            keys = []
+        else:
+            keys = self._storage.partitions_between(start, end)
+        for key in reversed(keys):
+            partition_start, partition_end = partition_bounds(key)
+            async with self._storage.async_hold([key]):
+                self._collect_page(
+                    self.records,
+                    max(start, partition_start),
+                    min(end, partition_end),
+                    page,
+                    limit,
+                    after,
+                    type_ids,
+                )
+            if limit is not None and len(page) >= limit:
+                break
+
+        # Equal timestamps are stored in insertion order; order them by id
+        page.sort(key=lambda item: item[0], reverse=True)
+        return page if limit is None else page[:limit]
+
+    def _collect_page(
+        self,
+        records: RecordStore,
+        start: int,
+        end: int,
+        page: list[tuple[RecordPosition, dict[str, Any]]],
+        limit: int | None,
+        after: RecordPosition | None,
+        type_ids: set[str] | None,
+    ) -> None:
+        """Add the entries of [start, end) to a page, newest first, up to ``limit``."""
+        for index in records.positions_descending(start, end):
+            micros = records.timestamp_at(index)
+            # Finish the group of equal timestamps before stopping
+            if limit is not None and len(page) >= limit and micros < page[-1][0][0]:
+                break
+            if type_ids is not None and records.type_at(index) not in type_ids:
+                continue
+            position = (micros, self.member_id, records.id_at(index))
+            if after is not None and position >= after:
                 continue
+            page.append((position, self._entry(records.row(index))))
+
+    async def async_iter_records(self) -> AsyncIterator[list[dict[str, Any]]]:
+        """Yield all stored records one partition at a time, oldest first."""
+        if (v1 := await self._async_v1_records(0, 2**63 - 1)) is not None:
+            for _, rows in itertools.groupby(v1, lambda row: partition_key(row["ts"])):
+                yield list(rows)
+            return
+        for key in self._storage.partitions():
+            async with self._storage.async_hold([key]):
+                rows = list(self.records.rows_between(*partition_bounds(key)))
+            yield rows
+
+    async def async_iter_entries(
+        self,
+        start_time: datetime | None = None,
+        end_time: datetime | None = None,
+        type_ids: set[str] | None = None,
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        """Yield result entries in a time range, one partition at a time.
+
+        Partitions are visited oldest first.
+        """
+        start = datetime_to_micros(start_time) if start_time else 0
+        end = datetime_to_micros(end_time) + 1 if end_time else 2**63 - 1
+        if (v1 := await self._async_v1_records(start, end)) is not None:
+            for _, rows in itertools.groupby(v1, lambda row: partition_key(row["ts"])):
+                if entries := [
+                    self._entry(record)
+                    for record in rows
+                    if type_ids is None or record["record_type"] in type_ids
+                ]:
+                    yield entries
+            return
+        for key in self._storage.partitions_between(start, end):
+            partition_start, partition_end = partition_bounds(key)
+            async with self._storage.async_hold([key]):
+                entries = [
+                    self._entry(record)
+                    for record in self.records.rows_between(
+                        max(start, partition_start), min(end, partition_end)
+                    )
+                    if type_ids is None or record["record_type"] in type_ids
+                ]
+            if entries:
+                yield entries
+
+    async def async_count_entries(
+        self,
+        start_time: datetime | None = None,
+        end_time: datetime | None = None,
+        type_ids: set[str] | None = None,
+    ) -> int:
+        """Return how many entries ``async_iter_entries`` yields for the same range.
+
+        Whole local days are counted from the rollups; only the partial
+        days at either end of the range are counted record by record.
+        """
+        start = datetime_to_micros(start_time) if start_time else 0
+        end = datetime_to_micros(end_time) + 1 if end_time else 2**63 - 1
+        if (v1 := await self._async_v1_records(start, end)) is not None:
+            return self._count_records(v1, start, end, type_ids)
+        if not (keys := self._storage.partitions_between(start, end)):
+            return 0
+        start = max(start, partition_bounds(keys[0])[0])
+        end = min(end, partition_bounds(keys[-1])[1])
+        first_start, first_end = day_bounds(day_of(start))
+        last_start, last_end = day_bounds(day_of(end - 1))
+        if first_start == last_start and (start > first_start or end < last_end):
+            return await self._async_count_records(start, end, type_ids)
+
+        count = 0
+        if start > first_start:
+            count += await self._async_count_records(start, first_end, type_ids)
+            start = first_end
+        if end < last_end:
+            count += await self._async_count_records(last_start, end, type_ids)
+            end = last_start
+        if start < end:
+            count += sum(
+                entry["count"]
+                for entry in self.rollups.query(
+                    day_of(start), day_of(end - 1), PERIOD_MONTH, type_ids
+                )
+            )
+        return count
+
+    async def _async_count_records(
+        self, start: int, end: int, type_ids: set[str] | None
+    ) -> int:
+        """Count the records in [start, end) epoch microseconds, of the given types."""
+        count = 0
+        for key in self._storage.partitions_between(start, end):
+            partition_start, partition_end = partition_bounds(key)
+            bounds = max(start, partition_start), min(end, partition_end)
+            async with self._storage.async_hold([key]):
+                count += self._count_records(self.records, *bounds, type_ids)
+        return count
+
+    @staticmethod
+    def _count_records(
+        records: RecordStore, start: int, end: int, type_ids: set[str] | None
+    ) -> int:
+        """Count the records of a store in [start, end), of the given types."""
+        if type_ids is None:
+            return records.count_between(start, end)
+        return sum(
+            1
+            for _, type_id, _ in records.samples_between(start, end)
+            if type_id in type_ids
+        )
 
+    def get_records_in_range(
+        self, start_time: datetime, end_time: datetime
+    ) -> list[dict[str, Any]]:
+        """Get all loaded records in a time range."""
+        return [
+            self._entry(record) for record in self.records.range(start_time, end_time)
+        ]
+
+    def _entry(self, record: dict[str, Any]) -> dict[str, Any]:
+        """Return a stored record as a member-qualified result entry."""
+        type_id = record["record_type"]
+        rs = self.record_sets.get(type_id)
+        return {
+            "member_id": self.member_id,
+            "member_name": self.member_name,
+            "record_type": type_id,
+            "record_name": rs.name if rs else record["record_name"] or type_id,
+            "value": record["value"],
+            "unit": rs.unit if rs else record["unit"],
+            "note": record["note"],
+            "timestamp": record["timestamp"],
+            "id": record["id"],
+        }
+
+    async def async_get_series(
+        self,
+        type_id: str,
+        start_time: datetime,
+        end_time: datetime,
+        points: int,
+    ) -> dict[str, Any]:
+        """Get a record type's values in a time range, downsampled for charts.
+
+        Partitions are visited one at a time and only (time, value) pairs
+        are kept, so long ranges never have to be resident all at once.
+        """
+        start = datetime_to_micros(start_time)
+        end = datetime_to_micros(end_time) + 1
+        times = array("q")
+        values = array("d")
+        if (v1 := await self._async_v1_records(start, end)) is not None:
+            self._collect_samples(v1, start, end, type_id, times, values)
+            keys = []
+        else:
+            keys = self._storage.partitions_between(start, end)
+        for key in keys:
+            partition_start, partition_end = partition_bounds(key)
+            async with self._storage.async_hold([key]):
+                self._collect_samples(
+                    self.records,
+                    max(start, partition_start),
+                    min(end, partition_end),
+                    type_id,
+                    times,
+                    values,
+                )
+
+        return {
+            "total": len(times),
+            "points": [
+                [micros_to_datetime(times[index]).isoformat(), values[index]]
+                for index in lttb(times, values, points)
+            ],
+        }
+
+    @staticmethod
+    def _collect_samples(
+        records: RecordStore,
+        start: int,
+        end: int,
+        type_id: str,
+        times: array,
+        values: array,
+    ) -> None:
+        """Append the times and values of a type's records in [start, end)."""
+        for micros, sample_type, value in records.samples_between(start, end):
+            if sample_type == type_id and value is not None:
+                times.append(micros)
+                values.append(value)
+
+    async def async_get_aggregates(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        period: str,
+        type_ids: list[str] | None = None,
+    ) -> list[dict[str, Any]]:
+        """Get rollups like ``get_aggregates``, also while v1 records migrate.
+
+        The rollups of a running migration are incomplete, so they are
+        computed from the v1 data instead.
+        """
+        start = day_bounds(dt_util.as_local(start_time).date().isoformat())[0]
+        end = day_bounds(dt_util.as_local(end_time).date().isoformat())[1]
+        if (v1 := await self._async_v1_records(start, end)) is None:
+            return self.get_aggregates(start_time, end_time, period, type_ids)
+        rollups = Rollups()
+        rollups.load_partition(
+            "v1",
+            await self.hass.async_add_executor_job(
+                compute_days, v1.samples_between(start, end)
+            ),
+        )
+        return self._aggregates(rollups, start_time, end_time, period, type_ids)
+
+    def get_aggregates(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        period: str,
+        type_ids: list[str] | None = None,
+    ) -> list[dict[str, Any]]:
+        """Get rollups per record type and day, week or month.
+
+        Covers the local days from ``start_time`` through ``end_time`` and
+        reads no records, loaded or not.
+        """
+        return self._aggregates(self.rollups, start_time, end_time, period, type_ids)
+
+    def _aggregates(
+        self,
+        rollups: Rollups,
+        start_time: datetime,
+        end_time: datetime,
+        period: str,
+        type_ids: list[str] | None,
+    ) -> list[dict[str, Any]]:
+        """Return the queried rollups as member-qualified entries."""
+        results = rollups.query(
+            dt_util.as_local(start_time).date().isoformat(),
+            dt_util.as_local(end_time).date().isoformat(),
+            period,
+            type_ids,
+        )
+        for entry in results:
+            rs = self.record_sets.get(entry["record_type"])
+            entry["member_id"] = self.member_id
+            entry["member_name"] = self.member_name
+            entry["record_name"] = rs.name if rs else entry["record_type"]
+            entry["unit"] = rs.unit if rs else ""
         return results
 
+    @callback
     def delete_record(
         self,
         type_id: str,
@@ -411,20 +1285,28 @@ class HealthRecordCoordinator:
         record_id: str | None = None,
     ) -> bool:
         """Delete a record by UUID or type+timestamp fallback."""
-        for i, record in enumerate(self.records):
-            # Match by UUID first (preferred), fall back to type+timestamp
-            if record_id and record.get("id") == record_id:
-                del self.records[i]
-                self._recalculate_current_value(type_id)
-                self._async_schedule_save()
-                return True
-            if not record_id and record["record_type"] == type_id and record["timestamp"] == timestamp:
-                del self.records[i]
-                self._recalculate_current_value(type_id)
-                self._async_schedule_save()
-                return True
-        return False
+        index = self.records.find(type_id, timestamp, record_id)
+        if index is None:
+            return False
+
+        record_type = self.records.type_at(index)
+        micros = self.records.timestamp_at(index)
+        self._mark_dirty(index)
+        removed = self.records.pop(index)
+        self._refresh_rollup(record_type, micros)
+        self.statistics.async_mark(record_type, micros)
+        self._async_journal(
+            OP_DELETE, id=removed["id"], timestamp=removed["timestamp"]
+        )
+        self._async_publish(CHANGE_DELETE, [removed])
+        self._recalculate_current_value(record_type)
+        async_dispatcher_send(
+            self.hass,
+            signal_record_updated(self.member_id, record_type),
+        )
+        return True
 
+    @callback
     def update_record(
         self,
         type_id: str,
@@ -434,22 +1316,107 @@ class HealthRecordCoordinator:
         new_timestamp: str | None = None,
         record_id: str | None = None,
     ) -> bool:
-        """Update a record by UUID or type+timestamp fallback."""
-        for record in self.records:
-            matched = False
-            if record_id and record.get("id") == record_id:
-                matched = True
-            elif not record_id and record["record_type"] == type_id and record["timestamp"] == timestamp:
-                matched = True
-
-            if matched:
-                if value is not None:
-                    record["value"] = value
-                if note is not None:
-                    record["note"] = note
-                if new_timestamp is not None:
-                    record["timestamp"] = new_timestamp
-                self._recalculate_current_value(type_id)
-                self._async_schedule_save()
-                return True
+        """Update a record by UUID or type+timestamp fallback.
+
+        Raises ``ValueError`` if ``new_timestamp`` cannot be parsed.
+        """
+        index = self.records.find(type_id, timestamp, record_id)
+        if index is None:
+            return False
+
+        record_type = self.records.type_at(index)
+        previous = self.records.row(index)["timestamp"]
+        old_micros = self.records.timestamp_at(index)
+        index = self.records.update(
+            index, value=value, note=note, timestamp=new_timestamp
+        )
+        row = self.records.row(index)
+        self._storage.async_mark_dirty(old_micros)
+        self._mark_dirty(index)
+        self._refresh_rollup(record_type, old_micros)
+        new_micros = self.records.timestamp_at(index)
+        if new_micros != old_micros and not self._refresh_rollup(
+            record_type, new_micros
+        ):
+            # Moved into a partition that is not loaded
+            self.rollups.add(
+                partition_key(new_micros), record_type, new_micros, row["value"]
+            )
+        self.statistics.async_mark(record_type, old_micros)
+        self.statistics.async_mark(record_type, new_micros)
+        self._async_journal(OP_UPDATE, record=row, timestamp=previous)
+        self._async_publish(CHANGE_UPDATE, [row], previous_timestamp=previous)
+        self._recalculate_current_value(record_type)
+        async_dispatcher_send(
+            self.hass,
+            signal_record_updated(self.member_id, record_type),
+        )
+        return True
+
+    def _partitions_at(self, timestamp: str) -> list[str]:
+        """Return the partition holding an ISO timestamp, if it is valid."""
+        try:
+            micros = parse_timestamp(timestamp)[0]
+        except (TypeError, ValueError):
+            return []
+        return self._storage.partitions_between(micros, micros + 1)
+
+    def _record_partitions(
+        self, timestamp: str, record_id: str | None
+    ) -> Iterator[list[str]]:
+        """Yield the partitions that may hold a record, most likely first.
+
+        A record looked up by id is found through the id index if its
+        partition is loaded.  Otherwise the partition of ``timestamp`` is
+        tried; as the caller's timestamp may be stale, the partitions not
+        in memory are then tried one at a time, newest first.
+        """
+        if record_id and (index := self.records.find("", "", record_id)) is not None:
+            micros = self.records.timestamp_at(index)
+            yield self._storage.partitions_between(micros, micros + 1)
+        yield (keys := self._partitions_at(timestamp))
+        if record_id:
+            for key in reversed(self._storage.partitions()):
+                if key not in keys and not self._storage.is_resident(key):
+                    yield [key]
+
+    async def async_delete_record(
+        self,
+        type_id: str,
+        timestamp: str,
+        record_id: str | None = None,
+    ) -> bool:
+        """Load the record's partition, found by id if given, then delete it."""
+        await self.async_wait_migrated()
+        for keys in self._record_partitions(timestamp, record_id):
+            async with self._storage.async_hold(keys):
+                if self.records.find(type_id, timestamp, record_id) is not None:
+                    return self.delete_record(type_id, timestamp, record_id=record_id)
+        return False
+
+    async def async_update_record(
+        self,
+        type_id: str,
+        timestamp: str,
+        value: float | None = None,
+        note: str | None = None,
+        new_timestamp: str | None = None,
+        record_id: str | None = None,
+    ) -> bool:
+        """Load the record's partition, found by id if given, then update it.
+
+        Raises ``ValueError`` if ``new_timestamp`` cannot be parsed.
+        """
+        await self.async_wait_migrated()
+        for keys in self._record_partitions(timestamp, record_id):
+            async with self._storage.async_hold(keys):
+                if self.records.find(type_id, timestamp, record_id) is not None:
+                    return self.update_record(
+                        type_id,
+                        timestamp,
+                        value=value,
+                        note=note,
+                        new_timestamp=new_timestamp,
+                        record_id=record_id,
+                    )
         return False
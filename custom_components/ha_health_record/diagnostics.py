@@ -0,0 +1,19 @@
+"""Diagnostics support for Ha Health Record."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from . import HaHealthRecordConfigEntry
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: HaHealthRecordConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry.
+
+    Health records are personal data, so only counts and timings are
+    included: how long the member took to load, and the storage state.
+    """
+    return entry.runtime_data.get_diagnostics()
@@ -0,0 +1,92 @@
+"""Base entity for Ha Health Record integration."""
+from __future__ import annotations
+
+from homeassistant.core import callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity import Entity
+
+from .coordinator import (
+    HealthRecordCoordinator,
+    RecordSet,
+    signal_member_loaded,
+    signal_record_set_changed,
+    signal_record_set_removed,
+)
+
+
+class RecordSetEntity(Entity):
+    """Entity belonging to one record set of a member.
+
+    Follows its record set when it is renamed or removed at runtime, so
+    record type changes need no config entry reload.  Unavailable while
+    the member's stored data is still loading.
+    """
+
+    _attr_has_entity_name = True
+    _unique_id_suffix: str
+
+    def __init__(
+        self,
+        coordinator: HealthRecordCoordinator,
+        type_id: str,
+    ) -> None:
+        """Initialize the entity."""
+        self._coordinator = coordinator
+        self._type_id = type_id
+
+        self._attr_unique_id = (
+            f"{coordinator.member_id}_{type_id}_{self._unique_id_suffix}"
+        )
+        self._attr_device_info = coordinator.get_device_info()
+        self._apply_record_set(coordinator.get_record_set(type_id))
+
+    def _apply_record_set(self, record_set: RecordSet) -> None:
+        """Take over the name (and unit) of the record set."""
+        self._attr_translation_placeholders = {"record_name": record_set.name}
+
+    @property
+    def available(self) -> bool:
+        """Return whether the member's stored data is loaded."""
+        return self._coordinator.loaded
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to record set changes when added to hass."""
+        member_id = self._coordinator.member_id
+        if not self._coordinator.loaded:
+            self.async_on_remove(
+                async_dispatcher_connect(
+                    self.hass,
+                    signal_member_loaded(member_id),
+                    self.async_write_ha_state,
+                )
+            )
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                signal_record_set_changed(member_id, self._type_id),
+                self._handle_record_set_changed,
+            )
+        )
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                signal_record_set_removed(member_id, self._type_id),
+                self._async_handle_record_set_removed,
+            )
+        )
+
+    @callback
+    def _handle_record_set_changed(self) -> None:
+        """Handle a renamed or otherwise edited record set."""
+        if (record_set := self._coordinator.get_record_set(self._type_id)) is None:
+            return
+        self._apply_record_set(record_set)
+        self.async_write_ha_state()
+
+    async def _async_handle_record_set_removed(self) -> None:
+        """Remove the entity (and its registry entry) with its record set."""
+        if self.registry_entry is not None:
+            er.async_get(self.hass).async_remove(self.entity_id)
+        else:
+            await self.async_remove(force_remove=True)
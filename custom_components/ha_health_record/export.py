@@ -0,0 +1,241 @@
+"""Bulk export of Ha Health Record history.
+
+An export covers any set of members, record types and time range, and is
+written under ``<config>/ha_health_record/exports`` in one of three
+formats:
+
+* ``csv`` -- one row per record, with member columns (UTF-8 with BOM).
+* ``ndjson`` -- one JSON object per line.
+* ``columnar`` -- a compact binary file of typed column blocks, see
+  ``_ColumnarWriter``.
+
+Records are gathered on the event loop one storage partition at a time;
+encoding and file I/O run in the executor.
+"""
+from __future__ import annotations
+
+import csv
+import struct
+import sys
+import time
+from array import array
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Protocol
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.json import json_bytes
+
+from .const import DOMAIN
+from .coordinator import HealthRecordCoordinator
+from .record_store import parse_timestamp
+
+FORMAT_CSV = "csv"
+FORMAT_NDJSON = "ndjson"
+FORMAT_COLUMNAR = "columnar"
+FORMAT_EXTENSIONS = {
+    FORMAT_CSV: "csv",
+    FORMAT_NDJSON: "ndjson",
+    FORMAT_COLUMNAR: "hhrc",
+}
+
+EXPORT_RETENTION = timedelta(days=1)  # finished exports are removed after this
+
+CSV_COLUMNS = (
+    "member_id",
+    "member_name",
+    "timestamp",
+    "record_type",
+    "record_name",
+    "value",
+    "unit",
+    "note",
+    "id",
+)
+COLUMNAR_MAGIC = b"HHRCOL1\n"
+
+
+def export_dir(hass: HomeAssistant) -> Path:
+    """Return the directory holding finished exports."""
+    return Path(hass.config.path(DOMAIN, "exports"))
+
+
+class _ExportWriter(Protocol):
+    """Writes batches of result entries to an export file."""
+
+    def write(self, entries: list[dict[str, Any]]) -> None:
+        """Append a batch of entries."""
+
+    def close(self) -> None:
+        """Finish the file."""
+
+
+class _CsvWriter:
+    """CSV export, with a BOM for Excel CJK compatibility."""
+
+    def __init__(self, path: Path) -> None:
+        """Open the file and write the header row."""
+        self._file = path.open("w", encoding="utf-8-sig", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(CSV_COLUMNS)
+
+    def write(self, entries: list[dict[str, Any]]) -> None:
+        """Append a batch of entries."""
+        self._writer.writerows(
+            [entry[column] for column in CSV_COLUMNS] for entry in entries
+        )
+
+    def close(self) -> None:
+        """Finish the file."""
+        self._file.close()
+
+
+class _NdjsonWriter:
+    """Newline-delimited JSON export."""
+
+    def __init__(self, path: Path) -> None:
+        """Open the file."""
+        self._file = path.open("wb")
+
+    def write(self, entries: list[dict[str, Any]]) -> None:
+        """Append a batch of entries."""
+        self._file.write(b"".join(json_bytes(entry) + b"\n" for entry in entries))
+
+    def close(self) -> None:
+        """Finish the file."""
+        self._file.close()
+
+
+class _ColumnarWriter:
+    """Compact columnar binary export.
+
+    After the ``HHRCOL1\\n`` magic the file is a sequence of row groups,
+    one per batch.  Each group is a little-endian ``uint32`` length, a
+    JSON header of that length and the column data in header order::
+
+        {"rows": n,
+         "members": [[member_id, member_name], ...],
+         "types": [[record_type, record_name, unit], ...],
+         "columns": [[name, dtype, byte_length], ...]}
+
+    Columns are ``timestamp`` (int64 UTC epoch microseconds), ``utc_offset``
+    (int32 seconds), ``value`` (float64, NaN for none), ``member`` and
+    ``type`` (uint16 indexes into the header lists), and ``id`` and
+    ``note`` (``json``: one UTF-8 JSON array of strings).
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Open the file and write the magic."""
+        self._file = path.open("wb")
+        self._file.write(COLUMNAR_MAGIC)
+
+    def write(self, entries: list[dict[str, Any]]) -> None:
+        """Append a batch of entries as one row group."""
+        members: dict[tuple[str, str], int] = {}
+        types: dict[tuple[str, str, str], int] = {}
+        timestamps = array("q")
+        offsets = array("i")
+        values = array("d")
+        member_codes = array("H")
+        type_codes = array("H")
+        for entry in entries:
+            micros, offset = parse_timestamp(entry["timestamp"])
+            timestamps.append(micros)
+            offsets.append(offset)
+            values.append(float("nan") if entry["value"] is None else entry["value"])
+            member_codes.append(
+                members.setdefault(
+                    (entry["member_id"], entry["member_name"]), len(members)
+                )
+            )
+            type_codes.append(
+                types.setdefault(
+                    (entry["record_type"], entry["record_name"], entry["unit"]),
+                    len(types),
+                )
+            )
+
+        columns: list[tuple[str, str, bytes]] = []
+        for name, dtype, column in (
+            ("timestamp", "int64", timestamps),
+            ("utc_offset", "int32", offsets),
+            ("value", "float64", values),
+            ("member", "uint16", member_codes),
+            ("type", "uint16", type_codes),
+        ):
+            if sys.byteorder != "little":
+                column.byteswap()
+            columns.append((name, dtype, column.tobytes()))
+        for name in ("id", "note"):
+            columns.append(
+                (name, "json", json_bytes([entry[name] for entry in entries]))
+            )
+
+        header = json_bytes({
+            "rows": len(entries),
+            "members": list(members),
+            "types": list(types),
+            "columns": [[name, dtype, len(data)] for name, dtype, data in columns],
+        })
+        self._file.write(struct.pack("<I", len(header)) + header)
+        for _, _, data in columns:
+            self._file.write(data)
+
+    def close(self) -> None:
+        """Finish the file."""
+        self._file.close()
+
+
+_WRITERS: dict[str, Callable[[Path], _ExportWriter]] = {
+    FORMAT_CSV: _CsvWriter,
+    FORMAT_NDJSON: _NdjsonWriter,
+    FORMAT_COLUMNAR: _ColumnarWriter,
+}
+
+
+def _open_writer(directory: Path, path: Path, export_format: str) -> _ExportWriter:
+    """Create the export directory, drop expired exports and open the file."""
+    directory.mkdir(parents=True, exist_ok=True)
+    expired = time.time() - EXPORT_RETENTION.total_seconds()
+    for old in directory.iterdir():
+        if old.stat().st_mtime < expired:
+            old.unlink(missing_ok=True)
+    return _WRITERS[export_format](path)
+
+
+async def async_bulk_export(
+    hass: HomeAssistant,
+    coordinators: list[HealthRecordCoordinator],
+    filename: str,
+    export_format: str,
+    start_time: datetime | None,
+    end_time: datetime | None,
+    type_ids: set[str] | None,
+    progress: Callable[[int], None],
+) -> int:
+    """Write an export file and return the number of records in it.
+
+    ``progress`` is called with the running record count after every batch.
+    A failed or cancelled export leaves no file behind.
+    """
+    directory = export_dir(hass)
+    path = directory / filename
+    writer = await hass.async_add_executor_job(
+        _open_writer, directory, path, export_format
+    )
+    exported = 0
+    try:
+        for coordinator in coordinators:
+            async for entries in coordinator.async_iter_entries(
+                start_time, end_time, type_ids
+            ):
+                await hass.async_add_executor_job(writer.write, entries)
+                exported += len(entries)
+                progress(exported)
+    except BaseException:
+        await hass.async_add_executor_job(writer.close)
+        await hass.async_add_executor_job(path.unlink, True)
+        raise
+    await hass.async_add_executor_job(writer.close)
+    return exported
@@ -54,6 +54,10 @@ class HaHealthRecordPanel extends HTMLElement {
     this._filterCalendarViewMonth = now_cal.getMonth() + 1;
     this._filterCalendarViewYear = now_cal.getFullYear();
 
+    // Live record changes for the visible date range
+    this._unsubRecords = null;
+    this._subscribedRange = '';
+
     // Localization strings
     this._strings = {
       en: {
@@ -114,6 +118,7 @@ class HaHealthRecordPanel extends HTMLElement {
         defaultValueFixed: 'Fixed Value',
         defaultValueLastValue: 'Last Value',
         lastValue: 'Last Value',
+        coalesceWindow: 'Sensor Update Window (seconds, 0 = every record)',
         memberNamePlaceholder: 'e.g., Baby Emma',
         memberIdLabel: 'ID (optional, auto-generated from name)',
         memberIdPlaceholder: 'e.g., baby_emma',
@@ -200,6 +205,7 @@ class HaHealthRecordPanel extends HTMLElement {
         defaultValueFixed: '固定值',
         defaultValueLastValue: '上次數值',
         lastValue: '上次數值',
+        coalesceWindow: '感測器更新間隔（秒，0 = 每筆紀錄）',
         memberNamePlaceholder: '例如：寶寶小明',
         memberIdLabel: 'ID（選填，將自動從名稱產生）',
         memberIdPlaceholder: '例如：baby_ming',
@@ -286,6 +292,7 @@ class HaHealthRecordPanel extends HTMLElement {
         defaultValueFixed: '固定值',
         defaultValueLastValue: '上次数值',
         lastValue: '上次数值',
+        coalesceWindow: '传感器更新间隔（秒，0 = 每条记录）',
         memberNamePlaceholder: '例如：宝宝小明',
         memberIdLabel: 'ID（可选，将自动从名称生成）',
         memberIdPlaceholder: '例如：baby_ming',
@@ -388,6 +395,7 @@ class HaHealthRecordPanel extends HTMLElement {
     if (this._onDocumentClick) {
       document.removeEventListener('click', this._onDocumentClick);
     }
+    this._unsubscribeRecords();
   }
 
   _getLocale() {
@@ -404,11 +412,7 @@ class HaHealthRecordPanel extends HTMLElement {
     this._render();
 
     try {
-      // Load members
-      const membersResult = await this._hass.callWS({
-        type: 'ha_health_record/get_members',
-      });
-      this.members = membersResult.members || [];
+      await this._loadMembers();
 
       // Auto-select first member if none selected
       if (this.members.length > 0 && !this.selectedMemberId) {
@@ -425,8 +429,30 @@ class HaHealthRecordPanel extends HTMLElement {
     this._render();
   }
 
+  async _loadMembers() {
+    const request = { type: 'ha_health_record/get_members' };
+    if (this._membersRevision !== undefined) {
+      request.since_revision = this._membersRevision;
+    }
+    const membersResult = await this._hass.callWS(request);
+    this._membersRevision = membersResult.revision;
+    if (membersResult.not_modified) return;
+    if (!membersResult.member_ids) {
+      this.members = membersResult.members || [];
+      return;
+    }
+    // Only changed members were sent; keep the others as they are
+    const byId = new Map(this.members.map((m) => [m.id, m]));
+    for (const member of membersResult.members) byId.set(member.id, member);
+    this.members = membersResult.member_ids
+      .map((id) => byId.get(id))
+      .filter(Boolean);
+  }
+
   async _loadRecords() {
     try {
+      // Subscribe first so no change between the two calls is missed
+      await this._subscribeRecords();
       const recordsResult = await this._hass.callWS({
         type: 'ha_health_record/get_records',
         start_time: new Date(this.startDate).toISOString(),
@@ -439,6 +465,56 @@ class HaHealthRecordPanel extends HTMLElement {
     this._render();
   }
 
+  async _subscribeRecords() {
+    const range = `${this.startDate}|${this.endDate}`;
+    if (this._unsubRecords && this._subscribedRange === range) return;
+    this._unsubscribeRecords();
+    this._subscribedRange = range;
+    const unsub = await this._hass.connection.subscribeMessage(
+      (change) => this._applyRecordChange(change),
+      {
+        type: 'ha_health_record/subscribe_records',
+        start_time: new Date(this.startDate).toISOString(),
+        end_time: new Date(this.endDate).toISOString(),
+      },
+    );
+    if (this._subscribedRange === range && this.isConnected) {
+      this._unsubRecords = unsub;
+    } else {
+      unsub();
+    }
+  }
+
+  _unsubscribeRecords() {
+    if (this._unsubRecords) {
+      this._unsubRecords();
+      this._unsubRecords = null;
+    }
+    this._subscribedRange = '';
+  }
+
+  _applyRecordChange({ action, records }) {
+    // Apply a pushed add/update/delete diff instead of re-fetching the range
+    const changedIds = new Set(records.map(r => r.id));
+    this.records = this.records.filter(r => !changedIds.has(r.id));
+    if (action !== 'delete') {
+      const start = new Date(this.startDate).getTime();
+      const end = new Date(this.endDate).getTime();
+      for (const record of records) {
+        const time = new Date(record.timestamp).getTime();
+        if (time >= start && time <= end) {
+          const { previous_timestamp, ...entry } = record;
+          this.records.push(entry);
+        }
+      }
+      this.records.sort((a, b) => new Date(b.timestamp) - new Date(a.timestamp));
+    }
+    // Latest values shown per record type may have changed as well
+    this._loadMembers()
+      .catch((error) => console.error('Error loading members:', error))
+      .finally(() => this._render());
+  }
+
   _formatTime(dateStr) {
     const date = new Date(dateStr);
     return date.toLocaleTimeString(this._getLocale(), {
@@ -516,7 +592,6 @@ class HaHealthRecordPanel extends HTMLElement {
       });
 
       this._closeInputDialog();
-      await this._loadData();
     } catch (error) {
       console.error('Error logging record:', error);
       alert('Failed to log record: ' + error.message);
@@ -752,7 +827,6 @@ class HaHealthRecordPanel extends HTMLElement {
 
       this.expandedRecordId = null;
       this.editingRecord = null;
-      await this._loadData();
     } catch (error) {
       console.error('Error updating record:', error);
       alert('Failed to update record: ' + error.message);
@@ -787,7 +861,7 @@ class HaHealthRecordPanel extends HTMLElement {
     this.editingType = {
       mode: 'add',
       memberId: this.selectedMemberId || this.members[0]?.id || '',
-      data: { name: '', unit: '', default_value: 0, default_value_mode: 'fixed' },
+      data: { name: '', unit: '', default_value: 0, default_value_mode: 'fixed', coalesce_window: 0 },
     };
     this.showTypeDialog = true;
     this._render();
@@ -803,6 +877,7 @@ class HaHealthRecordPanel extends HTMLElement {
         unit: typeData.unit,
         default_value: typeData.default_value ?? 0,
         default_value_mode: typeData.default_value_mode || 'fixed',
+        coalesce_window: typeData.coalesce_window ?? 0,
       },
     };
     this.showTypeDialog = true;
@@ -831,6 +906,7 @@ class HaHealthRecordPanel extends HTMLElement {
           unit: data.unit,
           default_value: data.default_value,
           default_value_mode: data.default_value_mode || 'fixed',
+          coalesce_window: data.coalesce_window || 0,
         });
       } else {
         await this._hass.callWS({
@@ -841,12 +917,13 @@ class HaHealthRecordPanel extends HTMLElement {
           unit: data.unit,
           default_value: data.default_value,
           default_value_mode: data.default_value_mode || 'fixed',
+          coalesce_window: data.coalesce_window || 0,
         });
       }
 
       this._closeTypeDialog();
-      // Wait for integration reload to complete before fetching data
-      await this._waitForReloadAndRefresh();
+      // Record types are applied without an integration reload
+      await this._loadData();
     } catch (error) {
       console.error('Error saving type:', error);
       alert('Failed to save type: ' + error.message);
@@ -966,8 +1043,12 @@ class HaHealthRecordPanel extends HTMLElement {
       }
 
       this._closeMemberDialog();
-      // Wait for integration reload to complete before fetching data
-      await this._waitForReloadAndRefresh();
+      if (mode === 'add') {
+        // Wait for the new member's integration entry to finish setting up
+        await this._waitForReloadAndRefresh();
+      } else {
+        await this._loadData();
+      }
     } catch (error) {
       console.error('Error saving member:', error);
       alert('Failed to save member: ' + error.message);
@@ -1022,7 +1103,7 @@ class HaHealthRecordPanel extends HTMLElement {
             member_id: memberId,
             type_id: id,
           });
-          needsReloadWait = true;
+          await this._loadData();
           break;
         case 'member':
           await this._hass.callWS({
@@ -1044,8 +1125,6 @@ class HaHealthRecordPanel extends HTMLElement {
       // Wait for integration reload if needed
       if (needsReloadWait) {
         await this._waitForReloadAndRefresh();
-      } else {
-        await this._loadData();
       }
     } catch (error) {
       console.error('Error deleting:', error);
@@ -2456,6 +2535,10 @@ class HaHealthRecordPanel extends HTMLElement {
               <input type="number" id="type-default" value="${this.editingType.data.default_value}" step="0.1">
             </div>
             ` : ''}
+            <div class="dialog-field">
+              <label>${this._t('coalesceWindow')}</label>
+              <input type="number" id="type-coalesce" value="${this.editingType.data.coalesce_window}" min="0" max="3600" step="1">
+            </div>
             <div class="dialog-actions">
               <button class="btn btn-secondary" id="cancel-type-btn">${this._t('cancel')}</button>
               <button class="btn btn-primary" id="save-type-btn" ${this.submitting ? 'disabled' : ''}>
@@ -2830,11 +2913,13 @@ class HaHealthRecordPanel extends HTMLElement {
         const unitInput = this.shadowRoot.querySelector('#type-unit');
         const defaultInput = this.shadowRoot.querySelector('#type-default');
         const modeSelect = this.shadowRoot.querySelector('#type-default-mode');
+        const coalesceInput = this.shadowRoot.querySelector('#type-coalesce');
 
         if (nameInput) this.editingType.data.name = nameInput.value;
         if (unitInput) this.editingType.data.unit = unitInput.value;
         if (modeSelect) this.editingType.data.default_value_mode = modeSelect.value;
         if (defaultInput) this.editingType.data.default_value = parseFloat(defaultInput.value) || 0;
+        if (coalesceInput) this.editingType.data.coalesce_window = parseFloat(coalesceInput.value) || 0;
 
         this._saveType();
       });
@@ -2848,11 +2933,13 @@ class HaHealthRecordPanel extends HTMLElement {
         const nameInput = this.shadowRoot.querySelector('#type-name');
         const unitInput = this.shadowRoot.querySelector('#type-unit');
         const defaultInput = this.shadowRoot.querySelector('#type-default');
+        const coalesceInput = this.shadowRoot.querySelector('#type-coalesce');
         const memberSelect = this.shadowRoot.querySelector('#type-member');
 
         if (nameInput) this.editingType.data.name = nameInput.value;
         if (unitInput) this.editingType.data.unit = unitInput.value;
         if (defaultInput) this.editingType.data.default_value = parseFloat(defaultInput.value) || 0;
+        if (coalesceInput) this.editingType.data.coalesce_window = parseFloat(coalesceInput.value) || 0;
         if (memberSelect) this.editingType.memberId = memberSelect.value;
         this.editingType.data.default_value_mode = typeDefaultMode.value;
         this._render();
@@ -2917,26 +3004,28 @@ class HaHealthRecordPanel extends HTMLElement {
     if (!this.selectedMemberId) return;
 
     try {
-      const result = await this._hass.callWS({
-        type: 'ha_health_record/export_csv',
-        member_id: this.selectedMemberId,
-      });
+      // Streamed by the server one partition at a time (BOM included)
+      const response = await this._hass.fetchWithAuth(
+        `/api/ha_health_record/export/${encodeURIComponent(this.selectedMemberId)}`
+      );
+      if (!response.ok) {
+        throw new Error(`HTTP ${response.status}`);
+      }
 
-      if (!result.record_count) {
+      if (response.headers.get('X-Record-Count') === '0') {
         alert(this._t('exportNoRecords'));
         return;
       }
 
       // Sanitize member name for filename: keep alphanumeric, CJK, spaces→underscore
-      const safeName = result.member_name
+      const member = this.members.find(m => m.id === this.selectedMemberId);
+      const safeName = (member ? member.name : this.selectedMemberId)
         .replace(/[^\w\u4e00-\u9fff\u3400-\u4dbf\s-]/g, '')
         .replace(/\s+/g, '_');
       const dateStr = new Date().toISOString().slice(0, 10);
       const filename = `health_record_${safeName}_${dateStr}.csv`;
 
-      // Prepend UTF-8 BOM for Excel CJK compatibility
-      const bom = '\uFEFF';
-      const blob = new Blob([bom + result.csv_content], { type: 'text/csv;charset=utf-8;' });
+      const blob = await response.blob();
       const url = URL.createObjectURL(blob);
 
       const a = document.createElement('a');
@@ -0,0 +1,156 @@
+"""Bulk import of historical Ha Health Record data.
+
+Rows come either as dicts or as CSV/NDJSON text with the columns
+``timestamp``, ``record_type``, ``value`` and (optionally) ``note``, so
+files written by the exports can be imported again.  Other columns are
+ignored, as are record ids: every imported row gets a fresh one.
+
+Timestamps without an offset are taken in the configured time zone.  A
+missing or empty value is stored as no value.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import math
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util.json import json_loads
+
+from .coordinator import HealthRecordCoordinator, RecordSet
+from .record_store import format_timestamp, parse_timestamp
+
+IMPORT_CSV = "csv"
+IMPORT_NDJSON = "ndjson"
+IMPORT_FORMATS = (IMPORT_CSV, IMPORT_NDJSON)
+
+MAX_REPORTED_ERRORS = 50  # invalid rows listed in an error reply
+
+
+class InvalidImport(ValueError):
+    """Raised when import data is rejected; carries the per-row errors."""
+
+    def __init__(self, errors: list[dict[str, Any]], invalid: int) -> None:
+        """Initialize with the first errors and the number of invalid rows."""
+        super().__init__(f"{invalid} invalid row(s)")
+        self.errors = errors
+        self.invalid = invalid
+
+
+def parse_content(content: str, import_format: str) -> list[Any]:
+    """Split CSV or NDJSON text into rows (runs in the executor).
+
+    Raises ``InvalidImport`` for NDJSON lines that are not valid JSON.
+    """
+    if import_format == IMPORT_CSV:
+        return list(csv.DictReader(io.StringIO(content.removeprefix("\ufeff"))))
+
+    rows: list[Any] = []
+    errors: list[dict[str, Any]] = []
+    invalid = 0
+    for line_number, line in enumerate(content.splitlines(), 1):
+        if not line.strip():
+            continue
+        try:
+            rows.append(json_loads(line))
+        except ValueError:
+            invalid += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({"row": line_number, "error": "invalid JSON"})
+    if invalid:
+        raise InvalidImport(errors, invalid)
+    return rows
+
+
+def _validate_row(
+    row: Any, record_sets: dict[str, RecordSet]
+) -> tuple[int, dict[str, Any]]:
+    """Return (epoch microseconds, record dict) for one input row.
+
+    Raises ``TypeError`` or ``ValueError`` describing the first problem found.
+    """
+    if not isinstance(row, dict):
+        raise TypeError("not an object")
+
+    type_id = row.get("record_type")
+    if not isinstance(type_id, str) or (record_set := record_sets.get(type_id)) is None:
+        raise ValueError(f"unknown record type {type_id!r}")
+
+    timestamp = row.get("timestamp")
+    if not isinstance(timestamp, str) or not timestamp:
+        raise ValueError("missing timestamp")
+    micros, offset = parse_timestamp(timestamp.replace("Z", "+00:00"))
+
+    value = row.get("value")
+    if value == "":
+        value = None
+    if value is not None:
+        if isinstance(value, bool):
+            raise ValueError(f"invalid value {value!r}")
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"invalid value {value!r}") from None
+        if math.isnan(value) or math.isinf(value):
+            raise ValueError("NaN and Infinity are not allowed")
+
+    note = row.get("note") or ""
+    if not isinstance(note, str):
+        raise TypeError("note must be a string")
+
+    return micros, {
+        "record_type": type_id,
+        "record_name": record_set.name,
+        "value": value,
+        "unit": record_set.unit,
+        "note": note,
+        "timestamp": format_timestamp(micros, offset),
+        "ts": micros,
+        "tz": offset,
+    }
+
+
+def validate_rows(
+    rows: list[Any], record_sets: dict[str, RecordSet]
+) -> list[tuple[int, dict[str, Any]]]:
+    """Check every row before any is imported.
+
+    Returns (epoch microseconds, record dict) pairs in input order.  Raises
+    ``InvalidImport`` listing the first invalid rows (numbered from 1) if
+    any row is invalid.
+    """
+    valid: list[tuple[int, dict[str, Any]]] = []
+    errors: list[dict[str, Any]] = []
+    invalid = 0
+    for number, row in enumerate(rows, 1):
+        try:
+            valid.append(_validate_row(row, record_sets))
+        except (TypeError, ValueError) as err:
+            invalid += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({"row": number, "error": str(err)})
+    if invalid:
+        raise InvalidImport(errors, invalid)
+    return valid
+
+
+async def async_import(
+    hass: HomeAssistant,
+    coordinator: HealthRecordCoordinator,
+    rows: list[Any] | None,
+    content: str | None,
+    import_format: str,
+    dedupe: bool,
+) -> dict[str, int]:
+    """Parse and validate import data in the executor, then import it.
+
+    Takes either ``rows`` or ``content`` text in ``import_format``.
+    Nothing is imported if any row is invalid (``InvalidImport``).
+    """
+    if content is not None:
+        rows = await hass.async_add_executor_job(parse_content, content, import_format)
+    records = await hass.async_add_executor_job(
+        validate_rows, rows or [], dict(coordinator.record_sets)
+    )
+    return await coordinator.async_import_records(records, dedupe)
@@ -0,0 +1,197 @@
+"""Migration of v1 Ha Health Record storage to the v2 layout.
+
+v1 kept separate ``activity_sets``/``growth_sets`` and
+``activity_records``/``growth_records``; v2 unifies them into
+``record_sets`` and one record history.
+
+The record set states are small and converted up front.  The records are
+converted as a stream: both v1 lists are merged by timestamp and handed
+out in chunks, each chunk converted in the executor.  Records without an
+id get one derived from their position, and repeated ids one derived
+from their occurrence, so a migration that is interrupted and run again
+assigns the same ids.
+
+Until the migration is done, reads are answered from the v1 data itself:
+``v1_records`` converts the records of a time range, with the journal
+entries logged since applied, into a temporary ``RecordStore``.
+"""
+from __future__ import annotations
+
+import heapq
+import itertools
+import logging
+import uuid
+from collections import Counter
+from collections.abc import Iterator
+from typing import Any
+
+from .record_store import RecordStore, parse_timestamp, record_time
+from .rollups import DayBuckets, compute_days
+from .storage import OP_ADD, OP_DELETE, OP_UPDATE, partition_key
+
+_LOGGER = logging.getLogger(__name__)
+
+MIGRATION_CHUNK_SIZE = 5_000  # records converted per executor job
+
+# Namespace of the ids given to v1 records that had none
+_V1_ID_NAMESPACE = uuid.UUID("8b0f7c62-5a43-4f4e-9a53-0d3c7b1e2f61")
+
+# (v1 list, type key, name key, value key) per v1 record kind
+_V1_KINDS = (
+    ("activity_records", "activity_type", "activity_name", "amount"),
+    ("growth_records", "growth_type", "growth_name", "value"),
+)
+
+
+def is_v1(data: dict[str, Any]) -> bool:
+    """Return whether snapshot data is in the v1 format."""
+    return "activity_sets" in data or "growth_sets" in data
+
+
+def v1_record_count(data: dict[str, Any]) -> int:
+    """Return the number of v1 records to migrate."""
+    return sum(len(data.get(kind[0]) or []) for kind in _V1_KINDS)
+
+
+def migrate_v1_states(data: dict[str, Any]) -> dict[str, Any]:
+    """Return the v2 record set states of v1 data."""
+    migrated_record_sets: dict[str, Any] = {}
+
+    # Migrate activity_sets state
+    for type_id, aset_data in data.get("activity_sets", {}).items():
+        migrated_record_sets[type_id] = {
+            "current_value": aset_data.get("current_amount"),
+            "current_note": aset_data.get("current_note", ""),
+            "last_record": {},
+        }
+        if aset_data.get("last_record"):
+            lr = aset_data["last_record"]
+            migrated_record_sets[type_id]["last_record"] = {
+                "value": lr.get("amount"),
+                "note": lr.get("note", ""),
+                "timestamp": lr.get("timestamp"),
+            }
+
+    # Migrate growth_sets state
+    for type_id, gset_data in data.get("growth_sets", {}).items():
+        migrated_record_sets[type_id] = {
+            "current_value": gset_data.get("current_value"),
+            "current_note": gset_data.get("current_note", ""),
+            "last_record": {},
+        }
+        if gset_data.get("last_record"):
+            lr = gset_data["last_record"]
+            migrated_record_sets[type_id]["last_record"] = {
+                "value": lr.get("value"),
+                "note": lr.get("note", ""),
+                "timestamp": lr.get("timestamp"),
+            }
+
+    return migrated_record_sets
+
+
+def _v1_rows(
+    records: list[dict[str, Any]],
+    kind: tuple[str, str, str, str],
+    member_id: str,
+) -> Iterator[dict[str, Any]]:
+    """Convert the v1 records of one kind to v2 rows, skipping invalid ones."""
+    list_key, type_key, name_key, value_key = kind
+    for index, rec in enumerate(records):
+        try:
+            micros, offset = parse_timestamp(rec["timestamp"])
+        except (KeyError, TypeError, ValueError):
+            _LOGGER.warning(
+                "Skipping v1 record with invalid timestamp: %s", rec.get("timestamp")
+            )
+            continue
+        yield {
+            "id": rec.get("id")
+            or uuid.uuid5(_V1_ID_NAMESPACE, f"{member_id}/{list_key}/{index}").hex,
+            "record_type": rec.get(type_key, ""),
+            "record_name": rec.get(name_key, ""),
+            "value": rec.get(value_key),
+            "unit": rec.get("unit", ""),
+            "note": rec.get("note", ""),
+            "timestamp": rec["timestamp"],
+            "ts": micros,
+            "tz": offset,
+        }
+
+
+def v1_record_stream(
+    data: dict[str, Any], member_id: str
+) -> Iterator[dict[str, Any]]:
+    """Return the v1 records as one stream of v2 rows ordered by timestamp.
+
+    Each v1 list was appended in logging order, so the lists are merged
+    in linear time; records logged back-dated only make the stream less
+    than perfectly ordered, which ``RecordStore.insert_many`` tolerates.
+    Repeated ids are replaced by ones derived from the id and its
+    occurrence.  Advanced by ``next_chunk`` only.
+    """
+    seen: Counter[str] = Counter()
+    for row in heapq.merge(
+        *(_v1_rows(data.get(kind[0]) or [], kind, member_id) for kind in _V1_KINDS),
+        key=lambda row: row["ts"],
+    ):
+        v1_id = row["id"]
+        if occurrence := seen[v1_id]:
+            row["id"] = uuid.uuid5(
+                _V1_ID_NAMESPACE, f"{member_id}/dup/{v1_id}/{occurrence}"
+            ).hex
+        seen[v1_id] += 1
+        yield row
+
+
+def next_chunk(
+    stream: Iterator[dict[str, Any]],
+) -> tuple[list[dict[str, Any]], dict[str, DayBuckets]]:
+    """Return the next rows of a v1 stream and their rollups by partition.
+
+    Runs in the executor; empty rows mean the stream is exhausted.
+    """
+    rows = list(itertools.islice(stream, MIGRATION_CHUNK_SIZE))
+    samples: dict[str, list[tuple[int, str, float | None]]] = {}
+    for row in rows:
+        samples.setdefault(partition_key(row["ts"]), []).append(
+            (row["ts"], row["record_type"], row["value"])
+        )
+    return rows, {
+        key: compute_days(key_samples) for key, key_samples in samples.items()
+    }
+
+
+def v1_records(
+    data: dict[str, Any],
+    member_id: str,
+    journal: list[dict[str, Any]],
+    start: int,
+    end: int,
+) -> RecordStore:
+    """Return the v1 records in [start, end) epoch microseconds, as stored.
+
+    Journal entries are applied on top, as the migration replays them
+    once it is done.  Runs in the executor; every call reads all v1
+    records, as v1 reads did.
+    """
+    rows = {
+        row["id"]: row
+        for row in v1_record_stream(data, member_id)
+        if start <= row["ts"] < end
+    }
+    for entry in journal:
+        try:
+            op = entry["op"]
+            if op in (OP_ADD, OP_UPDATE):
+                record = entry["record"]
+                rows.pop(record["id"], None)
+                if start <= record_time(record)[0] < end:
+                    rows[record["id"]] = record
+            elif op == OP_DELETE:
+                rows.pop(entry["id"], None)
+        except (KeyError, TypeError, ValueError):
+            continue
+    records = RecordStore()
+    records.insert_many(rows.values())
+    return records
@@ -5,11 +5,13 @@ import logging
 
 from homeassistant.components.number import NumberEntity, NumberMode
 from homeassistant.const import EntityCategory
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from . import HaHealthRecordConfigEntry
-from .coordinator import HealthRecordCoordinator
+from .coordinator import RecordSet, signal_record_set_added
+from .entity import RecordSetEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -34,33 +36,36 @@ async def async_setup_entry(
 
     async_add_entities(entities)
 
+    @callback
+    def async_add_record_set(type_id: str) -> None:
+        """Add the number entity of a record set added at runtime."""
+        async_add_entities(
+            [RecordValueNumber(coordinator=coordinator, type_id=type_id)]
+        )
+
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, signal_record_set_added(coordinator.member_id), async_add_record_set
+        )
+    )
+
 
-class RecordValueNumber(NumberEntity):
+class RecordValueNumber(RecordSetEntity, NumberEntity):
     """Number entity for record value input."""
 
     _attr_entity_category = EntityCategory.CONFIG
-    _attr_has_entity_name = True
     _attr_mode = NumberMode.BOX
     _attr_native_min_value = 0
     _attr_native_max_value = 10000
     _attr_native_step = 0.1
     _attr_translation_key = "record_value"
+    _attr_icon = "mdi:numeric"
+    _unique_id_suffix = "value"
 
-    def __init__(
-        self,
-        coordinator: HealthRecordCoordinator,
-        type_id: str,
-    ) -> None:
-        """Initialize the number entity."""
-        self._coordinator = coordinator
-        self._type_id = type_id
-        record_set = coordinator.get_record_set(type_id)
-
-        self._attr_unique_id = f"{coordinator.member_id}_{type_id}_value"
-        self._attr_translation_placeholders = {"record_name": record_set.name}
+    def _apply_record_set(self, record_set: RecordSet) -> None:
+        """Take over the name and unit of the record set."""
+        super()._apply_record_set(record_set)
         self._attr_native_unit_of_measurement = record_set.unit
-        self._attr_device_info = coordinator.get_device_info()
-        self._attr_icon = "mdi:numeric"
 
     @property
     def native_value(self) -> float | None:
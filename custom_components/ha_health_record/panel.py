@@ -1,22 +1,33 @@
 """Panel registration and WebSocket API for Ha Health Record."""
 from __future__ import annotations
 
+import base64
 import csv
+import heapq
 import io
+import itertools
 import logging
 import math
+import re
 import time
+import uuid
 from datetime import datetime
+from http import HTTPStatus
 from pathlib import Path
 from typing import Any
+from urllib.parse import quote
 
 import voluptuous as vol
+from aiohttp import hdrs, web
 
 from homeassistant.components import websocket_api, frontend, panel_custom
-from homeassistant.components.http import StaticPathConfig
-from homeassistant.config_entries import ConfigEntryState
+from homeassistant.components.websocket_api.messages import construct_result_message
+from homeassistant.components.http import KEY_HASS, HomeAssistantView, StaticPathConfig
+from homeassistant.config_entries import ConfigEntry, ConfigEntryState
 from homeassistant.core import HomeAssistant, callback
-from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.json import json_bytes, json_dumps
+from homeassistant.util.json import json_loads
 
 from .const import (
     CONF_RECORD_NAME,
@@ -24,9 +35,19 @@ from .const import (
     CONF_RECORD_TYPE,
     CONF_RECORD_UNIT,
     DOMAIN,
-    EVENT_RECORD_LOGGED,
 )
-from .coordinator import HealthRecordCoordinator
+from .coordinator import (
+    CHANGE_UPDATE,
+    SIGNAL_RECORDS_CHANGED,
+    HealthRecordCoordinator,
+    RecordPosition,
+    async_get_members,
+    async_members_revision,
+)
+from .export import FORMAT_CSV, FORMAT_EXTENSIONS, async_bulk_export, export_dir
+from .importer import IMPORT_CSV, IMPORT_FORMATS, InvalidImport, async_import
+from .record_store import datetime_to_micros, parse_timestamp
+from .rollups import PERIODS
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -36,13 +57,39 @@ PANEL_URL_PATH = "ha-health-record"  # URL path for the panel in sidebar
 PANEL_COMPONENT_NAME = "ha-health-record-panel"  # Web component name
 FRONTEND_SCRIPT_PATH = f"/{DOMAIN}/frontend"  # Static path for JS files
 
+# Finished bulk exports are downloaded from <url>/<export id>.<extension>
+BULK_EXPORT_URL = "/api/ha_health_record/bulk_export"
+_EXPORT_FILENAME = re.compile(
+    rf"[0-9a-f]{{32}}\.(?:{'|'.join(FORMAT_EXTENSIONS.values())})"
+)
+
+# Fields of a get_records entry, selectable with "fields"
+RECORD_FIELDS = (
+    "member_id",
+    "member_name",
+    "record_type",
+    "record_name",
+    "value",
+    "unit",
+    "note",
+    "timestamp",
+    "id",
+)
+
 
 @callback
 def register_websocket_commands(hass: HomeAssistant) -> None:
-    """Register all WebSocket commands (call once, not per entry)."""
+    """Register all WebSocket commands and HTTP views (call once, not per entry)."""
+    hass.http.register_view(HealthRecordExportView())
+    hass.http.register_view(BulkExportView())
     websocket_api.async_register_command(hass, ws_get_members)
     websocket_api.async_register_command(hass, ws_get_records)
+    websocket_api.async_register_command(hass, ws_get_aggregates)
+    websocket_api.async_register_command(hass, ws_get_series)
+    websocket_api.async_register_command(hass, ws_subscribe_records)
     websocket_api.async_register_command(hass, ws_log_record)
+    websocket_api.async_register_command(hass, ws_log_records)
+    websocket_api.async_register_command(hass, ws_import_records)
     websocket_api.async_register_command(hass, ws_update_record)
     websocket_api.async_register_command(hass, ws_delete_record)
     websocket_api.async_register_command(hass, ws_add_record_type)
@@ -52,6 +99,7 @@ def register_websocket_commands(hass: HomeAssistant) -> None:
     websocket_api.async_register_command(hass, ws_update_member)
     websocket_api.async_register_command(hass, ws_delete_member)
     websocket_api.async_register_command(hass, ws_export_csv)
+    websocket_api.async_register_command(hass, ws_bulk_export)
 
 
 async def async_setup_panel(hass: HomeAssistant) -> None:
@@ -91,6 +139,10 @@ async def async_unload_panel(hass: HomeAssistant) -> None:
         _LOGGER.info("Unregistered Ha Health Record panel")
 
 
+# Seconds a record type's sensor folds bursts of updates over (0 = off)
+COALESCE_WINDOW = vol.All(vol.Coerce(float), vol.Range(min=0, max=3600))
+
+
 def valid_float(value: Any) -> float:
     """Validate float, rejecting NaN and Infinity."""
     result = vol.Coerce(float)(value)
@@ -100,22 +152,28 @@ def valid_float(value: Any) -> float:
 
 
 def _get_coordinators(hass: HomeAssistant) -> list[HealthRecordCoordinator]:
-    """Get all coordinators from loaded config entries."""
-    coordinators: list[HealthRecordCoordinator] = []
-    for entry in hass.config_entries.async_entries(DOMAIN):
-        if entry.state is ConfigEntryState.LOADED:
-            coordinators.append(entry.runtime_data)
-    return coordinators
+    """Get the coordinators of all members whose data is loaded."""
+    return [
+        coordinator
+        for coordinator in async_get_members(hass).values()
+        if coordinator.loaded
+    ]
 
 
 def _find_coordinator(
     hass: HomeAssistant, member_id: str
 ) -> HealthRecordCoordinator | None:
-    """Find a coordinator by member_id."""
-    for coord in _get_coordinators(hass):
-        if coord.member_id == member_id:
-            return coord
-    return None
+    """Find a coordinator by member_id, if its data is loaded."""
+    coordinator = async_get_members(hass).get(member_id)
+    return coordinator if coordinator is not None and coordinator.loaded else None
+
+
+def _find_entry(hass: HomeAssistant, member_id: str) -> ConfigEntry | None:
+    """Find a member's config entry, loaded or not."""
+    if (coordinator := async_get_members(hass).get(member_id)) is not None:
+        return coordinator.entry
+    # Entries that failed to load are found by their unique ID (the member_id)
+    return hass.config_entries.async_entry_for_domain_unique_id(DOMAIN, member_id)
 
 
 # ============================================================================
@@ -126,6 +184,7 @@ def _find_coordinator(
 @websocket_api.websocket_command(
     {
         vol.Required("type"): "ha_health_record/get_members",
+        vol.Optional("since_revision"): vol.Coerce(int),
     }
 )
 @callback
@@ -134,38 +193,62 @@ def ws_get_members(
     connection: websocket_api.ActiveConnection,
     msg: dict[str, Any],
 ) -> None:
-    """Handle get_members WebSocket command."""
-    members = []
-
-    for coordinator in _get_coordinators(hass):
-        member = {
-            "id": coordinator.member_id,
-            "name": coordinator.member_name,
-            "note": coordinator.entry.data.get("note", ""),
-            "record_sets": [
-                {
-                    "type": s.type_id,
-                    "name": s.name,
-                    "unit": s.unit,
-                    "default_value": s.default_value,
-                    "default_value_mode": s.default_value_mode,
-                    "current_value": s.current_value,
-                    "last_record": {
-                        "value": s.last_record.value,
-                        "note": s.last_record.note,
-                        "timestamp": (
-                            s.last_record.timestamp.isoformat()
-                            if s.last_record.timestamp
-                            else None
-                        ),
-                    } if s.last_record else None,
-                }
-                for s in coordinator.record_sets.values()
-            ],
-        }
-        members.append(member)
+    """Handle get_members WebSocket command.
+
+    With ``since_revision`` (the ``revision`` of an earlier reply) only the
+    members changed since then are sent, along with the ids of all members
+    so that removed ones can be dropped; ``not_modified`` is set instead if
+    nothing changed.  Each member's entry is serialized once per revision.
+    """
+    coordinators = _get_coordinators(hass)
+    revision = async_members_revision(hass)
+    since = msg.get("since_revision")
+
+    if since is None:
+        changed = coordinators
+    elif since >= revision:
+        connection.send_message(
+            construct_result_message(
+                msg["id"],
+                json_bytes({"revision": revision, "not_modified": True}),
+            )
+        )
+        return
+    else:
+        changed = [c for c in coordinators if c.revision > since]
+
+    parts = [b'{"revision":', str(revision).encode()]
+    if since is not None:
+        parts += [
+            b',"member_ids":',
+            json_bytes([c.member_id for c in coordinators]),
+        ]
+    parts += [
+        b',"members":[',
+        b",".join(c.member_json() for c in changed),
+        b"]}",
+    ]
+    connection.send_message(construct_result_message(msg["id"], b"".join(parts)))
 
-    connection.send_result(msg["id"], {"members": members})
+
+def _encode_cursor(position: RecordPosition) -> str:
+    """Return the opaque cursor for a record position."""
+    return base64.urlsafe_b64encode(json_dumps(position).encode()).decode()
+
+
+def _valid_cursor(value: Any) -> RecordPosition:
+    """Validate a cursor, returning its record position."""
+    try:
+        micros, member_id, record_id = json_loads(base64.urlsafe_b64decode(value))
+    except (TypeError, ValueError) as err:
+        raise vol.Invalid("Invalid cursor") from err
+    if not (
+        isinstance(micros, int)
+        and isinstance(member_id, str)
+        and isinstance(record_id, str)
+    ):
+        raise vol.Invalid("Invalid cursor")
+    return micros, member_id, record_id
 
 
 @websocket_api.websocket_command(
@@ -173,10 +256,15 @@ def ws_get_members(
         vol.Required("type"): "ha_health_record/get_records",
         vol.Required("start_time"): str,
         vol.Required("end_time"): str,
+        vol.Optional("limit"): vol.All(int, vol.Range(min=1, max=10_000)),
+        vol.Optional("cursor"): _valid_cursor,
+        vol.Optional("member_id"): str,
+        vol.Optional("record_types"): [str],
+        vol.Optional("fields"): [vol.In(RECORD_FIELDS)],
     }
 )
-@callback
-def ws_get_records(
+@websocket_api.async_response
+async def ws_get_records(
     hass: HomeAssistant,
     connection: websocket_api.ActiveConnection,
     msg: dict[str, Any],
@@ -189,65 +277,464 @@ def ws_get_records(
         connection.send_error(msg["id"], "invalid_date", "Invalid date format")
         return
 
-    records = []
+    after: RecordPosition | None = msg.get("cursor")
+    coordinators = _get_coordinators(hass)
+    if (member_id := msg.get("member_id")) is not None:
+        coordinator = _find_coordinator(hass, member_id)
+        if coordinator is None:
+            connection.send_error(
+                msg["id"], "member_not_found", f"Member {member_id} not found"
+            )
+            return
+        coordinators = [coordinator]
+
+    limit = msg.get("limit")
+    type_ids = set(msg["record_types"]) if "record_types" in msg else None
+
+    # Each member's page is already newest first; merge them k-way
+    pages = [
+        await coordinator.async_get_records_page(
+            start_time,
+            end_time,
+            # One extra entry tells whether another page follows
+            None if limit is None else limit + 1,
+            after,
+            type_ids,
+        )
+        for coordinator in coordinators
+    ]
+    merged = heapq.merge(*pages, key=lambda item: item[0], reverse=True)
+    page = list(merged if limit is None else itertools.islice(merged, limit + 1))
 
-    # Get records from all coordinators
-    for coordinator in _get_coordinators(hass):
-        coordinator_records = coordinator.get_records_in_range(start_time, end_time)
-        records.extend(coordinator_records)
+    next_cursor = None
+    if limit is not None and len(page) > limit:
+        page = page[:limit]
+        next_cursor = _encode_cursor(page[-1][0])
 
-    # Sort by timestamp descending
-    records.sort(key=lambda x: x["timestamp"], reverse=True)
+    if fields := msg.get("fields"):
+        records = [{field: entry[field] for field in fields} for _, entry in page]
+    else:
+        records = [entry for _, entry in page]
 
-    connection.send_result(msg["id"], {"records": records})
+    connection.send_result(msg["id"], {"records": records, "next_cursor": next_cursor})
 
 
 @websocket_api.websocket_command(
     {
-        vol.Required("type"): "ha_health_record/export_csv",
+        vol.Required("type"): "ha_health_record/get_aggregates",
+        vol.Required("start_time"): str,
+        vol.Required("end_time"): str,
+        vol.Required("period"): vol.In(PERIODS),
+        vol.Optional("member_id"): str,
+        vol.Optional("record_types"): [str],
+    }
+)
+@websocket_api.async_response
+async def ws_get_aggregates(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Handle get_aggregates WebSocket command."""
+    try:
+        start_time = datetime.fromisoformat(msg["start_time"].replace('Z', '+00:00'))
+        end_time = datetime.fromisoformat(msg["end_time"].replace('Z', '+00:00'))
+    except ValueError:
+        connection.send_error(msg["id"], "invalid_date", "Invalid date format")
+        return
+
+    coordinators = _get_coordinators(hass)
+    if (member_id := msg.get("member_id")) is not None:
+        coordinator = _find_coordinator(hass, member_id)
+        if coordinator is None:
+            connection.send_error(
+                msg["id"], "member_not_found", f"Member {member_id} not found"
+            )
+            return
+        coordinators = [coordinator]
+
+    aggregates = []
+    for coordinator in coordinators:
+        aggregates.extend(
+            await coordinator.async_get_aggregates(
+                start_time, end_time, msg["period"], msg.get("record_types")
+            )
+        )
+
+    connection.send_result(msg["id"], {"aggregates": aggregates})
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "ha_health_record/get_series",
         vol.Required("member_id"): str,
+        vol.Required("record_type"): str,
+        vol.Required("start_time"): str,
+        vol.Required("end_time"): str,
+        vol.Optional("points", default=500): vol.All(int, vol.Range(min=3, max=10_000)),
     }
 )
-@callback
-def ws_export_csv(
+@websocket_api.async_response
+async def ws_get_series(
     hass: HomeAssistant,
     connection: websocket_api.ActiveConnection,
     msg: dict[str, Any],
 ) -> None:
-    """Handle export_csv WebSocket command."""
+    """Handle get_series WebSocket command."""
     member_id = msg["member_id"]
+    record_type = msg["record_type"]
+
+    try:
+        start_time = datetime.fromisoformat(msg["start_time"].replace('Z', '+00:00'))
+        end_time = datetime.fromisoformat(msg["end_time"].replace('Z', '+00:00'))
+    except ValueError:
+        connection.send_error(msg["id"], "invalid_date", "Invalid date format")
+        return
 
     coordinator = _find_coordinator(hass, member_id)
     if coordinator is None:
-        connection.send_error(msg["id"], "member_not_found", f"Member {member_id} not found")
+        connection.send_error(
+            msg["id"], "member_not_found", f"Member {member_id} not found"
+        )
+        return
+
+    series = await coordinator.async_get_series(
+        record_type, start_time, end_time, msg["points"]
+    )
+    record_set = coordinator.get_record_set(record_type)
+    connection.send_result(msg["id"], {
+        "member_id": coordinator.member_id,
+        "record_type": record_type,
+        "record_name": record_set.name if record_set else record_type,
+        "unit": record_set.unit if record_set else "",
+        **series,
+    })
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "ha_health_record/subscribe_records",
+        vol.Optional("member_ids"): [str],
+        vol.Optional("record_types"): [str],
+        vol.Optional("start_time"): str,
+        vol.Optional("end_time"): str,
+    }
+)
+@callback
+def ws_subscribe_records(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Handle subscribe_records WebSocket command.
+
+    Sends an event ``{"action": "add" | "update" | "delete", "records":
+    [...]}`` with get_records entries whenever matching records change.
+    An update is sent when the record's new or previous timestamp is in
+    range, so clients can drop records that moved out of it.  Members
+    added or reloaded later are covered as well.
+    """
+    try:
+        start = (
+            datetime_to_micros(
+                datetime.fromisoformat(msg["start_time"].replace('Z', '+00:00'))
+            )
+            if "start_time" in msg
+            else None
+        )
+        end = (
+            datetime_to_micros(
+                datetime.fromisoformat(msg["end_time"].replace('Z', '+00:00'))
+            )
+            if "end_time" in msg
+            else None
+        )
+    except ValueError:
+        connection.send_error(msg["id"], "invalid_date", "Invalid date format")
         return
+    member_ids = set(msg["member_ids"]) if "member_ids" in msg else None
+    type_ids = set(msg["record_types"]) if "record_types" in msg else None
+
+    def in_range(timestamp: str) -> bool:
+        micros = parse_timestamp(timestamp)[0]
+        return (start is None or micros >= start) and (end is None or micros <= end)
+
+    @callback
+    def forward_changes(action: str, entries: list[dict[str, Any]]) -> None:
+        matching = [
+            entry
+            for entry in entries
+            if (member_ids is None or entry["member_id"] in member_ids)
+            and (type_ids is None or entry["record_type"] in type_ids)
+            and (
+                in_range(entry["timestamp"])
+                or (
+                    action == CHANGE_UPDATE
+                    and in_range(entry["previous_timestamp"])
+                )
+            )
+        ]
+        if matching:
+            connection.send_message(websocket_api.event_message(
+                msg["id"], {"action": action, "records": matching}
+            ))
+
+    connection.subscriptions[msg["id"]] = async_dispatcher_connect(
+        hass, SIGNAL_RECORDS_CHANGED, forward_changes
+    )
+    connection.send_result(msg["id"])
 
-    records = list(coordinator.records)
-    records.sort(key=lambda r: r.get("timestamp", ""))
 
+CSV_HEADER = ["timestamp", "record_type", "record_name", "value", "unit", "note"]
+
+
+def _csv_chunk(
+    records: list[dict[str, Any]], labels: dict[str, tuple[str, str]]
+) -> str:
+    """Serialize records as CSV rows (runs in the executor)."""
     output = io.StringIO()
     writer = csv.writer(output)
-    writer.writerow(["timestamp", "record_type", "record_name", "value", "unit", "note"])
-
     for record in records:
-        type_id = record.get("record_type", "")
-        rs = coordinator.record_sets.get(type_id)
+        type_id = record["record_type"]
+        name, unit = labels.get(type_id) or (
+            record["record_name"] or type_id,
+            record["unit"],
+        )
         writer.writerow([
-            record.get("timestamp", ""),
+            record["timestamp"],
             type_id,
-            rs.name if rs else record.get("record_name", type_id),
-            record.get("value", ""),
-            rs.unit if rs else record.get("unit", ""),
-            record.get("note", ""),
+            name,
+            record["value"],
+            unit,
+            record["note"],
         ])
+    return output.getvalue()
+
+
+def _csv_labels(coordinator: HealthRecordCoordinator) -> dict[str, tuple[str, str]]:
+    """Return the current (name, unit) of each configured record type."""
+    return {
+        type_id: (rs.name, rs.unit)
+        for type_id, rs in coordinator.record_sets.items()
+    }
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "ha_health_record/export_csv",
+        vol.Required("member_id"): str,
+    }
+)
+@websocket_api.async_response
+async def ws_export_csv(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Handle export_csv WebSocket command."""
+    member_id = msg["member_id"]
+
+    coordinator = _find_coordinator(hass, member_id)
+    if coordinator is None:
+        connection.send_error(msg["id"], "member_not_found", f"Member {member_id} not found")
+        return
+
+    # Kept for API clients; the panel uses the streaming HealthRecordExportView
+    header = io.StringIO()
+    csv.writer(header).writerow(CSV_HEADER)
+    chunks = [header.getvalue()]
+
+    # Partitions are visited oldest first, each already ordered by timestamp
+    record_count = 0
+    async for records in coordinator.async_iter_records():
+        chunks.append(
+            await hass.async_add_executor_job(
+                _csv_chunk, records, _csv_labels(coordinator)
+            )
+        )
+        record_count += len(records)
 
     connection.send_result(msg["id"], {
-        "csv_content": output.getvalue(),
+        "csv_content": "".join(chunks),
         "member_name": coordinator.member_name,
-        "record_count": len(records),
+        "record_count": record_count,
     })
 
 
+# ============================================================================
+# Streaming Export
+# ============================================================================
+
+
+class HealthRecordExportView(HomeAssistantView):
+    """Stream a member's full history as a CSV download.
+
+    Records are read one storage partition at a time and serialized in the
+    executor, so memory use does not grow with the size of the history.
+    """
+
+    url = "/api/ha_health_record/export/{member_id}"
+    name = "api:ha_health_record:export"
+
+    async def get(self, request: web.Request, member_id: str) -> web.StreamResponse:
+        """Stream the CSV export of a member."""
+        hass: HomeAssistant = request.app[KEY_HASS]
+        coordinator = _find_coordinator(hass, member_id)
+        if coordinator is None:
+            return self.json_message(
+                f"Member {member_id} not found", HTTPStatus.NOT_FOUND
+            )
+
+        # Counted like the export reads, from the v1 data during a migration
+        record_count = await coordinator.async_count_entries()
+        filename = f"health_record_{coordinator.member_name}.csv"
+        response = web.StreamResponse(
+            headers={
+                hdrs.CONTENT_TYPE: "text/csv; charset=utf-8",
+                hdrs.CONTENT_DISPOSITION: (
+                    f"attachment; filename*=UTF-8''{quote(filename)}"
+                ),
+                "X-Record-Count": str(record_count),
+            }
+        )
+        await response.prepare(request)
+
+        # UTF-8 BOM for Excel CJK compatibility
+        header = io.StringIO()
+        csv.writer(header).writerow(CSV_HEADER)
+        await response.write(("\ufeff" + header.getvalue()).encode())
+
+        async for records in coordinator.async_iter_records():
+            chunk = await hass.async_add_executor_job(
+                _csv_chunk, records, _csv_labels(coordinator)
+            )
+            await response.write(chunk.encode())
+
+        await response.write_eof()
+        return response
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "ha_health_record/bulk_export",
+        vol.Optional("member_ids"): [str],
+        vol.Optional("record_types"): [str],
+        vol.Optional("start_time"): str,
+        vol.Optional("end_time"): str,
+        vol.Optional("format", default=FORMAT_CSV): vol.In(list(FORMAT_EXTENSIONS)),
+    }
+)
+@websocket_api.async_response
+async def ws_bulk_export(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Handle bulk_export WebSocket command.
+
+    Replies with the export id right away, then sends ``progress`` events
+    and finally a ``done`` event with the download URL (or ``error``).
+    """
+    try:
+        start_time = (
+            datetime.fromisoformat(msg["start_time"].replace('Z', '+00:00'))
+            if "start_time" in msg
+            else None
+        )
+        end_time = (
+            datetime.fromisoformat(msg["end_time"].replace('Z', '+00:00'))
+            if "end_time" in msg
+            else None
+        )
+    except ValueError:
+        connection.send_error(msg["id"], "invalid_date", "Invalid date format")
+        return
+
+    coordinators = _get_coordinators(hass)
+    if "member_ids" in msg:
+        member_ids = msg["member_ids"]
+        if missing := set(member_ids) - {c.member_id for c in coordinators}:
+            connection.send_error(
+                msg["id"], "member_not_found", f"Members {sorted(missing)} not found"
+            )
+            return
+        coordinators = [c for c in coordinators if c.member_id in member_ids]
+
+    record_types = set(msg["record_types"]) if "record_types" in msg else None
+    export_id = uuid.uuid4().hex
+    filename = f"{export_id}.{FORMAT_EXTENSIONS[msg['format']]}"
+    total = 0
+    for coordinator in coordinators:
+        total += await coordinator.async_count_entries(
+            start_time, end_time, record_types
+        )
+
+    @callback
+    def send_progress(exported: int) -> None:
+        connection.send_message(websocket_api.event_message(
+            msg["id"], {"event": "progress", "exported": exported, "total": total}
+        ))
+
+    async def run_export() -> None:
+        try:
+            exported = await async_bulk_export(
+                hass,
+                coordinators,
+                filename,
+                msg["format"],
+                start_time,
+                end_time,
+                record_types,
+                send_progress,
+            )
+        except OSError as err:
+            _LOGGER.exception("Bulk export %s failed", export_id)
+            connection.send_message(websocket_api.event_message(
+                msg["id"], {"event": "error", "message": str(err)}
+            ))
+            return
+        connection.send_message(websocket_api.event_message(
+            msg["id"],
+            {
+                "event": "done",
+                "exported": exported,
+                "filename": filename,
+                "url": f"{BULK_EXPORT_URL}/{filename}",
+            },
+        ))
+
+    task = hass.async_create_background_task(
+        run_export(), f"{DOMAIN} bulk export {export_id}"
+    )
+    # Closing the connection or unsubscribing cancels a running export
+    connection.subscriptions[msg["id"]] = task.cancel
+    connection.send_result(msg["id"], {"export_id": export_id, "total": total})
+
+
+class BulkExportView(HomeAssistantView):
+    """Download a finished bulk export."""
+
+    url = BULK_EXPORT_URL + "/{filename}"
+    name = "api:ha_health_record:bulk_export"
+
+    async def get(self, request: web.Request, filename: str) -> web.StreamResponse:
+        """Return a bulk export file."""
+        if not _EXPORT_FILENAME.fullmatch(filename):
+            return self.json_message("Invalid export", HTTPStatus.BAD_REQUEST)
+        hass: HomeAssistant = request.app[KEY_HASS]
+        path = export_dir(hass) / filename
+        if not await hass.async_add_executor_job(path.is_file):
+            return self.json_message("Export not found", HTTPStatus.NOT_FOUND)
+        return web.FileResponse(
+            path,
+            headers={
+                hdrs.CONTENT_DISPOSITION: (
+                    f"attachment; filename=health_record_export.{path.suffix[1:]}"
+                )
+            },
+        )
+
+
 # ============================================================================
 # Record Logging API (unified)
 # ============================================================================
@@ -305,24 +792,148 @@ def ws_log_record(
         return
 
     # Fire event
-    record_set = coordinator.get_record_set(record_type)
-    hass.bus.async_fire(
-        EVENT_RECORD_LOGGED,
-        {
-            "member_id": coordinator.member_id,
-            "member_name": coordinator.member_name,
-            "record_type": record_type,
-            "record_name": record_set.name if record_set else record_type,
-            "value": record.value,
-            "unit": record_set.unit if record_set else "",
-            "note": record.note,
-            "timestamp": record.timestamp.isoformat() if record.timestamp else None,
-        },
-    )
+    coordinator.async_fire_record_logged(record_type, record)
 
     connection.send_result(msg["id"], {"success": True})
 
 
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "ha_health_record/log_records",
+        vol.Required("entries"): vol.All(
+            [
+                vol.Schema(
+                    {
+                        vol.Required("member_id"): str,
+                        vol.Required("record_type"): str,
+                        vol.Required("value"): valid_float,
+                        vol.Optional("note", default=""): str,
+                        vol.Optional("timestamp"): str,
+                    }
+                )
+            ],
+            vol.Length(min=1),
+        ),
+    }
+)
+@callback
+def ws_log_records(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Handle log_records WebSocket command.
+
+    Logs several records, possibly for several members, all or nothing:
+    every entry is checked before any is logged.  Each affected sensor
+    updates once, after all entries are applied, and the record logged
+    events follow.
+    """
+    batches: dict[str, list[tuple[str, float | None, str, datetime | None]]] = {}
+    coordinators: dict[str, HealthRecordCoordinator] = {}
+    for number, entry in enumerate(msg["entries"], 1):
+        member_id = entry["member_id"]
+        record_type = entry["record_type"]
+        if member_id not in coordinators:
+            coordinator = _find_coordinator(hass, member_id)
+            if coordinator is None:
+                connection.send_error(
+                    msg["id"],
+                    "member_not_found",
+                    f"Entry {number}: member {member_id} not found",
+                )
+                return
+            coordinators[member_id] = coordinator
+        if record_type not in coordinators[member_id].record_sets:
+            connection.send_error(
+                msg["id"],
+                "record_type_not_found",
+                f"Entry {number}: record type {record_type} not found",
+            )
+            return
+
+        custom_timestamp = None
+        if timestamp_str := entry.get("timestamp"):
+            try:
+                custom_timestamp = datetime.fromisoformat(
+                    timestamp_str.replace('Z', '+00:00')
+                )
+            except ValueError:
+                connection.send_error(
+                    msg["id"],
+                    "invalid_timestamp",
+                    f"Entry {number}: invalid timestamp format",
+                )
+                return
+
+        batches.setdefault(member_id, []).append(
+            (record_type, entry["value"], entry["note"], custom_timestamp)
+        )
+
+    logged = [
+        (coordinators[member_id], entries, coordinators[member_id].log_records(entries))
+        for member_id, entries in batches.items()
+    ]
+    for coordinator, entries, _ in logged:
+        coordinator.async_notify_updated(
+            dict.fromkeys(type_id for type_id, *_ in entries)
+        )
+    for coordinator, entries, records in logged:
+        for (record_type, *_), record in zip(entries, records, strict=True):
+            coordinator.async_fire_record_logged(record_type, record)
+
+    connection.send_result(msg["id"], {"success": True, "logged": len(msg["entries"])})
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "ha_health_record/import_records",
+        vol.Required("member_id"): str,
+        vol.Exclusive("records", "data"): [dict],
+        vol.Exclusive("content", "data"): str,  # CSV or NDJSON text
+        vol.Optional("format", default=IMPORT_CSV): vol.In(IMPORT_FORMATS),
+        vol.Optional("dedupe", default=True): bool,
+    }
+)
+@websocket_api.async_response
+async def ws_import_records(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Handle import_records WebSocket command.
+
+    Historical records are imported without firing log events.  If any
+    row is invalid nothing is imported and the error lists the bad rows.
+    """
+    coordinator = _find_coordinator(hass, msg["member_id"])
+    if coordinator is None:
+        connection.send_error(
+            msg["id"], "member_not_found", f"Member {msg['member_id']} not found"
+        )
+        return
+
+    try:
+        result = await async_import(
+            hass,
+            coordinator,
+            msg.get("records"),
+            msg.get("content"),
+            msg["format"],
+            msg["dedupe"],
+        )
+    except InvalidImport as err:
+        connection.send_error(
+            msg["id"],
+            "invalid_records",
+            f"{err}: "
+            + "; ".join(f"row {e['row']}: {e['error']}" for e in err.errors),
+        )
+        return
+
+    connection.send_result(msg["id"], result)
+
+
 # ============================================================================
 # Record Management APIs
 # ============================================================================
@@ -340,8 +951,8 @@ def ws_log_record(
         vol.Optional("new_timestamp"): str,  # New timestamp if editing time
     }
 )
-@callback
-def ws_update_record(
+@websocket_api.async_response
+async def ws_update_record(
     hass: HomeAssistant,
     connection: websocket_api.ActiveConnection,
     msg: dict[str, Any],
@@ -363,11 +974,19 @@ def ws_update_record(
     note = msg.get("note")
     new_timestamp = msg.get("new_timestamp")
 
-    if coordinator.update_record(
-        type_id, timestamp,
-        value=value, note=note, new_timestamp=new_timestamp,
-        record_id=record_id,
-    ):
+    try:
+        updated = await coordinator.async_update_record(
+            type_id, timestamp,
+            value=value, note=note, new_timestamp=new_timestamp,
+            record_id=record_id,
+        )
+    except ValueError:
+        connection.send_error(
+            msg["id"], "invalid_timestamp", "Invalid timestamp format"
+        )
+        return
+
+    if updated:
         connection.send_result(msg["id"], {"success": True})
     else:
         connection.send_error(msg["id"], "record_not_found", "Record not found")
@@ -382,8 +1001,8 @@ def ws_update_record(
         vol.Optional("record_id"): str,  # UUID -- preferred over timestamp
     }
 )
-@callback
-def ws_delete_record(
+@websocket_api.async_response
+async def ws_delete_record(
     hass: HomeAssistant,
     connection: websocket_api.ActiveConnection,
     msg: dict[str, Any],
@@ -400,7 +1019,7 @@ def ws_delete_record(
         connection.send_error(msg["id"], "member_not_found", f"Member {member_id} not found")
         return
 
-    if coordinator.delete_record(type_id, timestamp, record_id=record_id):
+    if await coordinator.async_delete_record(type_id, timestamp, record_id=record_id):
         connection.send_result(msg["id"], {"success": True})
     else:
         connection.send_error(msg["id"], "record_not_found", "Record not found")
@@ -419,6 +1038,7 @@ def ws_delete_record(
         vol.Required("unit"): str,
         vol.Optional("default_value", default=0): valid_float,
         vol.Optional("default_value_mode", default="fixed"): vol.In(["fixed", "last_value"]),
+        vol.Optional("coalesce_window", default=0): COALESCE_WINDOW,
     }
 )
 @websocket_api.async_response
@@ -442,11 +1062,7 @@ async def ws_add_record_type(
         return
 
     # Find the config entry for this member
-    entry = None
-    for e in hass.config_entries.async_entries(DOMAIN):
-        if e.data.get("member_id") == member_id:
-            entry = e
-            break
+    entry = _find_entry(hass, member_id)
 
     if entry is None:
         connection.send_error(msg["id"], "member_not_found", f"Member {member_id} not found")
@@ -469,6 +1085,7 @@ async def ws_add_record_type(
         CONF_RECORD_UNIT: unit,
         "default_value": default_value,
         "default_value_mode": msg.get("default_value_mode", "fixed"),
+        "coalesce_window": msg["coalesce_window"],
     })
 
     current_options[CONF_RECORD_SETS] = record_sets
@@ -476,8 +1093,9 @@ async def ws_add_record_type(
     # Update config entry
     hass.config_entries.async_update_entry(entry, options=current_options)
 
-    # Reload entry to create new entities
-    await hass.config_entries.async_reload(entry.entry_id)
+    # Apply in place; only the affected entities are added, updated or removed
+    if entry.state is ConfigEntryState.LOADED:
+        entry.runtime_data.async_apply_entry()
 
     connection.send_result(msg["id"], {"success": True, "type_id": type_id})
 
@@ -491,6 +1109,7 @@ async def ws_add_record_type(
         vol.Required("unit"): str,
         vol.Optional("default_value"): valid_float,
         vol.Optional("default_value_mode"): vol.In(["fixed", "last_value"]),
+        vol.Optional("coalesce_window"): COALESCE_WINDOW,
     }
 )
 @websocket_api.async_response
@@ -507,11 +1126,7 @@ async def ws_update_record_type(
     default_value = msg.get("default_value")
 
     # Find the config entry for this member
-    entry = None
-    for e in hass.config_entries.async_entries(DOMAIN):
-        if e.data.get("member_id") == member_id:
-            entry = e
-            break
+    entry = _find_entry(hass, member_id)
 
     if entry is None:
         connection.send_error(msg["id"], "member_not_found", f"Member {member_id} not found")
@@ -533,6 +1148,8 @@ async def ws_update_record_type(
             default_value_mode = msg.get("default_value_mode")
             if default_value_mode is not None:
                 updated["default_value_mode"] = default_value_mode
+            if "coalesce_window" in msg:
+                updated["coalesce_window"] = msg["coalesce_window"]
             record_sets[i] = updated
             found = True
             break
@@ -546,8 +1163,9 @@ async def ws_update_record_type(
     # Update config entry
     hass.config_entries.async_update_entry(entry, options=current_options)
 
-    # Reload entry to update entities
-    await hass.config_entries.async_reload(entry.entry_id)
+    # Apply in place; only the affected entities are added, updated or removed
+    if entry.state is ConfigEntryState.LOADED:
+        entry.runtime_data.async_apply_entry()
 
     connection.send_result(msg["id"], {"success": True})
 
@@ -571,11 +1189,7 @@ async def ws_delete_record_type(
     type_id = msg["type_id"]
 
     # Find the config entry for this member
-    entry = None
-    for e in hass.config_entries.async_entries(DOMAIN):
-        if e.data.get("member_id") == member_id:
-            entry = e
-            break
+    entry = _find_entry(hass, member_id)
 
     if entry is None:
         connection.send_error(msg["id"], "member_not_found", f"Member {member_id} not found")
@@ -592,27 +1206,14 @@ async def ws_delete_record_type(
         connection.send_error(msg["id"], "type_not_found", f"Record type {type_id} not found")
         return
 
-    # Remove entities for the deleted record type from the entity registry
-    entity_reg = er.async_get(hass)
-    suffixes = [
-        ("sensor", "_record"),
-        ("button", "_log"),
-        ("number", "_value"),
-        ("text", "_note"),
-    ]
-    for platform, suffix in suffixes:
-        unique_id = f"{member_id}_{type_id}{suffix}"
-        entity_id = entity_reg.async_get_entity_id(platform, DOMAIN, unique_id)
-        if entity_id:
-            entity_reg.async_remove(entity_id)
-
     current_options[CONF_RECORD_SETS] = new_sets
 
     # Update config entry
     hass.config_entries.async_update_entry(entry, options=current_options)
 
-    # Reload entry to remove entities
-    await hass.config_entries.async_reload(entry.entry_id)
+    # Apply in place; the type's entities remove themselves and their registry entries
+    if entry.state is ConfigEntryState.LOADED:
+        entry.runtime_data.async_apply_entry()
 
     connection.send_result(msg["id"], {"success": True})
 
@@ -651,10 +1252,11 @@ async def ws_add_member(
         return
 
     # Check if member already exists
-    for e in hass.config_entries.async_entries(DOMAIN):
-        if e.data.get("member_id") == member_id:
-            connection.send_error(msg["id"], "member_exists", f"Member {member_id} already exists")
-            return
+    if _find_entry(hass, member_id) is not None:
+        connection.send_error(
+            msg["id"], "member_exists", f"Member {member_id} already exists"
+        )
+        return
 
     note = msg.get("note", "")
 
@@ -694,11 +1296,7 @@ async def ws_update_member(
     name = msg["name"]
 
     # Find the config entry for this member
-    entry = None
-    for e in hass.config_entries.async_entries(DOMAIN):
-        if e.data.get("member_id") == member_id:
-            entry = e
-            break
+    entry = _find_entry(hass, member_id)
 
     if entry is None:
         connection.send_error(msg["id"], "member_not_found", f"Member {member_id} not found")
@@ -713,8 +1311,9 @@ async def ws_update_member(
 
     hass.config_entries.async_update_entry(entry, data=new_data, title=name)
 
-    # Reload to apply changes
-    await hass.config_entries.async_reload(entry.entry_id)
+    # Apply in place; entity names follow the renamed device
+    if entry.state is ConfigEntryState.LOADED:
+        entry.runtime_data.async_apply_entry()
 
     connection.send_result(msg["id"], {"success": True})
 
@@ -736,11 +1335,7 @@ async def ws_delete_member(
     member_id = msg["member_id"]
 
     # Find the config entry for this member
-    entry = None
-    for e in hass.config_entries.async_entries(DOMAIN):
-        if e.data.get("member_id") == member_id:
-            entry = e
-            break
+    entry = _find_entry(hass, member_id)
 
     if entry is None:
         connection.send_error(msg["id"], "member_not_found", f"Member {member_id} not found")
@@ -0,0 +1,641 @@
+"""Timestamp-ordered, column-oriented record history for Ha Health Record."""
+from __future__ import annotations
+
+import logging
+import math
+import uuid
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable, Iterator
+from datetime import UTC, datetime, timedelta, timezone
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+_LOGGER = logging.getLogger(__name__)
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+_MICROSECOND = timedelta(microseconds=1)
+_ID_SIZE = 16  # bytes per record id (a UUID)
+
+
+def datetime_to_micros(value: datetime) -> int:
+    """Return epoch microseconds for a datetime.
+
+    Naive datetimes are interpreted in the configured time zone.
+    """
+    return (dt_util.as_utc(value) - _EPOCH) // _MICROSECOND
+
+
+def micros_to_datetime(micros: int) -> datetime:
+    """Return the UTC datetime for epoch microseconds."""
+    return _EPOCH + timedelta(microseconds=micros)
+
+
+def parse_timestamp(timestamp: str) -> tuple[int, int]:
+    """Parse an ISO timestamp into (epoch microseconds, UTC offset seconds).
+
+    Raises ``ValueError`` if the timestamp cannot be parsed.
+    """
+    parsed = dt_util.parse_datetime(timestamp)
+    if parsed is None:
+        raise ValueError(f"Invalid timestamp: {timestamp}")
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=dt_util.DEFAULT_TIME_ZONE)
+    offset = parsed.utcoffset()
+    return (
+        datetime_to_micros(parsed),
+        int(offset.total_seconds()) if offset else 0,
+    )
+
+
+def record_time(record: dict[str, Any]) -> tuple[int, int]:
+    """Return (epoch microseconds, UTC offset seconds) of a record dict.
+
+    Stored records carry both as ``ts`` and ``tz``; only records without
+    them (older files, or records from outside) have their ``timestamp``
+    parsed.  Raises ``ValueError`` if that cannot be parsed.
+    """
+    if isinstance(micros := record.get("ts"), int):
+        return micros, record.get("tz", 0)
+    return parse_timestamp(record["timestamp"])
+
+
+_TIMEZONES: dict[int, timezone] = {}
+
+
+def offset_datetime(micros: int, offset: int) -> datetime:
+    """Return the datetime of epoch microseconds in the given UTC offset."""
+    if (tz := _TIMEZONES.get(offset)) is None:
+        tz = _TIMEZONES[offset] = timezone(timedelta(seconds=offset))
+    return (_EPOCH + timedelta(microseconds=micros)).astimezone(tz)
+
+
+def format_timestamp(micros: int, offset: int) -> str:
+    """Format epoch microseconds as an ISO timestamp in the given offset."""
+    return offset_datetime(micros, offset).isoformat()
+
+
+class RecordStore:
+    """Record history kept sorted by timestamp in parallel columns.
+
+    Rows are stored column-wise: epoch timestamps, UTC offsets and values
+    in typed arrays, record types as interned codes, ids as packed 16-byte
+    UUIDs, and notes in a sparse table keyed by id.  Range queries are two
+    binary searches over the timestamp column; records are materialized
+    as the familiar dicts only when read.  Besides the ISO ``timestamp``
+    those dicts carry its epoch microseconds and offset (``ts``/``tz``),
+    so stored records are never parsed again when read back.
+
+    A hash index maps each id to its timestamp, so locating a record by id
+    is a dict lookup plus a binary search regardless of history length.
+    Each record type also keeps its own sorted timestamp column, so the
+    latest record of a type is found in O(log n) after any mutation.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty store."""
+        self.clear()
+
+    def clear(self) -> None:
+        """Remove all records."""
+        self._timestamps = array("q")  # epoch microseconds, ascending
+        self._offsets = array("i")  # UTC offset (seconds) of the original timestamp
+        self._values = array("d")  # NaN marks a missing value
+        self._types = array("H")  # index into _type_ids
+        self._ids = bytearray()  # _ID_SIZE bytes per row
+
+        # Interned record types and the name/unit last stored with each
+        self._type_ids: list[str] = []
+        self._type_codes: dict[str, int] = {}
+        self._type_labels: list[tuple[str, str]] = []
+        self._type_timestamps: list[array[int]] = []  # per-type, ascending
+
+        # Tables keyed by packed id
+        self._id_index: dict[bytes, int] = {}  # id -> epoch microseconds
+        self._notes: dict[bytes, str] = {}
+        self._foreign_ids: dict[bytes, str] = {}  # non-UUID legacy ids
+        self._foreign_keys: dict[str, bytes] = {}
+
+    def __len__(self) -> int:
+        """Return the number of records."""
+        return len(self._timestamps)
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        """Iterate records in ascending timestamp order."""
+        return self.rows(0, len(self._timestamps))
+
+    # ── Encoding helpers ────────────────────────────────────────────
+
+    def _intern_type(self, type_id: str, name: str, unit: str) -> int:
+        """Return the code for a record type, remembering its labels."""
+        code = self._type_codes.get(type_id)
+        if code is None:
+            code = self._type_codes[type_id] = len(self._type_ids)
+            self._type_ids.append(type_id)
+            self._type_labels.append((name, unit))
+            self._type_timestamps.append(array("q"))
+        elif name or unit:
+            self._type_labels[code] = (name, unit)
+        return code
+
+    def _encode_id(self, record_id: str | None) -> bytes:
+        """Pack a record id into _ID_SIZE bytes."""
+        if not record_id:
+            return uuid.uuid4().bytes
+        if len(record_id) == 2 * _ID_SIZE:
+            try:
+                return bytes.fromhex(record_id)
+            except ValueError:
+                pass
+        if (key := self._foreign_keys.get(record_id)) is None:
+            key = uuid.uuid4().bytes
+            self._foreign_keys[record_id] = key
+            self._foreign_ids[key] = record_id
+        return key
+
+    def _lookup_id(self, record_id: str) -> bytes | None:
+        """Return the packed form of an existing record id."""
+        if (key := self._foreign_keys.get(record_id)) is not None:
+            return key
+        if len(record_id) == 2 * _ID_SIZE:
+            try:
+                return bytes.fromhex(record_id)
+            except ValueError:
+                pass
+        return None
+
+    def _decode_id(self, key: bytes) -> str:
+        """Return the string form of a packed record id."""
+        return self._foreign_ids.get(key) or key.hex()
+
+    def _key_at(self, index: int) -> bytes:
+        """Return the packed id of the row at a position."""
+        start = index * _ID_SIZE
+        return bytes(self._ids[start:start + _ID_SIZE])
+
+    def _position(self, key: bytes) -> int | None:
+        """Return the current position of a packed id."""
+        micros = self._id_index.get(key)
+        if micros is None:
+            return None
+        # Only rows sharing the timestamp need to be compared
+        low = bisect_left(self._timestamps, micros)
+        high = bisect_right(self._timestamps, micros)
+        for index in range(low, high):
+            start = index * _ID_SIZE
+            if self._ids[start:start + _ID_SIZE] == key:
+                return index
+        return None
+
+    def _forget(self, key: bytes) -> None:
+        """Drop the sparse-table entries of a removed record."""
+        self._notes.pop(key, None)
+        if (foreign := self._foreign_ids.pop(key, None)) is not None:
+            del self._foreign_keys[foreign]
+
+    def _row(self, index: int) -> dict[str, Any]:
+        """Materialize the row at a position as a record dict."""
+        key = self._key_at(index)
+        code = self._types[index]
+        name, unit = self._type_labels[code]
+        value = self._values[index]
+        micros = self._timestamps[index]
+        offset = self._offsets[index]
+        return {
+            "id": self._decode_id(key),
+            "record_type": self._type_ids[code],
+            "record_name": name,
+            "value": None if math.isnan(value) else value,
+            "unit": unit,
+            "note": self._notes.get(key, ""),
+            "timestamp": format_timestamp(micros, offset),
+            "ts": micros,
+            "tz": offset,
+        }
+
+    def _insert(
+        self,
+        micros: int,
+        offset: int,
+        value: float,
+        code: int,
+        key: bytes,
+        note: str,
+    ) -> int:
+        """Insert one encoded row at its timestamp position."""
+        index = bisect_right(self._timestamps, micros)
+        self._timestamps.insert(index, micros)
+        self._offsets.insert(index, offset)
+        self._values.insert(index, value)
+        self._types.insert(index, code)
+        type_timestamps = self._type_timestamps[code]
+        type_timestamps.insert(bisect_right(type_timestamps, micros), micros)
+        start = index * _ID_SIZE
+        self._ids[start:start] = key
+        self._id_index[key] = micros
+        if note:
+            self._notes[key] = note
+        return index
+
+    def _delete(self, index: int) -> bytes:
+        """Delete the row at a position and return its packed id."""
+        key = self._key_at(index)
+        type_timestamps = self._type_timestamps[self._types[index]]
+        del type_timestamps[bisect_left(type_timestamps, self._timestamps[index])]
+        del self._timestamps[index]
+        del self._offsets[index]
+        del self._values[index]
+        del self._types[index]
+        start = index * _ID_SIZE
+        del self._ids[start:start + _ID_SIZE]
+        del self._id_index[key]
+        return key
+
+    # ── Public API ──────────────────────────────────────────────────
+
+    def load(self, records: Iterable[dict[str, Any]]) -> None:
+        """Replace the store contents with the given record dicts."""
+        self.clear()
+
+        encoded: list[tuple[int, int, float, int, bytes]] = []
+        for record in records:
+            try:
+                micros, offset = record_time(record)
+            except (KeyError, ValueError, TypeError):
+                _LOGGER.warning(
+                    "Skipping record with invalid timestamp: %s",
+                    record.get("timestamp"),
+                )
+                continue
+            value = record.get("value")
+            key = self._encode_id(record.get("id"))
+            if key in self._id_index:
+                _LOGGER.debug("Re-keying duplicate record id %s", record.get("id"))
+                key = uuid.uuid4().bytes
+            self._id_index[key] = micros
+            code = self._intern_type(
+                record.get("record_type", ""),
+                record.get("record_name", ""),
+                record.get("unit", ""),
+            )
+            if note := record.get("note"):
+                self._notes[key] = note
+            encoded.append(
+                (micros, offset, math.nan if value is None else value, code, key)
+            )
+
+        # Stable sort keeps insertion order for records sharing a timestamp
+        encoded.sort(key=lambda row: row[0])
+        for micros, offset, value, code, key in encoded:
+            self._timestamps.append(micros)
+            self._offsets.append(offset)
+            self._values.append(value)
+            self._types.append(code)
+            self._type_timestamps[code].append(micros)
+            self._ids += key
+
+    def merge(self, records: Iterable[dict[str, Any]]) -> int:
+        """Insert records whose id is not already present.
+
+        Rows already in the store are considered newer and win.  The new
+        records are inserted in one ``insert_many`` pass.  Returns the
+        number of records added.
+        """
+        batch: list[dict[str, Any]] = []
+        seen: set[bytes] = set()
+        for record in records:
+            try:
+                record_time(record)
+            except (KeyError, ValueError, TypeError):
+                _LOGGER.warning(
+                    "Skipping record with invalid timestamp: %s",
+                    record.get("timestamp"),
+                )
+                continue
+            key = self._encode_id(record.get("id"))
+            if key in self._id_index or key in seen:
+                continue
+            seen.add(key)
+            if "record_type" not in record:
+                record = {**record, "record_type": ""}
+            batch.append(record)
+        return self.insert_many(batch)
+
+    def insert_many(self, records: Iterable[dict[str, Any]]) -> int:
+        """Insert a batch of new record dicts in one merge pass.
+
+        Unlike repeated ``add`` calls, which shift the columns once per
+        record, the batch is sorted and the columns are rebuilt once.
+        Ids must not be in the store already; records without one get a
+        fresh id.  Raises ``ValueError`` if a timestamp cannot be parsed,
+        before anything is inserted.
+        """
+        encoded: list[tuple[int, int, float, int, bytes]] = []
+        notes: dict[bytes, str] = {}
+        for record in records:
+            micros, offset = record_time(record)
+            value = record.get("value")
+            key = self._encode_id(record.get("id"))
+            if note := record.get("note"):
+                notes[key] = note
+            encoded.append((
+                micros,
+                offset,
+                math.nan if value is None else value,
+                self._intern_type(
+                    record["record_type"],
+                    record.get("record_name", ""),
+                    record.get("unit", ""),
+                ),
+                key,
+            ))
+        if not encoded:
+            return 0
+        # Stable sort keeps input order for records sharing a timestamp
+        encoded.sort(key=lambda row: row[0])
+
+        timestamps = array("q")
+        offsets = array("i")
+        values = array("d")
+        types = array("H")
+        ids = bytearray()
+        new_type_timestamps: dict[int, list[int]] = {}
+        copied = 0
+        for micros, offset, value, code, key in encoded:
+            # New rows go after existing rows with the same timestamp
+            index = bisect_right(self._timestamps, micros, copied)
+            if index > copied:
+                timestamps += self._timestamps[copied:index]
+                offsets += self._offsets[copied:index]
+                values += self._values[copied:index]
+                types += self._types[copied:index]
+                ids += self._ids[copied * _ID_SIZE:index * _ID_SIZE]
+                copied = index
+            timestamps.append(micros)
+            offsets.append(offset)
+            values.append(value)
+            types.append(code)
+            ids += key
+            new_type_timestamps.setdefault(code, []).append(micros)
+            self._id_index[key] = micros
+        timestamps += self._timestamps[copied:]
+        offsets += self._offsets[copied:]
+        values += self._values[copied:]
+        types += self._types[copied:]
+        ids += self._ids[copied * _ID_SIZE:]
+
+        self._timestamps = timestamps
+        self._offsets = offsets
+        self._values = values
+        self._types = types
+        self._ids = ids
+        self._notes.update(notes)
+        for code, added in new_type_timestamps.items():
+            self._type_timestamps[code] = array(
+                "q", sorted(self._type_timestamps[code] + array("q", added))
+            )
+        return len(encoded)
+
+    def remove_between(self, start: int, end: int) -> int:
+        """Remove records with epoch microseconds in [start, end).
+
+        Returns the number of records removed.
+        """
+        low = bisect_left(self._timestamps, start)
+        high = bisect_left(self._timestamps, end)
+        if low == high:
+            return 0
+        for index in range(low, high):
+            key = self._key_at(index)
+            del self._id_index[key]
+            self._forget(key)
+        # Rows of one type within a time span are contiguous in its column
+        for code in set(self._types[low:high]):
+            type_timestamps = self._type_timestamps[code]
+            del type_timestamps[
+                bisect_left(type_timestamps, start):bisect_left(type_timestamps, end)
+            ]
+        del self._timestamps[low:high]
+        del self._offsets[low:high]
+        del self._values[low:high]
+        del self._types[low:high]
+        del self._ids[low * _ID_SIZE:high * _ID_SIZE]
+        return high - low
+
+    def snapshot_between(self, start: int, end: int) -> RecordStore:
+        """Return a copy of the records with epoch microseconds in [start, end).
+
+        The columns are copied with slices, so taking a snapshot costs a
+        few memory copies rather than a dict per record.  The copy is
+        meant to be read (iterated, or via ``samples_between``) from
+        another thread while this store keeps changing; its id index and
+        per-type columns are left empty.
+        """
+        low = bisect_left(self._timestamps, start)
+        high = bisect_left(self._timestamps, end)
+        snapshot = RecordStore()
+        snapshot._timestamps = self._timestamps[low:high]
+        snapshot._offsets = self._offsets[low:high]
+        snapshot._values = self._values[low:high]
+        snapshot._types = self._types[low:high]
+        snapshot._ids = self._ids[low * _ID_SIZE:high * _ID_SIZE]
+        snapshot._type_ids = list(self._type_ids)
+        snapshot._type_labels = list(self._type_labels)
+        # Only the sparse-table entries of the copied rows, found from
+        # whichever side is smaller
+        if len(self._notes) + len(self._foreign_ids) < high - low:
+            for table, copy in (
+                (self._notes, snapshot._notes),
+                (self._foreign_ids, snapshot._foreign_ids),
+            ):
+                for key, item in table.items():
+                    if start <= self._id_index[key] < end:
+                        copy[key] = item
+        else:
+            ids = snapshot._ids
+            for offset in range(0, len(ids), _ID_SIZE):
+                key = bytes(ids[offset:offset + _ID_SIZE])
+                if (note := self._notes.get(key)) is not None:
+                    snapshot._notes[key] = note
+                if (foreign := self._foreign_ids.get(key)) is not None:
+                    snapshot._foreign_ids[key] = foreign
+        return snapshot
+
+    def rows_between(self, start: int, end: int) -> Iterator[dict[str, Any]]:
+        """Iterate records with epoch microseconds in [start, end)."""
+        return self.rows(
+            bisect_left(self._timestamps, start),
+            bisect_left(self._timestamps, end),
+        )
+
+    def samples_between(
+        self, start: int, end: int
+    ) -> Iterator[tuple[int, str, float | None]]:
+        """Iterate (epoch microseconds, type, value) for [start, end).
+
+        Cheaper than ``rows_between`` as no record dicts are built.
+        """
+        type_ids = self._type_ids
+        for index in range(
+            bisect_left(self._timestamps, start), bisect_left(self._timestamps, end)
+        ):
+            value = self._values[index]
+            yield (
+                self._timestamps[index],
+                type_ids[self._types[index]],
+                None if math.isnan(value) else value,
+            )
+
+    def next_timestamp(self, start: int) -> int | None:
+        """Return the first epoch microseconds at or after ``start``."""
+        index = bisect_left(self._timestamps, start)
+        return self._timestamps[index] if index < len(self._timestamps) else None
+
+    def positions_descending(self, start: int, end: int) -> range:
+        """Return the positions of records in [start, end), newest first."""
+        return range(
+            bisect_left(self._timestamps, end) - 1,
+            bisect_left(self._timestamps, start) - 1,
+            -1,
+        )
+
+    def count_between(self, start: int, end: int) -> int:
+        """Return the number of records with epoch microseconds in [start, end)."""
+        return bisect_left(self._timestamps, end) - bisect_left(self._timestamps, start)
+
+    def rows(self, low: int, high: int) -> Iterator[dict[str, Any]]:
+        """Iterate record dicts for the positions [low, high)."""
+        for index in range(low, high):
+            yield self._row(index)
+
+    def add(self, record: dict[str, Any]) -> None:
+        """Insert a record dict at its timestamp position.
+
+        An existing record with the same id is replaced.  Raises
+        ``ValueError`` if the timestamp cannot be parsed.
+        """
+        micros, offset = record_time(record)
+        key = self._encode_id(record.get("id"))
+        if (index := self._position(key)) is not None:
+            self._delete(index)
+            self._notes.pop(key, None)
+        value = record.get("value")
+        self._insert(
+            micros,
+            offset,
+            math.nan if value is None else value,
+            self._intern_type(
+                record["record_type"],
+                record.get("record_name", ""),
+                record.get("unit", ""),
+            ),
+            key,
+            record.get("note", ""),
+        )
+
+    def pop(self, index: int) -> dict[str, Any]:
+        """Remove and return the record at the given position."""
+        record = self._row(index)
+        self._forget(self._delete(index))
+        return record
+
+    def update(
+        self,
+        index: int,
+        value: float | None = None,
+        note: str | None = None,
+        timestamp: str | None = None,
+    ) -> int:
+        """Update fields of the record at the given position.
+
+        A new timestamp moves the record; the record's (possibly new)
+        position is returned.  Raises ``ValueError`` if the timestamp
+        cannot be parsed.
+        """
+        if timestamp is not None:
+            micros, offset = parse_timestamp(timestamp)
+            new_value = self._values[index] if value is None else value
+            code = self._types[index]
+            key = self._delete(index)
+            index = self._insert(micros, offset, new_value, code, key, "")
+        elif value is not None:
+            self._values[index] = value
+            key = self._key_at(index)
+        else:
+            key = self._key_at(index)
+
+        if note is not None:
+            if note:
+                self._notes[key] = note
+            else:
+                self._notes.pop(key, None)
+        return index
+
+    def find(
+        self,
+        type_id: str,
+        timestamp: str,
+        record_id: str | None = None,
+    ) -> int | None:
+        """Return the position of a record by UUID or type+timestamp."""
+        # Match by UUID first (preferred), fall back to type+timestamp
+        if record_id:
+            key = self._lookup_id(record_id)
+            return None if key is None else self._position(key)
+
+        code = self._type_codes.get(type_id)
+        if code is None:
+            return None
+        try:
+            micros, _ = parse_timestamp(timestamp)
+        except (ValueError, TypeError):
+            return None
+        low = bisect_left(self._timestamps, micros)
+        high = bisect_right(self._timestamps, micros)
+        for index in range(low, high):
+            if self._types[index] == code:
+                return index
+        return None
+
+    def row(self, index: int) -> dict[str, Any]:
+        """Return the record dict at the given position."""
+        return self._row(index)
+
+    def timestamp_at(self, index: int) -> int:
+        """Return the epoch microseconds of the row at the given position."""
+        return self._timestamps[index]
+
+    def id_at(self, index: int) -> str:
+        """Return the record id of the row at the given position."""
+        return self._decode_id(self._key_at(index))
+
+    def type_at(self, index: int) -> str:
+        """Return the record type of the row at the given position."""
+        return self._type_ids[self._types[index]]
+
+    def range(self, start: datetime, end: datetime) -> Iterator[dict[str, Any]]:
+        """Iterate records whose timestamp lies within [start, end]."""
+        low = bisect_left(self._timestamps, datetime_to_micros(start))
+        high = bisect_right(self._timestamps, datetime_to_micros(end))
+        return self.rows(low, high)
+
+    def latest_timestamp(self, type_id: str) -> int | None:
+        """Return the epoch microseconds of the most recent record of a type."""
+        code = self._type_codes.get(type_id)
+        if code is None or not (type_timestamps := self._type_timestamps[code]):
+            return None
+        return type_timestamps[-1]
+
+    def latest(self, type_id: str) -> dict[str, Any] | None:
+        """Return the most recent record of a type."""
+        code = self._type_codes.get(type_id)
+        if code is None or not (type_timestamps := self._type_timestamps[code]):
+            return None
+        micros = type_timestamps[-1]
+        # Of the rows sharing that timestamp, the last inserted one wins
+        low = bisect_left(self._timestamps, micros)
+        for index in range(bisect_right(self._timestamps, micros) - 1, low - 1, -1):
+            if self._types[index] == code:
+                return self._row(index)
+        return None
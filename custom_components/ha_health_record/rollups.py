@@ -0,0 +1,215 @@
+"""Pre-aggregated daily/weekly/monthly rollups for Ha Health Record.
+
+Rollups are kept per storage partition as one bucket per record type per
+local day.  A day that straddles two partitions simply has a partial
+bucket in each; buckets are mergeable, so weeks and months are folded
+from days when queried.  Compaction recomputes the buckets of every
+partition it writes, which keeps any incremental drift bounded.
+"""
+from __future__ import annotations
+
+from collections.abc import Iterable
+from datetime import date, timedelta
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+from .record_store import datetime_to_micros, micros_to_datetime
+
+PERIOD_DAY = "day"
+PERIOD_WEEK = "week"
+PERIOD_MONTH = "month"
+PERIODS = (PERIOD_DAY, PERIOD_WEEK, PERIOD_MONTH)
+
+# Bucket layout: [count, numeric values, sum, min, max, last timestamp, last value]
+_COUNT, _VALUES, _SUM, _MIN, _MAX, _LAST_TS, _LAST = range(7)
+
+type Bucket = list[Any]
+type DayBuckets = dict[str, dict[str, Bucket]]  # type_id -> day -> bucket
+
+
+def day_of(micros: int) -> str:
+    """Return the local day (ISO date) of epoch microseconds."""
+    return dt_util.as_local(micros_to_datetime(micros)).date().isoformat()
+
+
+def day_bounds(day: str) -> tuple[int, int]:
+    """Return the [start, end) epoch microseconds of a local day."""
+    start = date.fromisoformat(day)
+    return (
+        datetime_to_micros(dt_util.start_of_local_day(start)),
+        datetime_to_micros(dt_util.start_of_local_day(start + timedelta(days=1))),
+    )
+
+
+def _period_start(day: str, period: str) -> str:
+    """Return the first day of the period containing a day."""
+    if period == PERIOD_DAY:
+        return day
+    value = date.fromisoformat(day)
+    if period == PERIOD_WEEK:
+        return (value - timedelta(days=value.weekday())).isoformat()
+    return value.replace(day=1).isoformat()
+
+
+def _new_bucket() -> Bucket:
+    """Return an empty bucket."""
+    return [0, 0, 0.0, None, None, None, None]
+
+
+def _add_sample(bucket: Bucket, micros: int, value: float | None) -> None:
+    """Fold one record into a bucket."""
+    bucket[_COUNT] += 1
+    if value is not None:
+        value = float(value)
+        bucket[_VALUES] += 1
+        bucket[_SUM] += value
+        bucket[_MIN] = value if bucket[_MIN] is None else min(bucket[_MIN], value)
+        bucket[_MAX] = value if bucket[_MAX] is None else max(bucket[_MAX], value)
+    if bucket[_LAST_TS] is None or micros >= bucket[_LAST_TS]:
+        bucket[_LAST_TS] = micros
+        bucket[_LAST] = value
+
+
+def compute_days(samples: Iterable[tuple[int, str, float | None]]) -> DayBuckets:
+    """Return the day buckets of (epoch microseconds, type, value) samples."""
+    days: DayBuckets = {}
+    for micros, type_id, value in samples:
+        type_days = days.setdefault(type_id, {})
+        if (bucket := type_days.get(day := day_of(micros))) is None:
+            bucket = type_days[day] = _new_bucket()
+        _add_sample(bucket, micros, value)
+    return days
+
+
+def copy_days(days: DayBuckets) -> DayBuckets:
+    """Return a copy of day buckets that shares no bucket with the original."""
+    return {
+        type_id: {day: list(bucket) for day, bucket in type_days.items()}
+        for type_id, type_days in days.items()
+    }
+
+
+def _merge_bucket(target: Bucket, bucket: Bucket) -> None:
+    """Fold one bucket into another."""
+    target[_COUNT] += bucket[_COUNT]
+    target[_VALUES] += bucket[_VALUES]
+    target[_SUM] += bucket[_SUM]
+    for index, pick in ((_MIN, min), (_MAX, max)):
+        if bucket[index] is not None:
+            target[index] = (
+                bucket[index]
+                if target[index] is None
+                else pick(target[index], bucket[index])
+            )
+    if bucket[_LAST_TS] is not None and (
+        target[_LAST_TS] is None or bucket[_LAST_TS] >= target[_LAST_TS]
+    ):
+        target[_LAST_TS] = bucket[_LAST_TS]
+        target[_LAST] = bucket[_LAST]
+
+
+class Rollups:
+    """Per-partition day buckets for every record type."""
+
+    def __init__(self) -> None:
+        """Initialize empty rollups."""
+        self._partitions: dict[str, DayBuckets] = {}
+
+    def load_partition(self, key: str, days: DayBuckets) -> None:
+        """Set the stored buckets of a partition."""
+        self._partitions[key] = days
+
+    def discard(self, key: str) -> None:
+        """Forget the buckets of a partition."""
+        self._partitions.pop(key, None)
+
+    def rebuild(
+        self, key: str, samples: Iterable[tuple[int, str, float | None]]
+    ) -> DayBuckets:
+        """Recompute the buckets of a partition from all of its records."""
+        days = self._partitions[key] = compute_days(samples)
+        return days
+
+    def merge(self, key: str, days: DayBuckets) -> None:
+        """Fold separately computed buckets into those of a partition."""
+        partition = self._partitions.setdefault(key, {})
+        for type_id, type_days in days.items():
+            target_days = partition.setdefault(type_id, {})
+            for day, bucket in type_days.items():
+                if (target := target_days.get(day)) is None:
+                    target_days[day] = bucket
+                else:
+                    _merge_bucket(target, bucket)
+
+    def sum_before(self, type_id: str, day: str) -> float:
+        """Return the sum of a type's values on local days before ``day``."""
+        return sum(
+            bucket[_SUM]
+            for days in self._partitions.values()
+            for bucket_day, bucket in days.get(type_id, {}).items()
+            if bucket_day < day
+        )
+
+    def add(self, key: str, type_id: str, micros: int, value: float | None) -> None:
+        """Fold a newly stored record into its bucket."""
+        type_days = self._partitions.setdefault(key, {}).setdefault(type_id, {})
+        if (bucket := type_days.get(day := day_of(micros))) is None:
+            bucket = type_days[day] = _new_bucket()
+        _add_sample(bucket, micros, value)
+
+    def refresh(
+        self,
+        key: str,
+        type_id: str,
+        day: str,
+        samples: Iterable[tuple[int, str, float | None]],
+    ) -> None:
+        """Recompute one bucket from all records of its partition and day."""
+        bucket = _new_bucket()
+        for micros, sample_type, value in samples:
+            if sample_type == type_id:
+                _add_sample(bucket, micros, value)
+        type_days = self._partitions.setdefault(key, {}).setdefault(type_id, {})
+        if bucket[_COUNT]:
+            type_days[day] = bucket
+        else:
+            type_days.pop(day, None)
+
+    def query(
+        self,
+        start_day: str,
+        end_day: str,
+        period: str,
+        type_ids: Iterable[str] | None = None,
+    ) -> list[dict[str, Any]]:
+        """Return merged buckets for local days in [start_day, end_day].
+
+        Periods are keyed by their first day; weeks start on Monday.
+        """
+        wanted = set(type_ids) if type_ids is not None else None
+        merged: dict[tuple[str, str], Bucket] = {}
+        for days in self._partitions.values():
+            for type_id, type_days in days.items():
+                if wanted is not None and type_id not in wanted:
+                    continue
+                for day, bucket in type_days.items():
+                    if start_day <= day <= end_day:
+                        group = (type_id, _period_start(day, period))
+                        if (target := merged.get(group)) is None:
+                            target = merged[group] = _new_bucket()
+                        _merge_bucket(target, bucket)
+
+        return [
+            {
+                "record_type": type_id,
+                "period_start": period_start,
+                "count": bucket[_COUNT],
+                "sum": bucket[_SUM] if bucket[_VALUES] else None,
+                "min": bucket[_MIN],
+                "max": bucket[_MAX],
+                "mean": bucket[_SUM] / bucket[_VALUES] if bucket[_VALUES] else None,
+                "last": bucket[_LAST],
+            }
+            for (type_id, period_start), bucket in sorted(merged.items())
+        ]
@@ -2,18 +2,24 @@
 from __future__ import annotations
 
 import logging
+from collections.abc import Callable
+from datetime import datetime
 from typing import Any
 
 from homeassistant.components.sensor import SensorEntity
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_call_later
 
 from . import HaHealthRecordConfigEntry
 from .coordinator import (
     HealthRecordCoordinator,
+    RecordSet,
+    signal_record_set_added,
     signal_record_updated,
 )
+from .entity import RecordSetEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -38,32 +44,47 @@ async def async_setup_entry(
 
     async_add_entities(entities)
 
+    @callback
+    def async_add_record_set(type_id: str) -> None:
+        """Add the sensor of a record set added at runtime."""
+        async_add_entities([RecordSensor(coordinator=coordinator, type_id=type_id)])
+
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, signal_record_set_added(coordinator.member_id), async_add_record_set
+        )
+    )
+
 
-class RecordSensor(SensorEntity):
-    """Sensor showing the last record value."""
+class RecordSensor(RecordSetEntity, SensorEntity):
+    """Sensor showing the last record value.
+
+    With a coalesce window on the record set, the first update writes the
+    state at once and further updates within the window are folded into
+    one write at its end, carrying the latest record and the number of
+    updates folded (``burst_count``).  Records are stored regardless.
+    """
 
-    _attr_has_entity_name = True
     _attr_should_poll = False
     _attr_translation_key = "record"
+    _attr_icon = "mdi:clipboard-text-clock"
+    _unique_id_suffix = "record"
 
-    def __init__(
-        self,
-        coordinator: HealthRecordCoordinator,
-        type_id: str,
-    ) -> None:
+    def __init__(self, coordinator: HealthRecordCoordinator, type_id: str) -> None:
         """Initialize the sensor."""
-        self._coordinator = coordinator
-        self._type_id = type_id
-        record_set = coordinator.get_record_set(type_id)
-
-        self._attr_unique_id = f"{coordinator.member_id}_{type_id}_record"
-        self._attr_translation_placeholders = {"record_name": record_set.name}
+        super().__init__(coordinator, type_id)
+        self._burst_count = 1
+        self._pending = 0
+        self._unsub_window: Callable[[], None] | None = None
+
+    def _apply_record_set(self, record_set: RecordSet) -> None:
+        """Take over the name and unit of the record set."""
+        super()._apply_record_set(record_set)
         self._attr_native_unit_of_measurement = record_set.unit
-        self._attr_device_info = coordinator.get_device_info()
-        self._attr_icon = "mdi:clipboard-text-clock"
 
     async def async_added_to_hass(self) -> None:
         """Subscribe to dispatcher signals when added to hass."""
+        await super().async_added_to_hass()
         self.async_on_remove(
             async_dispatcher_connect(
                 self.hass,
@@ -73,11 +94,45 @@ class RecordSensor(SensorEntity):
                 self._handle_update,
             )
         )
+        self.async_on_remove(self._cancel_window)
 
     @callback
     def _handle_update(self) -> None:
-        """Handle update signal."""
+        """Handle update signal, folding bursts within the coalesce window."""
+        if self._unsub_window is not None:
+            self._pending += 1
+            return
+        self._burst_count = 1
         self.async_write_ha_state()
+        self._start_window()
+
+    @callback
+    def _start_window(self) -> None:
+        """Hold back updates for the record set's coalesce window, if any."""
+        record_set = self._coordinator.get_record_set(self._type_id)
+        if record_set and record_set.coalesce_window > 0:
+            self._unsub_window = async_call_later(
+                self.hass, record_set.coalesce_window, self._async_window_closed
+            )
+
+    @callback
+    def _async_window_closed(self, _now: datetime) -> None:
+        """Write the updates held back during the window, as one state."""
+        self._unsub_window = None
+        if not self._pending:
+            return
+        self._burst_count = self._pending
+        self._pending = 0
+        self.async_write_ha_state()
+        # A stream that keeps going is written once per window
+        self._start_window()
+
+    @callback
+    def _cancel_window(self) -> None:
+        """Cancel the coalesce window timer."""
+        if self._unsub_window is not None:
+            self._unsub_window()
+            self._unsub_window = None
 
     @property
     def native_value(self) -> float | None:
@@ -102,5 +157,7 @@ class RecordSensor(SensorEntity):
         }
         if record.timestamp:
             attrs["timestamp"] = record.timestamp.isoformat()
+        if record_set.coalesce_window > 0:
+            attrs["burst_count"] = self._burst_count
 
         return attrs
@@ -0,0 +1,50 @@
+"""Chart series downsampling for Ha Health Record."""
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+
+def lttb(times: Sequence[int], values: Sequence[float], threshold: int) -> list[int]:
+    """Return the indexes kept by Largest-Triangle-Three-Buckets.
+
+    Keeps the first and last point and, from each of ``threshold - 2``
+    equal buckets in between, the point forming the largest triangle with
+    the previously kept point and the mean of the next bucket.  This keeps
+    the visual shape (peaks and dips) of a curve at a fixed point count.
+    """
+    count = len(times)
+    if threshold >= count or threshold < 3:
+        return list(range(count))
+
+    kept = [0]
+    every = (count - 2) / (threshold - 2)
+    previous = 0
+    for bucket in range(threshold - 2):
+        start = int(bucket * every) + 1
+        end = int((bucket + 1) * every) + 1
+
+        # Mean of the next bucket (the last point for the final bucket)
+        next_start = end
+        next_end = min(int((bucket + 2) * every) + 1, count)
+        if next_start >= next_end:
+            next_start, next_end = count - 1, count
+        span = next_end - next_start
+        mean_time = sum(times[next_start:next_end]) / span
+        mean_value = sum(values[next_start:next_end]) / span
+
+        previous_time = times[previous]
+        previous_value = values[previous]
+        best = start
+        best_area = -1.0
+        for index in range(start, end):
+            area = abs(
+                (previous_time - mean_time) * (values[index] - previous_value)
+                - (previous_time - times[index]) * (mean_value - previous_value)
+            )
+            if area > best_area:
+                best, best_area = index, area
+        kept.append(best)
+        previous = best
+
+    kept.append(count - 1)
+    return kept
@@ -0,0 +1,230 @@
+"""Service actions for Ha Health Record."""
+from __future__ import annotations
+
+import heapq
+import itertools
+from datetime import datetime
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import CONF_MEMBER_ID, DOMAIN
+from .coordinator import HealthRecordCoordinator, async_get_members
+from .importer import IMPORT_CSV, IMPORT_FORMATS, InvalidImport, async_import
+from .panel import valid_float
+
+SERVICE_IMPORT_RECORDS = "import_records"
+SERVICE_LOG_RECORD = "log_record"
+SERVICE_LOG_RECORDS = "log_records"
+SERVICE_QUERY_RECORDS = "query_records"
+
+DEFAULT_QUERY_LIMIT = 100
+MAX_QUERY_LIMIT = 10_000
+
+# Fields of one record to log
+_RECORD_FIELDS = {
+    vol.Required("record_type"): cv.string,
+    vol.Required("value"): valid_float,
+    vol.Optional("note", default=""): cv.string,
+    vol.Optional("timestamp"): cv.datetime,
+}
+
+LOG_RECORD_SCHEMA = vol.Schema(
+    {vol.Required(CONF_MEMBER_ID): cv.string, **_RECORD_FIELDS}
+)
+
+LOG_RECORDS_SCHEMA = vol.Schema(
+    {
+        # Default member of records that name none
+        vol.Optional(CONF_MEMBER_ID): cv.string,
+        vol.Required("records"): vol.All(
+            cv.ensure_list,
+            [vol.Schema({vol.Optional(CONF_MEMBER_ID): cv.string, **_RECORD_FIELDS})],
+            vol.Length(min=1),
+        ),
+    }
+)
+
+QUERY_RECORDS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_MEMBER_ID): cv.string,
+        vol.Optional("start_time"): cv.datetime,
+        vol.Optional("end_time"): cv.datetime,
+        vol.Optional("record_types"): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional("limit", default=DEFAULT_QUERY_LIMIT): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_QUERY_LIMIT)
+        ),
+    }
+)
+
+IMPORT_RECORDS_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_MEMBER_ID): cv.string,
+        vol.Exclusive("records", "data"): [dict],
+        vol.Exclusive("content", "data"): cv.string,
+        vol.Optional("format", default=IMPORT_CSV): vol.In(IMPORT_FORMATS),
+        vol.Optional("dedupe", default=True): cv.boolean,
+    }
+)
+
+
+def _get_coordinator(hass: HomeAssistant, member_id: str) -> HealthRecordCoordinator:
+    """Return the coordinator of a loaded member or raise."""
+    if (coordinator := async_get_members(hass).get(member_id)) is None:
+        raise ServiceValidationError(f"Member {member_id} not found")
+    if not coordinator.loaded:
+        raise ServiceValidationError(f"Member {member_id} is still loading")
+    return coordinator
+
+
+def _local(timestamp: datetime | None) -> datetime | None:
+    """Return a timestamp, taking one without an offset in the configured time zone."""
+    if timestamp is None or timestamp.tzinfo:
+        return timestamp
+    return timestamp.replace(tzinfo=dt_util.DEFAULT_TIME_ZONE)
+
+
+@callback
+def _async_log(
+    hass: HomeAssistant, entries: list[dict[str, Any]], default_member: str | None
+) -> None:
+    """Log records of one or more members, all or nothing.
+
+    Every entry is checked before any is logged.  Records are written to
+    the coordinators directly, leaving the members' current values and
+    notes (the input entities) untouched; each affected sensor updates
+    once and the record logged events follow.
+    """
+    batches: dict[str, list[tuple[str, float | None, str, datetime | None]]] = {}
+    coordinators: dict[str, HealthRecordCoordinator] = {}
+    for number, entry in enumerate(entries, 1):
+        if (member_id := entry.get(CONF_MEMBER_ID, default_member)) is None:
+            raise ServiceValidationError(f"Record {number}: no member_id given")
+        if member_id not in coordinators:
+            coordinators[member_id] = _get_coordinator(hass, member_id)
+        if entry["record_type"] not in coordinators[member_id].record_sets:
+            raise ServiceValidationError(
+                f"Record {number}: record type {entry['record_type']} not found"
+            )
+        batches.setdefault(member_id, []).append(
+            (
+                entry["record_type"],
+                entry["value"],
+                entry["note"],
+                _local(entry.get("timestamp")),
+            )
+        )
+
+    logged = [
+        (
+            coordinators[member_id],
+            batch,
+            coordinators[member_id].log_records(batch, update_inputs=False),
+        )
+        for member_id, batch in batches.items()
+    ]
+    for coordinator, batch, _ in logged:
+        coordinator.async_notify_updated(
+            dict.fromkeys(type_id for type_id, *_ in batch)
+        )
+    for coordinator, batch, records in logged:
+        for (type_id, *_), record in zip(batch, records, strict=True):
+            coordinator.async_fire_record_logged(type_id, record)
+
+
+async def _async_query(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
+    """Return the newest records matching a query, across members."""
+    if (member_id := data.get(CONF_MEMBER_ID)) is not None:
+        coordinators = [_get_coordinator(hass, member_id)]
+    else:
+        coordinators = [
+            coordinator
+            for coordinator in async_get_members(hass).values()
+            if coordinator.loaded
+        ]
+    start_time = _local(data.get("start_time")) or dt_util.utc_from_timestamp(0)
+    end_time = _local(data.get("end_time")) or datetime.max.replace(tzinfo=dt_util.UTC)
+    type_ids = set(data["record_types"]) if "record_types" in data else None
+    limit = data["limit"]
+
+    # Each member's page is already newest first; merge them k-way
+    pages = [
+        # One extra entry tells whether the result is truncated
+        await coordinator.async_get_records_page(
+            start_time, end_time, limit + 1, type_ids=type_ids
+        )
+        for coordinator in coordinators
+    ]
+    merged = heapq.merge(*pages, key=lambda item: item[0], reverse=True)
+    page = list(itertools.islice(merged, limit + 1))
+    return {
+        "records": [entry for _, entry in page[:limit]],
+        "truncated": len(page) > limit,
+    }
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration's service actions."""
+
+    async def async_log_record(call: ServiceCall) -> None:
+        """Log one record for a member."""
+        _async_log(hass, [call.data], None)
+
+    async def async_log_records(call: ServiceCall) -> None:
+        """Log a batch of records, possibly for several members."""
+        _async_log(hass, call.data["records"], call.data.get(CONF_MEMBER_ID))
+
+    async def async_query_records(call: ServiceCall) -> ServiceResponse:
+        """Return the newest records in a time range."""
+        return await _async_query(hass, call.data)
+
+    async def async_import_records(call: ServiceCall) -> ServiceResponse:
+        """Import historical records for one member."""
+        coordinator = _get_coordinator(hass, call.data[CONF_MEMBER_ID])
+        try:
+            return await async_import(
+                hass,
+                coordinator,
+                call.data.get("records"),
+                call.data.get("content"),
+                call.data["format"],
+                call.data["dedupe"],
+            )
+        except InvalidImport as err:
+            raise ServiceValidationError(
+                f"{err}: "
+                + "; ".join(f"row {e['row']}: {e['error']}" for e in err.errors)
+            ) from err
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_IMPORT_RECORDS,
+        async_import_records,
+        schema=IMPORT_RECORDS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_LOG_RECORD, async_log_record, schema=LOG_RECORD_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_LOG_RECORDS, async_log_records, schema=LOG_RECORDS_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_QUERY_RECORDS,
+        async_query_records,
+        schema=QUERY_RECORDS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
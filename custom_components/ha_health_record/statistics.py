@@ -0,0 +1,282 @@
+"""Long-term statistics of Ha Health Record history in the recorder.
+
+Each record type of a member is imported as an external statistic
+(``ha_health_record:<member>_<type>``) with one row per hour holding
+records: the mean, min and max of the values logged in the hour, the last
+of them as the state, and the running total of all values as the sum.
+
+Changes are tracked as the earliest affected time per record type; a
+short while after a change the rows from the start of that local day on
+are recomputed and imported again, replacing those in the recorder.  The
+running total before that day comes from the daily rollups, which the
+coordinator keeps current with every change.
+
+A statistic the recorder does not know yet is backfilled from all stored
+records; one it knows is brought up to date from its last row, which
+picks up records logged while the recorder was not running.
+
+Cores whose recorder does not take a mean type yet get the arithmetic
+mean through ``has_mean`` instead.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+    get_last_statistics,
+)
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util import slugify
+
+from .const import DOMAIN
+from .record_store import micros_to_datetime
+from .rollups import day_bounds, day_of
+from .storage import RecordStorage, partition_bounds
+
+try:
+    from homeassistant.components.recorder.models import StatisticMeanType
+except ImportError:
+    StatisticMeanType = None  # type: ignore[assignment,misc]
+
+if TYPE_CHECKING:
+    from .coordinator import HealthRecordCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Whether the recorder accepts a unit class in statistic metadata; older
+# cores reject keys they do not know
+_HAS_UNIT_CLASS = "unit_class" in StatisticMetaData.__annotations__
+
+STATISTICS_DELAY = 30  # seconds changes are collected before an import
+
+_HOUR = 3_600_000_000  # microseconds
+_END = 2**63 - 1
+
+# Hour bucket layout: [count, sum, min, max, last value]
+_COUNT, _SUM, _MIN, _MAX, _LAST = range(5)
+
+
+def statistic_id(member_id: str, type_id: str) -> str:
+    """Return the external statistic ID of a member's record type."""
+    return f"{DOMAIN}:{slugify(f'{member_id}_{type_id}')}"
+
+
+def _recorder_loaded(hass: HomeAssistant) -> bool:
+    """Return whether the recorder is set up and takes these statistics."""
+    return "recorder" in hass.config.components
+
+
+@callback
+def async_clear_statistics(
+    hass: HomeAssistant, member_id: str, type_ids: list[str]
+) -> None:
+    """Remove the statistics of a member's record types from the recorder."""
+    if _recorder_loaded(hass) and type_ids:
+        get_instance(hass).async_clear_statistics(
+            [statistic_id(member_id, type_id) for type_id in type_ids]
+        )
+
+
+class RecordStatistics:
+    """Keeps a member's external statistics in line with its records."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinator: HealthRecordCoordinator,
+        storage: RecordStorage,
+    ) -> None:
+        """Initialize the statistics of a member."""
+        self.hass = hass
+        self._coordinator = coordinator
+        self._storage = storage
+        # Earliest changed epoch microseconds, and changed hours, per type
+        self._since: dict[str, int] = {}
+        self._hours: dict[str, set[int]] = {}
+        self._unsub_import: CALLBACK_TYPE | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    @callback
+    def async_mark(self, type_id: str, micros: int) -> None:
+        """Note a record of a type added, changed or removed at ``micros``."""
+        self._since[type_id] = min(self._since.get(type_id, micros), micros)
+        self._hours.setdefault(type_id, set()).add(micros - micros % _HOUR)
+        self._async_schedule()
+
+    def pending(self) -> dict[str, Any]:
+        """Return the changes not imported yet, for storage."""
+        return {
+            type_id: {"since": since, "hours": sorted(self._hours.get(type_id, ()))}
+            for type_id, since in self._since.items()
+        }
+
+    @callback
+    def async_restore(self, pending: dict[str, Any]) -> None:
+        """Note the changes stored as not imported; ``async_start`` imports them."""
+        for type_id, changes in pending.items():
+            since = changes["since"]
+            self._since[type_id] = min(self._since.get(type_id, since), since)
+            self._hours.setdefault(type_id, set()).update(changes["hours"])
+
+    @callback
+    def _async_schedule(self) -> None:
+        """Import the changes after a delay, unless already scheduled."""
+        if self._unsub_import is None and _recorder_loaded(self.hass):
+            self._unsub_import = async_call_later(
+                self.hass, STATISTICS_DELAY, self._async_scheduled_import
+            )
+
+    @callback
+    def _async_scheduled_import(self, _now: datetime) -> None:
+        """Start an import, or wait for the running one."""
+        self._unsub_import = None
+        if self._task is not None and not self._task.done():
+            self._async_schedule()
+            return
+        self._async_start_import()
+
+    @callback
+    def _async_start_import(self) -> None:
+        """Run an import of the noted changes in the background."""
+        self._task = self.hass.async_create_background_task(
+            self.async_import(),
+            f"{DOMAIN} statistics of {self._coordinator.member_id}",
+        )
+
+    async def async_start(self) -> None:
+        """Backfill new statistics and catch up known ones.
+
+        Each type is recomputed from its last imported row, or from its
+        earliest change not imported yet if that is older, such as a
+        back-dated record logged while the recorder was unavailable.
+        """
+        if not _recorder_loaded(self.hass):
+            return
+        instance = get_instance(self.hass)
+        if not await instance.async_db_ready:
+            return
+        for type_id in self._coordinator.record_sets:
+            stat_id = statistic_id(self._coordinator.member_id, type_id)
+            last = await instance.async_add_executor_job(
+                get_last_statistics, self.hass, 1, stat_id, False, {"sum"}
+            )
+            since = int(last[stat_id][0]["start"] * 1_000_000) if last else 0
+            self._since[type_id] = min(self._since.get(type_id, since), since)
+        if self._since:
+            self._async_start_import()
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Stop importing; changes not imported yet are caught up on start."""
+        if self._unsub_import is not None:
+            self._unsub_import()
+            self._unsub_import = None
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+    async def async_import(self) -> None:
+        """Recompute and import the rows of every changed record type."""
+        since, self._since = self._since, {}
+        hours, self._hours = self._hours, {}
+        try:
+            for type_id, micros in since.items():
+                record_set = self._coordinator.record_sets.get(type_id)
+                if record_set is None:
+                    continue
+                rows = await self._async_rows(
+                    type_id, micros, hours.get(type_id, set())
+                )
+                if not rows:
+                    continue
+                metadata = StatisticMetaData(
+                    has_sum=True,
+                    name=f"{self._coordinator.member_name} {record_set.name}",
+                    source=DOMAIN,
+                    statistic_id=statistic_id(self._coordinator.member_id, type_id),
+                    unit_of_measurement=record_set.unit or None,
+                )
+                if StatisticMeanType is None:
+                    metadata["has_mean"] = True
+                else:
+                    metadata["mean_type"] = StatisticMeanType.ARITHMETIC
+                if _HAS_UNIT_CLASS:
+                    metadata["unit_class"] = None
+                async_add_external_statistics(self.hass, metadata, rows)
+                _LOGGER.debug(
+                    "Imported %d hourly statistics row(s) for %s",
+                    len(rows),
+                    metadata["statistic_id"],
+                )
+        except BaseException:
+            # Kept for the next import, or stored for the next start
+            self.async_restore(
+                {
+                    type_id: {"since": micros, "hours": hours.get(type_id, ())}
+                    for type_id, micros in since.items()
+                }
+            )
+            raise
+
+    async def _async_rows(
+        self, type_id: str, since: int, changed_hours: set[int]
+    ) -> list[StatisticData]:
+        """Return the hourly rows of a type from the local day of ``since`` on.
+
+        Hours in ``changed_hours`` that no longer hold a value get a row
+        carrying only the running total, replacing their old row.
+        """
+        day = day_of(max(since, 0))
+        day_start = day_bounds(day)[0]
+        first_hour = day_start - day_start % _HOUR
+        total = self._coordinator.rollups.sum_before(type_id, day)
+
+        buckets: dict[int, list[float]] = {}
+        for key in self._storage.partitions_between(first_hour, _END):
+            partition_start, partition_end = partition_bounds(key)
+            async with self._storage.async_hold([key]):
+                samples = self._coordinator.records.samples_between(
+                    max(first_hour, partition_start), partition_end
+                )
+                for micros, sample_type, value in samples:
+                    if sample_type != type_id or value is None:
+                        continue
+                    value = float(value)
+                    if micros < day_start:
+                        # Already counted in the rollups of the previous day
+                        total -= value
+                    hour = micros - micros % _HOUR
+                    if (bucket := buckets.get(hour)) is None:
+                        buckets[hour] = [1, value, value, value, value]
+                        continue
+                    bucket[_COUNT] += 1
+                    bucket[_SUM] += value
+                    bucket[_MIN] = min(bucket[_MIN], value)
+                    bucket[_MAX] = max(bucket[_MAX], value)
+                    bucket[_LAST] = value
+
+        rows: list[StatisticData] = []
+        hours = buckets.keys() | {h for h in changed_hours if h >= first_hour}
+        for hour in sorted(hours):
+            start = micros_to_datetime(hour)
+            if (bucket := buckets.get(hour)) is None:
+                rows.append(StatisticData(start=start, sum=total))
+                continue
+            total += bucket[_SUM]
+            rows.append(
+                StatisticData(
+                    start=start,
+                    mean=bucket[_SUM] / bucket[_COUNT],
+                    min=bucket[_MIN],
+                    max=bucket[_MAX],
+                    state=bucket[_LAST],
+                    sum=total,
+                )
+            )
+        return rows
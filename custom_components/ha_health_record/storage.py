@@ -0,0 +1,896 @@
+"""Journaled, time-partitioned persistence for Ha Health Record.
+
+Each member is persisted as a snapshot (a regular ``Store`` file) plus an
+append-only journal of mutations next to it.  Logging, editing or deleting
+a record appends one compact line to the journal; the snapshot is only
+rewritten when the journal is compacted.
+
+Records themselves live in one ``Store`` file per calendar month (UTC),
+``ha_health_record_<member_id>.<YYYY-MM>``.  The snapshot keeps a small
+summary of every partition (record count, latest record per type and the
+daily rollups of ``rollups.py``), so only the current month has to be read
+at startup; older months are loaded on demand and evicted again in
+least-recently-used order.
+
+Months that fall out of the hot window are archived: compaction rewrites
+them as gzip-compressed segments (``<key>.<YYYY-MM>.json.gz``), which load
+and query exactly like the plain files.  No record is ever dropped.
+
+Compaction keeps the event loop free: it only takes column snapshots of
+the partitions to write; building their rows and rollups, encoding the
+JSON and writing the files all happen in the executor.
+"""
+from __future__ import annotations
+
+import asyncio
+import gzip
+import inspect
+import logging
+import os
+import time
+from collections import Counter, OrderedDict
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
+from contextlib import asynccontextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from homeassistant.const import EVENT_HOMEASSISTANT_FINAL_WRITE
+from homeassistant.core import CALLBACK_TYPE, CoreState, Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.json import json_bytes, json_dumps
+from homeassistant.helpers.start import async_at_started
+from homeassistant.helpers.storage import STORAGE_DIR, Store
+from homeassistant.util import dt as dt_util
+from homeassistant.util.json import json_loads
+
+from .const import STORAGE_KEY, STORAGE_MINOR_VERSION, STORAGE_VERSION
+from .record_store import (
+    RecordStore,
+    datetime_to_micros,
+    micros_to_datetime,
+    parse_timestamp,
+    record_time,
+)
+from .rollups import DayBuckets, Rollups, compute_days, copy_days
+
+_LOGGER = logging.getLogger(__name__)
+
+# Keep encoding large stores out of the event loop; the option is only
+# passed to cores that support it
+_STORE_OPTIONS: dict[str, Any] = (
+    {"serialize_in_event_loop": False}
+    if "serialize_in_event_loop" in inspect.signature(Store.__init__).parameters
+    else {}
+)
+
+JOURNAL_FLUSH_DELAY = 1  # seconds -- batches rapid operations into a single append
+JOURNAL_COMPACT_THRESHOLD = 1_000  # journal entries before the snapshot is rewritten
+MAX_LOADED_PARTITIONS = 6  # cold partitions kept in memory besides the current one
+HOT_PARTITIONS = 3  # most recent months kept as plain files; older ones are archived
+
+# Journal operations
+OP_ADD = "add"
+OP_UPDATE = "update"
+OP_DELETE = "delete"
+OP_STATE = "state"
+
+# Journal header generation, entries and whether any line was skipped
+type _Journal = tuple[int | None, list[dict[str, Any]], bool]
+
+# hass.data key of the member storage reads started ahead of entry setup
+DATA_PREFETCH = f"{STORAGE_KEY}_prefetch"
+
+
+def _storage_key(member_id: str) -> str:
+    """Return the storage key for a member."""
+    return f"{STORAGE_KEY}_{member_id}"
+
+
+def partition_key(micros: int) -> str:
+    """Return the partition holding records at the given epoch microseconds."""
+    value = micros_to_datetime(micros)
+    return f"{value.year:04d}-{value.month:02d}"
+
+
+def partition_bounds(key: str) -> tuple[int, int]:
+    """Return the [start, end) epoch microseconds covered by a partition."""
+    year, month = (int(part) for part in key.split("-"))
+    start = datetime(year, month, 1, tzinfo=dt_util.UTC)
+    end = (
+        datetime(year + 1, 1, 1, tzinfo=dt_util.UTC)
+        if month == 12
+        else datetime(year, month + 1, 1, tzinfo=dt_util.UTC)
+    )
+    return datetime_to_micros(start), datetime_to_micros(end)
+
+
+def _partition_age(key: str, current: str) -> int:
+    """Return how many months a partition lies before the current one."""
+    year, month = (int(part) for part in key.split("-"))
+    current_year, current_month = (int(part) for part in current.split("-"))
+    return (current_year - year) * 12 + current_month - month
+
+
+def _timestamp_partition(timestamp: Any) -> str | None:
+    """Return the partition of an ISO timestamp, or None if it is invalid."""
+    try:
+        return partition_key(parse_timestamp(timestamp)[0])
+    except (TypeError, ValueError):
+        return None
+
+
+def _journal_path(hass: HomeAssistant, member_id: str) -> Path:
+    """Return the journal file path for a member."""
+    return Path(hass.config.path(STORAGE_DIR, f"{_storage_key(member_id)}.journal"))
+
+
+def _read_journal(path: Path) -> _Journal:
+    """Read a journal file.
+
+    Returns the generation from its header line, the decoded entries and
+    whether any line had to be skipped.  A torn final line (from a crash
+    mid-append) is expected and dropped.
+    """
+    try:
+        lines = path.read_text(encoding="utf-8").split("\n")
+    except FileNotFoundError:
+        return None, [], False
+
+    generation: int | None = None
+    entries: list[dict[str, Any]] = []
+    skipped = False
+    last = len(lines) - 1
+    for number, line in enumerate(lines):
+        if not line:
+            continue
+        try:
+            entry = json_loads(line)
+        except ValueError:
+            if number == last:
+                _LOGGER.warning("Ignoring torn final entry in %s", path.name)
+            else:
+                _LOGGER.warning(
+                    "Skipping corrupt entry %d in %s", number + 1, path.name
+                )
+            skipped = True
+            continue
+        if not isinstance(entry, dict):
+            skipped = True
+            continue
+        if number == 0 and "generation" in entry:
+            generation = entry["generation"]
+            continue
+        entries.append(entry)
+
+    return generation, entries, skipped
+
+
+def _append_journal(
+    path: Path, generation: int, lines: list[str], reset: bool = False
+) -> None:
+    """Append lines to a journal file and flush them to disk.
+
+    With ``reset``, the journal is started over for ``generation`` first.
+    A torn final line left by a crash mid-append is ended before the new
+    lines, so they are not lost with it.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w+b" if reset else "a+b") as file:
+        if (size := file.seek(0, os.SEEK_END)) == 0:
+            file.write(json_bytes({"generation": generation}) + b"\n")
+        else:
+            file.seek(size - 1)
+            if file.read(1) != b"\n":
+                file.write(b"\n")
+        file.write("".join(lines).encode("utf-8"))
+        file.flush()
+        os.fsync(file.fileno())
+
+
+def _reset_journal(path: Path, generation: int) -> None:
+    """Start an empty journal for a new snapshot generation."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as file:
+        file.write(json_dumps({"generation": generation}) + "\n")
+        file.flush()
+        os.fsync(file.fileno())
+
+
+def _add_record_times(data: dict[str, Any]) -> None:
+    """Add ``ts``/``tz`` to the records of snapshot or partition data.
+
+    Records whose timestamp cannot be parsed are left for loading to skip.
+    """
+    rows: list[dict[str, Any]] = list(data.get("records") or [])
+    for summary in (data.get("partitions") or {}).values():
+        rows.extend(summary.get("latest", {}).values())
+    for row in rows:
+        try:
+            row["ts"], row["tz"] = parse_timestamp(row["timestamp"])
+        except (KeyError, TypeError, ValueError):
+            continue
+
+
+class _RecordsStore(Store[dict[str, Any]]):
+    """Store of a member snapshot or partition.
+
+    Remembers whether its data was migrated on load, so the caller can
+    write it back in the current format.
+    """
+
+    migrated = False
+
+    async def _async_migrate_func(
+        self,
+        old_major_version: int,
+        old_minor_version: int,
+        old_data: dict[str, Any],
+    ) -> dict[str, Any]:
+        """Migrate to the current minor version."""
+        if old_major_version == 1 and old_minor_version < 2:
+            await self.hass.async_add_executor_job(_add_record_times, old_data)
+        self.migrated = True
+        return old_data
+
+
+def _snapshot_store(hass: HomeAssistant, member_id: str) -> _RecordsStore:
+    """Return the snapshot store of a member."""
+    return _RecordsStore(
+        hass,
+        STORAGE_VERSION,
+        _storage_key(member_id),
+        minor_version=STORAGE_MINOR_VERSION,
+        atomic_writes=True,
+        **_STORE_OPTIONS,
+    )
+
+
+async def _async_read_member(
+    hass: HomeAssistant, member_id: str
+) -> tuple[_RecordsStore, dict[str, Any] | None, _Journal, float]:
+    """Read (and decode, in the executor) a member's snapshot and journal.
+
+    Returns the snapshot store, its data, the journal and the seconds taken.
+    """
+    started = time.perf_counter()
+    store = _snapshot_store(hass, member_id)
+    data, journal = await asyncio.gather(
+        store.async_load(),
+        hass.async_add_executor_job(_read_journal, _journal_path(hass, member_id)),
+    )
+    return store, data, journal, time.perf_counter() - started
+
+
+@callback
+def async_prefetch(hass: HomeAssistant, member_ids: Iterable[str]) -> None:
+    """Start reading the snapshots and journals of members concurrently.
+
+    Each member's ``RecordStorage.async_load`` then takes over its read
+    instead of starting one once its config entry is set up.  Reads still
+    unclaimed once Home Assistant has started (a member whose entry is not
+    set up) are released then.  Only done during startup; entries set up
+    later have nothing to overlap with.
+    """
+    if hass.state is CoreState.running:
+        return
+    prefetch = hass.data.setdefault(DATA_PREFETCH, {})
+    for member_id in member_ids:
+        prefetch[member_id] = hass.async_create_background_task(
+            _async_read_member(hass, member_id), f"{STORAGE_KEY} prefetch {member_id}"
+        )
+    async_at_started(hass, _async_release_prefetch)
+
+
+@callback
+def _async_release_prefetch(hass: HomeAssistant) -> None:
+    """Drop the reads no member took over, with the data they loaded."""
+    for member_id, read in hass.data.pop(DATA_PREFETCH, {}).items():
+        read.cancel()
+        _LOGGER.debug("Released unclaimed storage read of member %s", member_id)
+
+
+def _archive_path(hass: HomeAssistant, key: str) -> Path:
+    """Return the path of an archive segment."""
+    return Path(hass.config.path(STORAGE_DIR, f"{key}.json.gz"))
+
+
+def _read_archive(path: Path) -> list[dict[str, Any]]:
+    """Read the records of an archive segment."""
+    try:
+        with gzip.open(path, "rb") as file:
+            return json_loads(file.read())["records"]
+    except FileNotFoundError:
+        return []
+
+
+def _write_archive(path: Path, rows: list[dict[str, Any]]) -> None:
+    """Atomically write the records of an archive segment."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp = path.with_name(f"{path.name}.tmp")
+    with temp.open("wb") as file:
+        with gzip.GzipFile(fileobj=file, mode="wb") as archive:
+            archive.write(json_bytes({"records": rows}))
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp, path)
+
+
+def _remove_archive(path: Path) -> None:
+    """Delete an archive segment if present."""
+    path.unlink(missing_ok=True)
+
+
+def _remove_member_files(storage_dir: Path, key: str) -> None:
+    """Delete the journal and partition files of a member."""
+    for path in storage_dir.glob(f"{key}.*"):
+        path.unlink(missing_ok=True)
+
+
+async def async_remove_storage(hass: HomeAssistant, member_id: str) -> None:
+    """Remove all stored data for a member."""
+    store: Store[dict[str, Any]] = Store(
+        hass, STORAGE_VERSION, _storage_key(member_id)
+    )
+    await store.async_remove()
+    await hass.async_add_executor_job(
+        _remove_member_files,
+        Path(hass.config.path(STORAGE_DIR)),
+        _storage_key(member_id),
+    )
+
+
+def _summarize(
+    rows: list[dict[str, Any]], archived: bool, days: DayBuckets
+) -> dict[str, Any]:
+    """Return the snapshot summary of a partition's (sorted) rows."""
+    latest: dict[str, dict[str, Any]] = {}
+    for row in rows:
+        latest[row["record_type"]] = row
+    return {
+        "count": len(rows),
+        "latest": latest,
+        "archived": archived,
+        # Copied, as the live buckets keep changing between compactions
+        "days": copy_days(days),
+    }
+
+
+def _prepare_partition(
+    snapshot: RecordStore, bounds: tuple[int, int], archived: bool
+) -> tuple[list[dict[str, Any]], DayBuckets, dict[str, Any]]:
+    """Return the rows, day buckets and summary of a partition snapshot.
+
+    Runs in the executor; the snapshot is not shared with the event loop.
+    """
+    rows = list(snapshot)
+    days = compute_days(snapshot.samples_between(*bounds))
+    return rows, days, _summarize(rows, archived, days)
+
+
+class RecordStorage:
+    """Snapshot, append-only journal and record partitions for one member.
+
+    Journal entries are idempotent (``add``/``update`` carry the full record
+    and replace any record with the same id, ``delete`` ignores missing
+    ids), and the journal header names the snapshot generation it extends,
+    so a crash at any point during compaction replays to the same state.
+    Partition files are written before the snapshot that summarizes them.
+
+    A partition is resident when all of its records are in ``records``.
+    Rows may be added to a partition that is not resident (back-dated
+    records); loading it later merges the file underneath them.  Editing
+    or deleting a record requires its partition to be resident.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        member_id: str,
+        records: RecordStore,
+        rollups: Rollups,
+        state: Callable[[], dict[str, Any]],
+    ) -> None:
+        """Initialize the storage."""
+        self.hass = hass
+        self._member_id = member_id
+        self._key = _storage_key(member_id)
+        self._records = records
+        self._rollups = rollups
+        self._state = state
+        self._store = _snapshot_store(hass, member_id)
+        self._journal_path = _journal_path(hass, member_id)
+        self._generation = 0
+        self._journal_entries = 0
+        # Set while the journal on disk extends an older snapshot generation
+        self._journal_stale = False
+        self._pending: list[str] = []
+        self._lock = asyncio.Lock()
+        self._unsub_flush: CALLBACK_TYPE | None = None
+        self._unsub_final_write: CALLBACK_TYPE | None = None
+
+        # Partition key -> summary, for every partition file on disk
+        self._summaries: dict[str, dict[str, Any]] = {}
+        # Resident partitions with a file, least recently used first
+        self._loaded: OrderedDict[str, None] = OrderedDict()
+        # Partitions with changes not yet written to their file, and those
+        # a running compaction is writing
+        self._dirty: set[str] = set()
+        self._writing: set[str] = set()
+        self._holds: Counter[str] = Counter()
+        self._loading: dict[str, asyncio.Task[None]] = {}
+
+        # Set when the on-disk state should be rewritten after loading
+        self.needs_compaction = False
+        # Set while records are still being migrated into memory; the old
+        # snapshot must not be replaced until they all are
+        self.migrating = False
+
+        # Seconds taken to read the snapshot and journal, and timing of the
+        # last compaction
+        self.read_time: float | None = None
+        self.last_compaction: dict[str, float] = {}
+        self._waited = 0.0
+
+    async def async_load(self) -> tuple[dict[str, Any] | None, list[dict[str, Any]]]:
+        """Load the snapshot and the journal entries to replay on top of it.
+
+        Takes over the read started by ``async_prefetch``, if any.
+        """
+        read = self.hass.data.get(DATA_PREFETCH, {}).pop(self._member_id, None)
+        if read is None:
+            read = _async_read_member(self.hass, self._member_id)
+        self._store, data, journal, self.read_time = await read
+        generation, entries, skipped = journal
+
+        self._generation = data.get("generation", 0) if data else 0
+        if generation is not None and generation < self._generation:
+            # Compaction wrote the snapshot but not the fresh journal
+            _LOGGER.debug("Discarding stale journal %s", self._journal_path.name)
+            entries = []
+            skipped = True
+
+        self._journal_entries = len(entries)
+        self.needs_compaction = bool(entries) or skipped or self._store.migrated
+
+        if self._unsub_final_write is None:
+            self._unsub_final_write = self.hass.bus.async_listen_once(
+                EVENT_HOMEASSISTANT_FINAL_WRITE, self._async_handle_final_write
+            )
+
+        return data, entries
+
+    async def async_load_records(
+        self, data: dict[str, Any], journal: list[dict[str, Any]]
+    ) -> None:
+        """Load the current partition and those touched by the journal.
+
+        Snapshots from before partitioning carry every record inline under
+        ``records``; those are loaded whole and written out as partitions
+        on the next compaction.
+        """
+        self._summaries = data.get("partitions", {})
+        for key, summary in self._summaries.items():
+            if "days" in summary:
+                # Summaries are saved off the loop, so never share live buckets
+                self._rollups.load_partition(key, copy_days(summary["days"]))
+            else:
+                # Summaries from before rollups are filled in by compaction
+                self._dirty.add(key)
+                self.needs_compaction = True
+        current = self.current_partition()
+        if any(
+            not summary.get("archived") and self._should_archive(key, current)
+            for key, summary in self._summaries.items()
+        ):
+            self.needs_compaction = True
+        if legacy := data.get("records"):
+            self._records.load(legacy)
+            for record in self._records:
+                self._dirty.add(partition_key(record["ts"]))
+            self.needs_compaction = True
+
+        await self.async_load_journal_partitions(journal)
+
+    async def async_load_journal_partitions(
+        self, journal: list[dict[str, Any]]
+    ) -> None:
+        """Load the current partition and those touched by journal entries."""
+        keys = {self.current_partition()}
+        for entry in journal:
+            if isinstance(record := entry.get("record"), dict):
+                keys.add(_timestamp_partition(record.get("timestamp")))
+            keys.add(_timestamp_partition(entry.get("timestamp")))
+        keys.discard(None)
+        await self.async_ensure_loaded(keys)
+
+    # ── Partitions ──────────────────────────────────────────────────
+
+    @staticmethod
+    def current_partition() -> str:
+        """Return the partition receiving new records."""
+        return partition_key(datetime_to_micros(dt_util.utcnow()))
+
+    @staticmethod
+    def _should_archive(key: str, current: str) -> bool:
+        """Return whether a partition belongs in the archive tier."""
+        return _partition_age(key, current) >= HOT_PARTITIONS
+
+    def _archive_path(self, key: str) -> Path:
+        """Return the archive segment path of a partition."""
+        return _archive_path(self.hass, f"{self._key}.{key}")
+
+    def _partition_store(self, key: str) -> _RecordsStore:
+        """Return the store of a partition."""
+        return _RecordsStore(
+            self.hass,
+            STORAGE_VERSION,
+            f"{self._key}.{key}",
+            minor_version=STORAGE_MINOR_VERSION,
+            atomic_writes=True,
+            **_STORE_OPTIONS,
+        )
+
+    def is_resident(self, key: str) -> bool:
+        """Return whether all records of a partition are in memory."""
+        return key in self._loaded or key not in self._summaries
+
+    def partitions(self) -> list[str]:
+        """Return every partition holding records, oldest first."""
+        return sorted(set(self._summaries) | self._dirty | self._writing)
+
+    def partitions_between(self, start: int, end: int) -> list[str]:
+        """Return the partitions overlapping [start, end), oldest first."""
+        return [
+            key
+            for key in self.partitions()
+            if (bounds := partition_bounds(key))[0] < end and bounds[1] > start
+        ]
+
+    def total(self) -> int:
+        """Return the number of stored records, loaded or not."""
+        return len(self._records) + sum(
+            summary["count"]
+            for key, summary in self._summaries.items()
+            if key not in self._loaded
+        )
+
+    def diagnostics(self) -> dict[str, Any]:
+        """Return counts and timings of the storage (no record contents)."""
+        return {
+            "records_resident": len(self._records),
+            "records_total": self.total(),
+            "partitions": len(self._summaries),
+            "partitions_loaded": sorted(self._loaded),
+            "partitions_dirty": sorted(self._dirty),
+            "journal_entries": self._journal_entries + len(self._pending),
+            "generation": self._generation,
+            "read_time": self.read_time,
+            "last_compaction": self.last_compaction,
+        }
+
+    def latest(self, type_id: str) -> dict[str, Any] | None:
+        """Return the most recent record of a type, loaded or not."""
+        best_micros = self._records.latest_timestamp(type_id)
+        best: dict[str, Any] | None = None
+        for key, summary in self._summaries.items():
+            if key in self._loaded or (row := summary["latest"].get(type_id)) is None:
+                continue
+            micros = record_time(row)[0]
+            if best_micros is None or micros > best_micros:
+                best_micros, best = micros, row
+        return best if best is not None else self._records.latest(type_id)
+
+    async def async_ensure_loaded(self, keys: Iterable[str]) -> None:
+        """Load the given partitions that are not resident."""
+        tasks: list[asyncio.Task[None]] = []
+        for key in keys:
+            if key in self._loaded:
+                self._loaded.move_to_end(key)
+                continue
+            if key not in self._summaries:
+                continue
+            if (task := self._loading.get(key)) is None:
+                task = self.hass.async_create_task(self._async_load_partition(key))
+                # An eagerly started load may already have finished
+                if not task.done():
+                    self._loading[key] = task
+            tasks.append(task)
+        if tasks:
+            await asyncio.gather(*tasks)
+
+    async def _async_load_partition(self, key: str) -> None:
+        """Read a partition file into memory."""
+        try:
+            if self._summaries[key].get("archived"):
+                rows = await self.hass.async_add_executor_job(
+                    _read_archive, self._archive_path(key)
+                )
+                outdated = bool(rows) and "ts" not in rows[0]
+            else:
+                store = self._partition_store(key)
+                data = await store.async_load()
+                rows = data["records"] if data else []
+                outdated = store.migrated
+            added = self._records.merge(rows)
+            if outdated:
+                # Written again in the current format by the next compaction
+                self._dirty.add(key)
+            self._loaded[key] = None
+            _LOGGER.debug("Loaded %d record(s) from partition %s", added, key)
+        finally:
+            self._loading.pop(key, None)
+
+    @asynccontextmanager
+    async def async_hold(self, keys: Iterable[str]) -> AsyncIterator[None]:
+        """Keep the given partitions resident for the duration of the block."""
+        keys = list(keys)
+        self._holds.update(keys)
+        try:
+            await self.async_ensure_loaded(keys)
+            yield
+        finally:
+            self._holds.subtract(keys)
+            self._async_evict()
+
+    @callback
+    def _async_evict(self) -> None:
+        """Drop least recently used cold partitions beyond the limit."""
+        current = self.current_partition()
+        excess = len(self._loaded) - (current in self._loaded) - MAX_LOADED_PARTITIONS
+        for key in list(self._loaded):
+            if excess <= 0:
+                break
+            if key == current or key in self._dirty or self._holds[key] > 0:
+                continue
+            self._records.remove_between(*partition_bounds(key))
+            del self._loaded[key]
+            excess -= 1
+
+    @callback
+    def async_mark_dirty(self, micros: int) -> None:
+        """Record that the partition holding ``micros`` has changed."""
+        self._dirty.add(partition_key(micros))
+
+    # ── Journal ─────────────────────────────────────────────────────
+
+    @callback
+    def async_append(self, entry: dict[str, Any]) -> None:
+        """Queue a journal entry and schedule a delayed flush."""
+        self._pending.append(json_dumps(entry) + "\n")
+        if self._unsub_flush is None:
+            self._unsub_flush = async_call_later(
+                self.hass, JOURNAL_FLUSH_DELAY, self._async_scheduled_flush
+            )
+
+    async def _async_scheduled_flush(self, _now: datetime) -> None:
+        """Flush queued entries when the delay expires."""
+        self._unsub_flush = None
+        await self.async_flush()
+
+    @callback
+    def _async_cancel_flush(self) -> None:
+        """Cancel a scheduled flush."""
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+            self._unsub_flush = None
+
+    async def async_flush(self) -> None:
+        """Append queued entries to the journal, compacting when it grows."""
+        async with self._lock:
+            self._async_cancel_flush()
+            if not self._pending:
+                return
+            lines, self._pending = self._pending, []
+            try:
+                await self.hass.async_add_executor_job(
+                    _append_journal,
+                    self._journal_path,
+                    self._generation,
+                    lines,
+                    self._journal_stale,
+                )
+            except OSError:
+                _LOGGER.exception("Failed to write %s", self._journal_path.name)
+                self._pending[:0] = lines
+                return
+            self._journal_stale = False
+            self._journal_entries += len(lines)
+
+        if self._journal_entries >= JOURNAL_COMPACT_THRESHOLD:
+            await self.async_compact()
+
+    async def _async_wait[T](self, awaitable: Awaitable[T]) -> T:
+        """Await off-loop work, leaving it out of the compaction's loop time."""
+        started = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            self._waited += time.perf_counter() - started
+
+    async def async_compact(self) -> None:
+        """Write changed partitions and a fresh snapshot, then an empty journal."""
+        if self.migrating:
+            self.needs_compaction = True
+            return
+        async with self._lock:
+            started = time.perf_counter()
+            self._waited = 0.0
+            self._async_cancel_flush()
+            # Entries queued from here on may postdate what gets written
+            written = len(self._pending)
+            current = self.current_partition()
+            dirty, self._dirty = self._dirty, set()
+            # Months that left the hot window move to the archive tier
+            dirty.update(
+                key
+                for key, summary in self._summaries.items()
+                if not summary.get("archived") and self._should_archive(key, current)
+            )
+            # Held until written, then loaded one at a time to bound memory
+            held = set(dirty)
+            self._holds.update(held)
+            self._writing = set(dirty)
+            # Superseded files are only removed once the new snapshot is saved
+            obsolete: list[tuple[str, bool]] = []
+            try:
+                for key in sorted(dirty):
+                    await self._async_wait(self.async_ensure_loaded([key]))
+                    bounds = partition_bounds(key)
+                    was_archived = self._summaries.get(key, {}).get("archived")
+                    archived = self._should_archive(key, current)
+                    if not self._records.count_between(*bounds):
+                        self._rollups.discard(key)
+                        if key in self._summaries:
+                            obsolete.append((key, was_archived))
+                            del self._summaries[key]
+                            self._loaded.pop(key, None)
+                    else:
+                        rows, days, summary = await self._async_wait(
+                            self.hass.async_add_executor_job(
+                                _prepare_partition,
+                                self._records.snapshot_between(*bounds),
+                                bounds,
+                                archived,
+                            )
+                        )
+                        if key in self._dirty:
+                            # Changed while its rollups were computed
+                            self._rollups.rebuild(
+                                key, self._records.samples_between(*bounds)
+                            )
+                        else:
+                            self._rollups.load_partition(key, days)
+                        await self._async_wait(
+                            self._async_write_partition(key, rows, archived)
+                        )
+                        if key in self._summaries and was_archived != archived:
+                            obsolete.append((key, was_archived))
+                        self._summaries[key] = summary
+                        self._loaded[key] = None
+                    held.discard(key)
+                    self._holds[key] -= 1
+                    self._async_evict()
+
+                data = self._state()
+                data["partitions"] = dict(self._summaries)
+                data["generation"] = self._generation + 1
+                await self._async_wait(self._store.async_save(data))
+                self._generation += 1
+                # Until reset, entries appended to the old journal would be
+                # discarded as stale on the next load
+                self._journal_stale = True
+                await self._async_wait(
+                    self.hass.async_add_executor_job(
+                        _reset_journal, self._journal_path, self._generation
+                    )
+                )
+                self._journal_stale = False
+                for key, was_archived in obsolete:
+                    await self._async_wait(
+                        self._async_remove_partition_file(key, was_archived)
+                    )
+            except BaseException:
+                self._dirty |= dirty
+                raise
+            finally:
+                self._holds.subtract(held)
+                self._writing = set()
+
+            del self._pending[:written]
+            self._journal_entries = 0
+            self.needs_compaction = False
+            duration = time.perf_counter() - started
+            self.last_compaction = {
+                "duration": duration,
+                "loop_time": duration - self._waited,
+            }
+            _LOGGER.debug(
+                "Compacted %s (%d partition(s)) in %.1f ms, %.1f ms on the event loop",
+                self._key,
+                len(dirty),
+                duration * 1000,
+                (duration - self._waited) * 1000,
+            )
+            if self._pending:
+                self._unsub_flush = async_call_later(
+                    self.hass, JOURNAL_FLUSH_DELAY, self._async_scheduled_flush
+                )
+
+        self._async_evict()
+
+    async def async_release(self, keys: Iterable[str]) -> None:
+        """Write the given partitions to their files and drop them from memory.
+
+        Used while records are migrated, when compaction may not replace
+        the old snapshot yet: the files are written ahead of the snapshot
+        that will summarize them, as compaction does, and that snapshot is
+        saved by the compaction ending the migration.  The current
+        partition, and one changed while it was written, stay resident.
+        """
+        current = self.current_partition()
+        async with self._lock:
+            for key in sorted(keys):
+                if key == current:
+                    continue
+                async with self.async_hold([key]):
+                    bounds = partition_bounds(key)
+                    archived = self._should_archive(key, current)
+                    self._dirty.discard(key)
+                    self._writing.add(key)
+                    try:
+                        rows, days, summary = await self.hass.async_add_executor_job(
+                            _prepare_partition,
+                            self._records.snapshot_between(*bounds),
+                            bounds,
+                            archived,
+                        )
+                        await self._async_write_partition(key, rows, archived)
+                    except BaseException:
+                        self._dirty.add(key)
+                        raise
+                    finally:
+                        self._writing.discard(key)
+                    self._summaries[key] = summary
+                    if key in self._dirty:
+                        self._rollups.rebuild(
+                            key, self._records.samples_between(*bounds)
+                        )
+                        self._loaded[key] = None
+                    else:
+                        self._rollups.load_partition(key, days)
+                        self._records.remove_between(*bounds)
+                        self._loaded.pop(key, None)
+                _LOGGER.debug("Released partition %s of %s", key, self._key)
+
+    async def _async_write_partition(
+        self, key: str, rows: list[dict[str, Any]], archived: bool
+    ) -> None:
+        """Write the rows of a partition to its plain or archived file."""
+        if archived:
+            await self.hass.async_add_executor_job(
+                _write_archive, self._archive_path(key), rows
+            )
+        else:
+            await self._partition_store(key).async_save({"records": rows})
+
+    async def _async_remove_partition_file(self, key: str, archived: bool) -> None:
+        """Delete the plain or archived file of a partition."""
+        if archived:
+            await self.hass.async_add_executor_job(
+                _remove_archive, self._archive_path(key)
+            )
+        else:
+            await self._partition_store(key).async_remove()
+
+    async def _async_handle_final_write(self, _event: Event) -> None:
+        """Flush queued entries before Home Assistant stops."""
+        self._unsub_final_write = None
+        await self.async_flush()
+
+    async def async_shutdown(self) -> None:
+        """Flush queued entries and stop listening for shutdown."""
+        if self._unsub_final_write is not None:
+            self._unsub_final_write()
+            self._unsub_final_write = None
+        await self.async_flush()
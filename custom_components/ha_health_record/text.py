@@ -5,11 +5,13 @@ import logging
 
 from homeassistant.components.text import TextEntity, TextMode
 from homeassistant.const import EntityCategory
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from . import HaHealthRecordConfigEntry
-from .coordinator import HealthRecordCoordinator
+from .coordinator import signal_record_set_added
+from .entity import RecordSetEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -34,30 +36,27 @@ async def async_setup_entry(
 
     async_add_entities(entities)
 
+    @callback
+    def async_add_record_set(type_id: str) -> None:
+        """Add the text entity of a record set added at runtime."""
+        async_add_entities([RecordNoteText(coordinator=coordinator, type_id=type_id)])
 
-class RecordNoteText(TextEntity):
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, signal_record_set_added(coordinator.member_id), async_add_record_set
+        )
+    )
+
+
+class RecordNoteText(RecordSetEntity, TextEntity):
     """Text entity for record note input."""
 
     _attr_entity_category = EntityCategory.CONFIG
-    _attr_has_entity_name = True
     _attr_mode = TextMode.TEXT
     _attr_native_max = 255
     _attr_translation_key = "record_note"
-
-    def __init__(
-        self,
-        coordinator: HealthRecordCoordinator,
-        type_id: str,
-    ) -> None:
-        """Initialize the text entity."""
-        self._coordinator = coordinator
-        self._type_id = type_id
-        record_set = coordinator.get_record_set(type_id)
-
-        self._attr_unique_id = f"{coordinator.member_id}_{type_id}_note"
-        self._attr_translation_placeholders = {"record_name": record_set.name}
-        self._attr_device_info = coordinator.get_device_info()
-        self._attr_icon = "mdi:note-text"
+    _attr_icon = "mdi:note-text"
+    _unique_id_suffix = "note"
 
     @property
     def native_value(self) -> str | None:
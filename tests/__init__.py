@@ -0,0 +1 @@
+"""Tests for the Ha Health Record integration."""
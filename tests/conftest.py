@@ -0,0 +1,82 @@
+"""Fixtures for Ha Health Record tests."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Generator
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.ha_health_record.const import DOMAIN
+
+pytest_plugins = "pytest_homeassistant_custom_component"
+
+MEMBER_ID = "bob"
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(
+    enable_custom_integrations: None, hass: HomeAssistant, tmp_path
+) -> Generator[None]:
+    """Enable the integration, with journals under a temporary directory.
+
+    The sidebar panel needs the frontend, so it is left out.
+    """
+    hass.config.config_dir = str(tmp_path)
+    hass.config.components.add("frontend")
+    with (
+        patch("custom_components.ha_health_record.async_setup_panel", AsyncMock()),
+        patch("custom_components.ha_health_record.async_unload_panel", AsyncMock()),
+    ):
+        yield
+
+
+@pytest.fixture
+def config_entry(hass: HomeAssistant) -> MockConfigEntry:
+    """Return a member config entry with two record types."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        version=2,
+        title="Bob",
+        data={"member_id": MEMBER_ID, "member_name": "Bob"},
+        options={
+            "record_sets": [
+                {
+                    "record_type": "feeding",
+                    "record_name": "Feeding",
+                    "record_unit": "ml",
+                },
+                {
+                    "record_type": "weight",
+                    "record_name": "Weight",
+                    "record_unit": "kg",
+                },
+            ]
+        },
+    )
+    entry.add_to_hass(hass)
+    return entry
+
+
+async def async_wait_loaded(hass: HomeAssistant, entry: MockConfigEntry) -> None:
+    """Wait for the background load of a member to finish."""
+    await hass.async_block_till_done(wait_background_tasks=True)
+    for _ in range(200):
+        if entry.runtime_data.loaded:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("member not loaded")
+
+
+async def async_setup_member(hass: HomeAssistant, entry: MockConfigEntry) -> None:
+    """Set up a member config entry and wait for its data to load."""
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await async_wait_loaded(hass, entry)
+
+
+async def async_reload_member(hass: HomeAssistant, entry: MockConfigEntry) -> None:
+    """Reload a member config entry and wait for its data to load."""
+    assert await hass.config_entries.async_reload(entry.entry_id)
+    await async_wait_loaded(hass, entry)
@@ -0,0 +1,265 @@
+"""Tests for the Ha Health Record coordinator."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.ha_health_record.coordinator import HealthRecordCoordinator
+from custom_components.ha_health_record.record_store import datetime_to_micros
+from custom_components.ha_health_record.storage import partition_key
+
+from .conftest import async_reload_member, async_setup_member
+
+START = datetime(2024, 3, 10, 8, 0, tzinfo=dt_util.UTC)
+
+
+def _row(coordinator: HealthRecordCoordinator, record_id: str) -> dict | None:
+    """Return the loaded record with an id, found through the id index."""
+    index = coordinator.records.find("", "", record_id)
+    return None if index is None else coordinator.records.row(index)
+
+
+async def test_records_in_range(
+    hass: HomeAssistant, config_entry: MockConfigEntry
+) -> None:
+    """Test range queries are inclusive and ordered, however records were logged."""
+    await async_setup_member(hass, config_entry)
+    coordinator = config_entry.runtime_data
+    # Logged out of order, with a tie at the end of the range
+    coordinator.log_records(
+        [
+            ("feeding", hours, "", START + timedelta(hours=hours))
+            for hours in (5, 1, 3, 0, 4, 2, 4)
+        ]
+    )
+
+    entries = coordinator.get_records_in_range(
+        START + timedelta(hours=1), START + timedelta(hours=4)
+    )
+
+    assert [entry["value"] for entry in entries] == [1, 2, 3, 4, 4]
+    assert coordinator.get_records_in_range(
+        START + timedelta(minutes=1), START + timedelta(minutes=59)
+    ) == []
+
+
+async def test_edit_by_id_loads_the_record_partition(
+    hass: HomeAssistant, config_entry: MockConfigEntry
+) -> None:
+    """Test records in unloaded partitions are found by id, whatever the timestamp."""
+    await async_setup_member(hass, config_entry)
+    now = dt_util.now()
+    config_entry.runtime_data.log_records(
+        [("feeding", days, "", now - timedelta(days=days)) for days in (90, 180)]
+    )
+    old = [
+        entry
+        async for entries in config_entry.runtime_data.async_iter_entries()
+        for entry in entries
+    ]
+    await config_entry.runtime_data._storage.async_compact()
+    await async_reload_member(hass, config_entry)
+    coordinator = config_entry.runtime_data
+    for entry in old:
+        micros = datetime_to_micros(dt_util.parse_datetime(entry["timestamp"]))
+        assert not coordinator._storage.is_resident(partition_key(micros))
+
+    # The client's timestamp points at the current month
+    stale = now.isoformat()
+    assert await coordinator.async_update_record(
+        "feeding", stale, value=30, record_id=old[1]["id"]
+    )
+    assert await coordinator.async_delete_record(
+        "feeding", stale, record_id=old[0]["id"]
+    )
+    assert not await coordinator.async_delete_record(
+        "feeding", stale, record_id="0" * 32
+    )
+
+    assert [
+        (entry["id"], entry["value"])
+        async for entries in coordinator.async_iter_entries()
+        for entry in entries
+    ] == [(old[1]["id"], 30)]
+
+
+async def test_records_round_trip(
+    hass: HomeAssistant, config_entry: MockConfigEntry
+) -> None:
+    """Test records keep every field through the typed columns and storage."""
+    await async_setup_member(hass, config_entry)
+    coordinator = config_entry.runtime_data
+    zone = dt_util.get_time_zone("Asia/Kolkata")
+    coordinator.log_records(
+        [
+            ("feeding", None, "no amount", START),
+            ("weight", 3.25, "", START.astimezone(zone) + timedelta(minutes=1)),
+        ]
+    )
+    logged = coordinator.get_records_in_range(START, START + timedelta(hours=1))
+
+    await coordinator._storage.async_compact()
+    await async_reload_member(hass, config_entry)
+
+    assert [
+        (entry["value"], entry["note"], entry["timestamp"]) for entry in logged
+    ] == [
+        (None, "no amount", "2024-03-10T08:00:00+00:00"),
+        (3.25, "", "2024-03-10T13:31:00+05:30"),
+    ]
+    assert [
+        entry
+        async for entries in config_entry.runtime_data.async_iter_entries()
+        for entry in entries
+    ] == logged
+
+
+async def test_id_index_follows_update_and_delete(
+    hass: HomeAssistant, config_entry: MockConfigEntry
+) -> None:
+    """Test records are found by id after moving and not after removal."""
+    await async_setup_member(hass, config_entry)
+    coordinator = config_entry.runtime_data
+    coordinator.log_records([("feeding", value, "", START) for value in (1, 2)])
+    first, second = coordinator.get_records_in_range(START, START)
+    moved = (START + timedelta(days=40)).isoformat()
+
+    assert coordinator.update_record(
+        "feeding", "", new_timestamp=moved, record_id=first["id"]
+    )
+    assert coordinator.update_record("feeding", "", value=20, record_id=second["id"])
+    assert _row(coordinator, first["id"])["timestamp"] == moved
+    assert _row(coordinator, second["id"])["value"] == 20
+
+    assert coordinator.delete_record("feeding", "", record_id=first["id"])
+    assert _row(coordinator, first["id"]) is None
+    assert _row(coordinator, second["id"])["timestamp"] == second["timestamp"]
+    assert not coordinator.update_record("feeding", "", value=3, record_id=first["id"])
+    assert not coordinator.delete_record("feeding", "", record_id=first["id"])
+
+
+async def test_last_record_after_deleting_latest(
+    hass: HomeAssistant, config_entry: MockConfigEntry
+) -> None:
+    """Test last_record falls back to the previous record, loaded or not."""
+    await async_setup_member(hass, config_entry)
+    now = dt_util.now()
+    config_entry.runtime_data.log_records(
+        [("feeding", 1, "old", now - timedelta(days=90)), ("feeding", 2, "new", now)]
+    )
+    await config_entry.runtime_data._storage.async_compact()
+    await async_reload_member(hass, config_entry)
+    coordinator = config_entry.runtime_data
+    record_set = coordinator.record_sets["feeding"]
+    assert (record_set.last_record.value, record_set.last_record.note) == (2, "new")
+
+    latest = coordinator.get_records_in_range(now, now)[0]
+    assert await coordinator.async_delete_record(
+        "feeding", latest["timestamp"], record_id=latest["id"]
+    )
+    assert record_set.last_record.value == 1
+    assert record_set.last_record.note == "old"
+    assert record_set.last_record.timestamp == now - timedelta(days=90)
+
+    [(_, previous)] = await coordinator.async_get_records_page(
+        now - timedelta(days=91), now
+    )
+    assert await coordinator.async_delete_record(
+        "feeding", previous["timestamp"], record_id=previous["id"]
+    )
+    assert record_set.last_record.value is None
+    assert record_set.last_record.timestamp is None
+
+
+def _daily(coordinator: HealthRecordCoordinator, start: datetime) -> list[tuple]:
+    """Return (day, count, sum, min, max, last) of feeding for two local days."""
+    return [
+        (
+            entry["period_start"],
+            entry["count"],
+            entry["sum"],
+            entry["min"],
+            entry["max"],
+            entry["last"],
+        )
+        for entry in coordinator.get_aggregates(
+            start, start + timedelta(days=1), "day", ["feeding"]
+        )
+    ]
+
+
+async def test_rollups_follow_edits(
+    hass: HomeAssistant, config_entry: MockConfigEntry
+) -> None:
+    """Test daily rollups reflect changed values, moved and deleted records."""
+    await async_setup_member(hass, config_entry)
+    coordinator = config_entry.runtime_data
+    noon = dt_util.as_local(START).replace(hour=12)
+    first = noon.date().isoformat()
+    second = (noon + timedelta(days=1)).date().isoformat()
+    coordinator.log_records(
+        [
+            ("feeding", 5, "", noon),
+            ("feeding", 7, "", noon + timedelta(hours=1)),
+            ("feeding", 3, "", noon + timedelta(days=1)),
+        ]
+    )
+    assert _daily(coordinator, noon) == [
+        (first, 2, 12, 5, 7, 7),
+        (second, 1, 3, 3, 3, 3),
+    ]
+
+    five, seven, three = coordinator.get_records_in_range(
+        noon, noon + timedelta(days=1)
+    )
+    assert coordinator.update_record("feeding", "", value=1, record_id=seven["id"])
+    assert coordinator.update_record(
+        "feeding",
+        "",
+        new_timestamp=(noon + timedelta(days=1, hours=1)).isoformat(),
+        record_id=five["id"],
+    )
+    assert _daily(coordinator, noon) == [
+        (first, 1, 1, 1, 1, 1),
+        (second, 2, 8, 3, 5, 5),
+    ]
+
+    assert coordinator.delete_record("feeding", "", record_id=three["id"])
+    assert _daily(coordinator, noon) == [
+        (first, 1, 1, 1, 1, 1),
+        (second, 1, 5, 5, 5, 5),
+    ]
+
+
+async def test_series_downsampling(
+    hass: HomeAssistant, config_entry: MockConfigEntry
+) -> None:
+    """Test a downsampled series keeps its endpoints, its spike and its size."""
+    await async_setup_member(hass, config_entry)
+    coordinator = config_entry.runtime_data
+    values = [1000 if number == 50 else number % 7 for number in range(100)]
+    coordinator.log_records(
+        [
+            ("feeding", value, "", START + timedelta(hours=number))
+            for number, value in enumerate(values)
+        ]
+        + [("weight", 3, "", START + timedelta(minutes=30))]
+    )
+    end = START + timedelta(hours=99)
+
+    series = await coordinator.async_get_series("feeding", START, end, 10)
+
+    assert series["total"] == 100
+    assert len(series["points"]) == 10
+    assert series["points"][0] == [START.isoformat(), 0]
+    assert series["points"][-1] == [end.isoformat(), 99 % 7]
+    assert [(START + timedelta(hours=50)).isoformat(), 1000] in series["points"]
+    assert [point[0] for point in series["points"]] == sorted(
+        point[0] for point in series["points"]
+    )
+
+    series = await coordinator.async_get_series("feeding", START, end, 500)
+    assert [point[1] for point in series["points"]] == values
@@ -0,0 +1,57 @@
+"""Tests for counting and exporting Ha Health Record entries."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from .conftest import async_setup_member
+
+START = datetime(2024, 1, 30, 8, 0, tzinfo=dt_util.UTC)
+
+
+@pytest.mark.parametrize(
+    ("start_time", "end_time", "type_ids"),
+    [
+        (None, None, None),
+        (None, None, {"weight"}),
+        (START + timedelta(hours=5), START + timedelta(days=3, hours=2), None),
+        (START + timedelta(hours=5), START + timedelta(days=3, hours=2), {"feeding"}),
+        (START + timedelta(hours=1), START + timedelta(hours=9), None),
+        (START - timedelta(days=10), START + timedelta(days=1), {"weight"}),
+    ],
+)
+async def test_count_entries_matches_export(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    start_time: datetime | None,
+    end_time: datetime | None,
+    type_ids: set[str] | None,
+) -> None:
+    """Test the entry count of a filtered range matches the entries yielded."""
+    await async_setup_member(hass, config_entry)
+    coordinator = config_entry.runtime_data
+    coordinator.log_records(
+        [
+            (
+                "feeding" if number % 3 else "weight",
+                number,
+                "",
+                START + timedelta(hours=number),
+            )
+            for number in range(120)
+        ]
+    )
+
+    exported = 0
+    async for entries in coordinator.async_iter_entries(
+        start_time, end_time, type_ids
+    ):
+        exported += len(entries)
+
+    assert exported
+    count = await coordinator.async_count_entries(start_time, end_time, type_ids)
+    assert count == exported
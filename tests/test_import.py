@@ -0,0 +1,145 @@
+"""Tests for importing Ha Health Record history."""
+from __future__ import annotations
+
+from datetime import timedelta
+from unittest.mock import patch
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.ha_health_record.coordinator import (
+    CHANGE_ADD,
+    SIGNAL_RECORDS_CHANGED,
+)
+from custom_components.ha_health_record.record_store import datetime_to_micros
+from custom_components.ha_health_record.storage import (
+    MAX_LOADED_PARTITIONS,
+    RecordStorage,
+    partition_key,
+)
+
+from .conftest import async_reload_member, async_setup_member
+
+MONTHS = 24
+
+
+def _history() -> list[tuple[int, dict]]:
+    """Return a daily weight record for ``MONTHS`` months up to last month."""
+    end = dt_util.utcnow().replace(day=1, hour=12, minute=0, second=0, microsecond=0)
+    records: list[tuple[int, dict]] = []
+    timestamp = end - timedelta(days=MONTHS * 30)
+    while timestamp < end:
+        records.append(
+            (
+                datetime_to_micros(timestamp),
+                {
+                    "record_type": "weight",
+                    "record_name": "Weight",
+                    "value": 3.0,
+                    "unit": "kg",
+                    "note": "",
+                    "timestamp": timestamp.isoformat(),
+                },
+            )
+        )
+        timestamp += timedelta(days=1)
+    return records
+
+
+async def test_import_bounds_resident_partitions(
+    hass: HomeAssistant, config_entry: MockConfigEntry
+) -> None:
+    """Test a long import keeps a bounded number of partitions in memory."""
+    await async_setup_member(hass, config_entry)
+    coordinator = config_entry.runtime_data
+    storage = coordinator._storage
+    resident: list[int] = []
+    compact = RecordStorage.async_compact
+
+    async def _async_compact(self: RecordStorage) -> None:
+        resident.append(sum(1 for key in self.partitions() if self.is_resident(key)))
+        await compact(self)
+
+    records = _history()
+    with patch.object(RecordStorage, "async_compact", _async_compact):
+        result = await coordinator.async_import_records(records)
+
+    assert result == {"imported": len(records), "duplicates": 0}
+    assert storage.total() == len(records)
+    assert len(resident) > 1
+    # One group being imported, besides the cached partitions and the current one
+    assert max(resident) <= 2 * MAX_LOADED_PARTITIONS + 1
+    assert max(resident) < MONTHS
+
+    again = [(micros, dict(record)) for micros, record in _history()]
+    result = await coordinator.async_import_records(again)
+    assert result == {"imported": 0, "duplicates": len(records)}
+    assert storage.total() == len(records)
+
+
+async def test_import_publishes_each_group(
+    hass: HomeAssistant, config_entry: MockConfigEntry
+) -> None:
+    """Test record subscribers get an import group by group, not all at once."""
+    await async_setup_member(hass, config_entry)
+    changes: list[tuple[str, list[dict]]] = []
+
+    @callback
+    def _changed(action: str, entries: list[dict]) -> None:
+        changes.append((action, entries))
+
+    async_dispatcher_connect(hass, SIGNAL_RECORDS_CHANGED, _changed)
+    records = _history()
+    keys = sorted({partition_key(micros) for micros, _ in records})
+    await config_entry.runtime_data.async_import_records(records)
+
+    groups = [
+        keys[index : index + MAX_LOADED_PARTITIONS]
+        for index in range(0, len(keys), MAX_LOADED_PARTITIONS)
+    ]
+    assert [action for action, _ in changes] == [CHANGE_ADD] * len(groups)
+    assert [len(entries) for _, entries in changes] == [
+        sum(1 for micros, _ in records if partition_key(micros) in group)
+        for group in groups
+    ]
+
+
+async def test_import_stops_when_a_group_cannot_be_written(
+    hass: HomeAssistant, config_entry: MockConfigEntry
+) -> None:
+    """Test a failed compaction keeps the records merged so far, journaled."""
+    await async_setup_member(hass, config_entry)
+    coordinator = config_entry.runtime_data
+    compact = RecordStorage.async_compact
+    compactions = 0
+
+    async def _async_compact(self: RecordStorage) -> None:
+        nonlocal compactions
+        compactions += 1
+        if compactions == 2:
+            raise OSError
+        await compact(self)
+
+    records = _history()
+    keys = sorted({partition_key(micros) for micros, _ in records})
+    written = [
+        (micros, record)
+        for micros, record in records
+        if partition_key(micros) in keys[: 2 * MAX_LOADED_PARTITIONS]
+    ]
+    with patch.object(RecordStorage, "async_compact", _async_compact):
+        result = await coordinator.async_import_records(records)
+
+    assert result == {
+        "imported": len(written),
+        "duplicates": 0,
+        "failed": len(records) - len(written),
+    }
+    assert compactions == 2
+    assert all("id" not in record for _, record in records)
+
+    # The group whose compaction failed is replayed from the journal
+    await async_reload_member(hass, config_entry)
+    assert config_entry.runtime_data._storage.total() == len(written)
@@ -0,0 +1,70 @@
+"""Tests for setting up Ha Health Record members."""
+from __future__ import annotations
+
+from datetime import timedelta
+from unittest.mock import patch
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import EVENT_HOMEASSISTANT_STARTED
+from homeassistant.core import CoreState, HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from custom_components.ha_health_record.coordinator import HealthRecordCoordinator
+from custom_components.ha_health_record.storage import DATA_PREFETCH, async_prefetch
+
+from .conftest import async_wait_loaded
+
+
+async def test_unclaimed_prefetch_released(
+    hass: HomeAssistant, config_entry: MockConfigEntry
+) -> None:
+    """Test reads no member takes over are dropped once started."""
+    hass.set_state(CoreState.starting)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await async_wait_loaded(hass, config_entry)
+    async_prefetch(hass, ["ghost"])
+    assert list(hass.data[DATA_PREFETCH]) == ["ghost"]
+
+    hass.set_state(CoreState.running)
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_STARTED)
+    await hass.async_block_till_done()
+
+    assert DATA_PREFETCH not in hass.data
+
+
+async def test_failed_load_retried(
+    hass: HomeAssistant, config_entry: MockConfigEntry
+) -> None:
+    """Test a member whose data fails to load is set up again later."""
+    load = HealthRecordCoordinator.async_load
+
+    async def _async_load(coordinator: HealthRecordCoordinator) -> None:
+        if async_load.call_count < 3:
+            raise OSError
+        await load(coordinator)
+
+    with patch.object(
+        HealthRecordCoordinator, "async_load", autospec=True, side_effect=_async_load
+    ) as async_load:
+        assert await hass.config_entries.async_setup(config_entry.entry_id)
+        await hass.async_block_till_done(wait_background_tasks=True)
+        assert not config_entry.runtime_data.loaded
+        assert config_entry.state is ConfigEntryState.LOADED
+
+        async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=31))
+        await hass.async_block_till_done(wait_background_tasks=True)
+        assert async_load.call_count == 2
+        assert not config_entry.runtime_data.loaded
+
+        # The delay doubles after each failure in a row
+        async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=31))
+        await hass.async_block_till_done(wait_background_tasks=True)
+        assert async_load.call_count == 2
+
+        async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=61))
+        await async_wait_loaded(hass, config_entry)
+        assert async_load.call_count == 3
@@ -0,0 +1,210 @@
+"""Tests for the background migration of v1 Ha Health Record storage."""
+from __future__ import annotations
+
+import asyncio
+import threading
+from datetime import datetime, timedelta
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.ha_health_record import migration
+
+from .conftest import MEMBER_ID
+
+START = datetime(2024, 1, 1, 8, 0, tzinfo=dt_util.UTC)
+RECORDS = 10
+
+
+def _v1_data(records: int = RECORDS, days: int = 1) -> dict[str, Any]:
+    """Return v1 data with one feeding record every ``days`` days."""
+    return {
+        "activity_sets": {"feeding": {"current_amount": None}},
+        "growth_sets": {},
+        "activity_records": [
+            {
+                "activity_type": "feeding",
+                "activity_name": "Feeding",
+                "amount": number,
+                "unit": "ml",
+                "note": "",
+                "timestamp": (START + timedelta(days=number * days)).isoformat(),
+            }
+            for number in range(records)
+        ],
+        "growth_records": [],
+    }
+
+
+def _store_v1(hass_storage: dict[str, dict], **kwargs: int) -> None:
+    """Store v1 data as the test member's snapshot."""
+    hass_storage[f"ha_health_record_{MEMBER_ID}"] = {
+        "version": 1,
+        "key": f"ha_health_record_{MEMBER_ID}",
+        "data": _v1_data(**kwargs),
+    }
+
+
+async def test_reads_during_migration(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    hass_storage: dict[str, dict],
+) -> None:
+    """Test reads during a v1 migration are answered from the v1 data."""
+    _store_v1(hass_storage)
+    chunks = 0
+    release = threading.Event()
+
+    def next_chunk(stream):
+        """Convert a chunk, holding the migration after the first one."""
+        nonlocal chunks
+        chunks += 1
+        if chunks == 2:
+            release.wait(10)
+        return migration.next_chunk(stream)
+
+    with (
+        patch.object(migration, "MIGRATION_CHUNK_SIZE", 2),
+        patch(
+            "custom_components.ha_health_record.coordinator.next_chunk", next_chunk
+        ),
+    ):
+        # Setting up waits for background tasks, the migration included
+        setup = hass.async_create_task(
+            hass.config_entries.async_setup(config_entry.entry_id)
+        )
+        for _ in range(200):
+            if chunks == 2:
+                break
+            await asyncio.sleep(0.01)
+        coordinator = config_entry.runtime_data
+        assert coordinator.migration_progress == (2, RECORDS)
+
+        coordinator.log_records([("feeding", 99, "", START + timedelta(hours=1))])
+        end = START + timedelta(days=RECORDS)
+        page = await coordinator.async_get_records_page(START, end, limit=3)
+        assert [entry["value"] for _, entry in page] == [9, 8, 7]
+        assert await coordinator.async_count_entries() == RECORDS + 1
+        series = await coordinator.async_get_series("feeding", START, end, 100)
+        assert series["total"] == RECORDS + 1
+        aggregates = await coordinator.async_get_aggregates(START, end, "month")
+        assert [(entry["count"], entry["sum"]) for entry in aggregates] == [
+            (RECORDS + 1, sum(range(RECORDS)) + 99)
+        ]
+        assert coordinator.migration_progress == (2, RECORDS)
+
+        release.set()
+        assert await setup
+        await hass.async_block_till_done(wait_background_tasks=True)
+        assert coordinator.migration_progress is None
+        assert await coordinator.async_count_entries() == RECORDS + 1
+        assert [
+            entry["value"]
+            for _, entry in await coordinator.async_get_records_page(
+                START, end, limit=3
+            )
+        ] == [9, 8, 7]
+
+
+async def test_failed_migration(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    hass_storage: dict[str, dict],
+) -> None:
+    """Test a failed migration keeps the v1 data readable and rejects edits."""
+    _store_v1(hass_storage)
+    chunks = 0
+
+    def next_chunk(stream):
+        """Convert the first chunk, then fail."""
+        nonlocal chunks
+        chunks += 1
+        if chunks == 2:
+            raise OSError("disk on fire")
+        return migration.next_chunk(stream)
+
+    with (
+        patch.object(migration, "MIGRATION_CHUNK_SIZE", 2),
+        patch(
+            "custom_components.ha_health_record.coordinator.next_chunk", next_chunk
+        ),
+    ):
+        assert await hass.config_entries.async_setup(config_entry.entry_id)
+        await hass.async_block_till_done(wait_background_tasks=True)
+
+    coordinator = config_entry.runtime_data
+    assert await coordinator.async_count_entries() == RECORDS
+    with pytest.raises(HomeAssistantError):
+        await coordinator.async_wait_migrated()
+    with pytest.raises(HomeAssistantError):
+        await coordinator.async_delete_record("feeding", START.isoformat())
+    # The v1 snapshot is kept for the next load to migrate again
+    assert hass_storage[f"ha_health_record_{MEMBER_ID}"]["version"] == 1
+
+
+async def test_migration_releases_complete_months(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    hass_storage: dict[str, dict],
+) -> None:
+    """Test months are written and released as soon as they are migrated."""
+    # A record every ten days for a year, four records per chunk
+    _store_v1(hass_storage, records=36, days=10)
+    resident: list[int] = []
+
+    def next_chunk(stream):
+        """Convert a chunk, noting how many records are in memory."""
+        resident.append(len(config_entry.runtime_data.records))
+        return migration.next_chunk(stream)
+
+    with (
+        patch.object(migration, "MIGRATION_CHUNK_SIZE", 4),
+        patch(
+            "custom_components.ha_health_record.coordinator.next_chunk", next_chunk
+        ),
+    ):
+        assert await hass.config_entries.async_setup(config_entry.entry_id)
+        await hass.async_block_till_done(wait_background_tasks=True)
+
+    coordinator = config_entry.runtime_data
+    assert coordinator.migration_progress is None
+    assert len(resident) == 10
+    assert max(resident) <= 8
+    assert coordinator.record_count == 36
+    assert await coordinator.async_count_entries() == 36
+    entries = [
+        entry
+        async for entries in coordinator.async_iter_entries()
+        for entry in entries
+    ]
+    assert [entry["value"] for entry in entries] == list(range(36))
+    snapshot = hass_storage[f"ha_health_record_{MEMBER_ID}"]
+    assert "activity_records" not in snapshot["data"]
+    assert sum(
+        summary["count"] for summary in snapshot["data"]["partitions"].values()
+    ) == 36
+
+
+def test_duplicate_ids_stable() -> None:
+    """Test repeated v1 ids get the same replacement ids on every read."""
+    data = _v1_data(records=4)
+    for record in data["activity_records"]:
+        record["id"] = "same"
+
+    def ids() -> list[str]:
+        records = migration.v1_records(data, MEMBER_ID, [], 0, 2**63 - 1)
+        return [record["id"] for record in records]
+
+    first = ids()
+    assert len(set(first)) == 4
+    assert "same" in first
+    assert ids() == first
+    assert [row["id"] for row in migration.v1_record_stream(data, MEMBER_ID)] == [
+        "same",
+        *(record_id for record_id in first if record_id != "same"),
+    ]
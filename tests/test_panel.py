@@ -0,0 +1,559 @@
+"""Tests for the Ha Health Record WebSocket API."""
+from __future__ import annotations
+
+import base64
+import csv
+import io
+from datetime import datetime, timedelta
+from http import HTTPStatus
+from unittest.mock import patch
+
+from homeassistant.core import Event, EventStateChangedData, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity_platform import async_get_platforms
+from homeassistant.setup import async_setup_component
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_capture_events,
+    async_fire_time_changed,
+)
+from pytest_homeassistant_custom_component.typing import (
+    ClientSessionGenerator,
+    WebSocketGenerator,
+)
+
+from custom_components.ha_health_record.const import DOMAIN, EVENT_RECORD_LOGGED
+from custom_components.ha_health_record.coordinator import (
+    HealthRecordCoordinator,
+    async_get_members,
+    signal_record_updated,
+)
+from custom_components.ha_health_record.panel import _find_coordinator, _find_entry
+
+from .conftest import MEMBER_ID, async_reload_member, async_setup_member
+
+# Midnight UTC at the start of March, where two partitions meet
+BOUNDARY = datetime(2024, 3, 1, tzinfo=dt_util.UTC)
+
+
+def _member_entry(
+    hass: HomeAssistant, member_id: str, record_sets: list[dict] | None = None
+) -> MockConfigEntry:
+    """Add a config entry for another member, without record types by default."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        version=2,
+        title=member_id.title(),
+        unique_id=member_id,
+        data={"member_id": member_id, "member_name": member_id.title()},
+        options={"record_sets": record_sets or []},
+    )
+    entry.add_to_hass(hass)
+    return entry
+
+
+async def test_edit_applied_once(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    hass_ws_client: WebSocketGenerator,
+) -> None:
+    """Test a record type edit is applied to the running entry exactly once."""
+    await async_setup_member(hass, config_entry)
+    client = await hass_ws_client(hass)
+
+    with patch.object(
+        HealthRecordCoordinator,
+        "async_apply_entry",
+        autospec=True,
+        side_effect=HealthRecordCoordinator.async_apply_entry,
+    ) as apply_entry:
+        await client.send_json_auto_id(
+            {
+                "type": "ha_health_record/add_record_type",
+                "member_id": MEMBER_ID,
+                "name": "Sleep",
+                "unit": "h",
+            }
+        )
+        response = await client.receive_json()
+        await hass.async_block_till_done()
+
+    assert response["success"]
+    assert apply_entry.call_count == 1
+    assert response["result"]["type_id"] in config_entry.runtime_data.record_sets
+
+
+async def test_get_records_pages_across_partitions(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    hass_ws_client: WebSocketGenerator,
+) -> None:
+    """Test cursor pages split ties and partitions without losing records."""
+    await async_setup_member(hass, config_entry)
+    config_entry.runtime_data.log_records(
+        [
+            ("feeding" if number % 2 else "weight", number, "", timestamp)
+            for number, timestamp in enumerate(
+                [BOUNDARY - timedelta(minutes=1)] * 3
+                + [BOUNDARY] * 3
+                + [BOUNDARY + timedelta(days=1), BOUNDARY - timedelta(days=1)]
+            )
+        ]
+    )
+    await config_entry.runtime_data._storage.async_compact()
+    await async_reload_member(hass, config_entry)
+    client = await hass_ws_client(hass)
+    request = {
+        "type": "ha_health_record/get_records",
+        "start_time": (BOUNDARY - timedelta(days=7)).isoformat(),
+        "end_time": (BOUNDARY + timedelta(days=7)).isoformat(),
+    }
+    await client.send_json_auto_id(request)
+    expected = (await client.receive_json())["result"]["records"]
+
+    pages = []
+    cursor = None
+    while True:
+        await client.send_json_auto_id(
+            {**request, "limit": 2} | ({"cursor": cursor} if cursor else {})
+        )
+        result = (await client.receive_json())["result"]
+        pages.append(result["records"])
+        if (cursor := result["next_cursor"]) is None:
+            break
+
+    assert len(expected) == 8
+    assert [len(page) for page in pages] == [2, 2, 2, 2]
+    assert [record for page in pages for record in page] == expected
+    assert len({record["id"] for record in expected}) == 8
+    assert [record["value"] for record in expected[:1] + expected[-1:]] == [6, 7]
+    assert [record["timestamp"] for record in expected] == sorted(
+        (record["timestamp"] for record in expected), reverse=True
+    )
+
+
+async def test_get_records_rejects_bad_cursor(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    hass_ws_client: WebSocketGenerator,
+) -> None:
+    """Test garbage and tampered cursors are rejected, not read as the first page."""
+    await async_setup_member(hass, config_entry)
+    config_entry.runtime_data.log_records([("feeding", 1, "", BOUNDARY)])
+    client = await hass_ws_client(hass)
+
+    for cursor in (
+        "not a cursor",
+        "",
+        base64.urlsafe_b64encode(b'["0", "bob", "id"]').decode(),
+        base64.urlsafe_b64encode(b'[0, "bob"]').decode(),
+    ):
+        await client.send_json_auto_id(
+            {
+                "type": "ha_health_record/get_records",
+                "start_time": (BOUNDARY - timedelta(days=1)).isoformat(),
+                "end_time": (BOUNDARY + timedelta(days=1)).isoformat(),
+                "cursor": cursor,
+            }
+        )
+        response = await client.receive_json()
+        assert not response["success"]
+        assert response["error"]["code"] == "invalid_format"
+
+
+async def test_csv_export_view(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    hass_client: ClientSessionGenerator,
+    hass_client_no_auth: ClientSessionGenerator,
+) -> None:
+    """Test the CSV view streams a member's history to authenticated users only."""
+    assert await async_setup_component(hass, "http", {})
+    await async_setup_member(hass, config_entry)
+    config_entry.runtime_data.log_records(
+        [
+            ("weight", 3.5, "after, bath", BOUNDARY - timedelta(days=1)),
+            ("feeding", 120, "", BOUNDARY),
+        ]
+    )
+    await config_entry.runtime_data._storage.async_compact()
+    await async_reload_member(hass, config_entry)
+    url = f"/api/ha_health_record/export/{MEMBER_ID}"
+
+    response = await (await hass_client_no_auth()).get(url)
+    assert response.status == HTTPStatus.UNAUTHORIZED
+
+    client = await hass_client()
+    response = await client.get(url)
+    assert response.status == HTTPStatus.OK
+    assert response.headers["Content-Type"] == "text/csv; charset=utf-8"
+    assert response.headers["X-Record-Count"] == "2"
+    body = await response.text()
+    assert body.startswith("\ufeff")
+    assert list(csv.reader(io.StringIO(body[1:]))) == [
+        ["timestamp", "record_type", "record_name", "value", "unit", "note"],
+        [
+            (BOUNDARY - timedelta(days=1)).isoformat(),
+            "weight",
+            "Weight",
+            "3.5",
+            "kg",
+            "after, bath",
+        ],
+        [BOUNDARY.isoformat(), "feeding", "Feeding", "120.0", "ml", ""],
+    ]
+
+    response = await client.get("/api/ha_health_record/export/nobody")
+    assert response.status == HTTPStatus.NOT_FOUND
+
+
+async def test_subscribe_records_sends_matching_changes(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    hass_ws_client: WebSocketGenerator,
+) -> None:
+    """Test subscribers get the changes of their types and time range only."""
+    await async_setup_member(hass, config_entry)
+    coordinator = config_entry.runtime_data
+    client = await hass_ws_client(hass)
+    await client.send_json_auto_id(
+        {
+            "type": "ha_health_record/subscribe_records",
+            "record_types": ["feeding"],
+            "start_time": BOUNDARY.isoformat(),
+            "end_time": (BOUNDARY + timedelta(days=1)).isoformat(),
+        }
+    )
+    assert (await client.receive_json())["success"]
+
+    coordinator.log_records(
+        [
+            ("feeding", 1, "", BOUNDARY + timedelta(hours=1)),
+            ("feeding", 2, "", BOUNDARY + timedelta(hours=2)),
+            ("weight", 3, "", BOUNDARY + timedelta(hours=3)),
+            ("feeding", 4, "", BOUNDARY - timedelta(hours=1)),
+        ]
+    )
+    first, second = coordinator.get_records_in_range(
+        BOUNDARY + timedelta(hours=1), BOUNDARY + timedelta(hours=2)
+    )
+    moved = (BOUNDARY + timedelta(days=2)).isoformat()
+    assert coordinator.update_record(
+        "feeding", "", new_timestamp=moved, record_id=first["id"]
+    )
+    assert coordinator.delete_record("feeding", "", record_id=first["id"])
+    assert coordinator.delete_record("feeding", "", record_id=second["id"])
+
+    events = [(await client.receive_json())["event"] for _ in range(3)]
+    assert [
+        (
+            event["action"],
+            [
+                (record["value"], record["timestamp"], record.get("previous_timestamp"))
+                for record in event["records"]
+            ],
+        )
+        for event in events
+    ] == [
+        (
+            "add",
+            [
+                (1, first["timestamp"], None),
+                (2, second["timestamp"], None),
+            ],
+        ),
+        ("update", [(1, moved, first["timestamp"])]),
+        ("delete", [(2, second["timestamp"], None)]),
+    ]
+
+
+async def test_member_registry(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    hass_ws_client: WebSocketGenerator,
+) -> None:
+    """Test members are looked up through the registry while set up."""
+    await async_setup_member(hass, config_entry)
+    pending = _member_entry(hass, "ann")
+    client = await hass_ws_client(hass)
+    request = {
+        "type": "ha_health_record/get_records",
+        "member_id": MEMBER_ID,
+        "start_time": BOUNDARY.isoformat(),
+        "end_time": BOUNDARY.isoformat(),
+    }
+
+    assert async_get_members(hass) == {MEMBER_ID: config_entry.runtime_data}
+    assert _find_coordinator(hass, MEMBER_ID) is config_entry.runtime_data
+    assert _find_entry(hass, MEMBER_ID) is config_entry
+    # Entries that are not set up are still found by their unique ID
+    assert _find_coordinator(hass, "ann") is None
+    assert _find_entry(hass, "ann") is pending
+    await client.send_json_auto_id(request)
+    assert (await client.receive_json())["success"]
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    assert async_get_members(hass) == {}
+    assert _find_coordinator(hass, MEMBER_ID) is None
+    await client.send_json_auto_id(request)
+    response = await client.receive_json()
+    assert response["error"]["code"] == "member_not_found"
+
+
+async def test_get_members_since_revision(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    hass_ws_client: WebSocketGenerator,
+) -> None:
+    """Test get_members sends only the members changed since a revision."""
+    await async_setup_member(hass, config_entry)
+    client = await hass_ws_client(hass)
+
+    async def get_members(since: int | None = None) -> dict:
+        await client.send_json_auto_id(
+            {"type": "ha_health_record/get_members"}
+            | ({} if since is None else {"since_revision": since})
+        )
+        return (await client.receive_json())["result"]
+
+    result = await get_members()
+    assert [member["id"] for member in result["members"]] == [MEMBER_ID]
+    revision = result["revision"]
+    assert await get_members(revision) == {"revision": revision, "not_modified": True}
+
+    config_entry.runtime_data.log_records([("feeding", 60, "", BOUNDARY)])
+    result = await get_members(revision)
+    assert result["revision"] > revision
+    assert result["member_ids"] == [MEMBER_ID]
+    [member] = result["members"]
+    feeding = next(rs for rs in member["record_sets"] if rs["type"] == "feeding")
+    assert feeding["last_record"]["value"] == 60
+    revision = result["revision"]
+
+    ann = _member_entry(hass, "ann")
+    await async_setup_member(hass, ann)
+    result = await get_members(revision)
+    assert sorted(result["member_ids"]) == ["ann", MEMBER_ID]
+    assert [member["id"] for member in result["members"]] == ["ann"]
+    revision = result["revision"]
+
+    assert await hass.config_entries.async_unload(ann.entry_id)
+    result = await get_members(revision)
+    assert result["revision"] > revision
+    assert result["member_ids"] == [MEMBER_ID]
+    assert result["members"] == []
+
+
+async def test_coalesce_window_flushes_once(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    hass_ws_client: WebSocketGenerator,
+    entity_registry: er.EntityRegistry,
+) -> None:
+    """Test a burst within the coalesce window ends in one state write."""
+    await async_setup_member(hass, config_entry)
+    coordinator = config_entry.runtime_data
+    client = await hass_ws_client(hass)
+    await client.send_json_auto_id(
+        {
+            "type": "ha_health_record/update_record_type",
+            "member_id": MEMBER_ID,
+            "type_id": "feeding",
+            "name": "Feeding",
+            "unit": "ml",
+            "coalesce_window": 10,
+        }
+    )
+    assert (await client.receive_json())["success"]
+    entity_id = entity_registry.async_get_entity_id(
+        "sensor", DOMAIN, f"{MEMBER_ID}_feeding_record"
+    )
+    writes = []
+
+    def _state_changed(event: Event[EventStateChangedData]) -> None:
+        if event.data["entity_id"] == entity_id:
+            writes.append(event.data["new_state"])
+
+    hass.bus.async_listen("state_changed", _state_changed)
+
+    for value in range(20):
+        coordinator.log_records([("feeding", value, "", None)])
+        coordinator.async_notify_updated(["feeding"])
+    await hass.async_block_till_done()
+    assert [(state.state, state.attributes["burst_count"]) for state in writes] == [
+        ("0.0", 1)
+    ]
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=11))
+    await hass.async_block_till_done()
+    assert [(state.state, state.attributes["burst_count"]) for state in writes] == [
+        ("0.0", 1),
+        ("19.0", 19),
+    ]
+
+    # A window without updates writes nothing
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=30))
+    await hass.async_block_till_done()
+    assert len(writes) == 2
+    assert coordinator.record_count == 20
+
+
+async def _async_setup_ann(hass: HomeAssistant) -> MockConfigEntry:
+    """Set up a second member with a feeding record type."""
+    ann = _member_entry(
+        hass,
+        "ann",
+        [{"record_type": "feeding", "record_name": "Feeding", "record_unit": "ml"}],
+    )
+    await async_setup_member(hass, ann)
+    return ann
+
+
+async def test_log_records_rejects_whole_batch(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    hass_ws_client: WebSocketGenerator,
+) -> None:
+    """Test one bad entry rejects a multi-member batch with nothing stored."""
+    await async_setup_member(hass, config_entry)
+    ann = await _async_setup_ann(hass)
+    events = async_capture_events(hass, EVENT_RECORD_LOGGED)
+    client = await hass_ws_client(hass)
+    entries = [
+        {"member_id": MEMBER_ID, "record_type": "feeding", "value": 1},
+        {"member_id": "ann", "record_type": "feeding", "value": 2},
+    ]
+
+    for bad, code in (
+        (
+            {"member_id": "ann", "record_type": "weight", "value": 3},
+            "record_type_not_found",
+        ),
+        (
+            {"member_id": "cat", "record_type": "feeding", "value": 3},
+            "member_not_found",
+        ),
+        (
+            {
+                "member_id": MEMBER_ID,
+                "record_type": "weight",
+                "value": 3,
+                "timestamp": "yesterday",
+            },
+            "invalid_timestamp",
+        ),
+    ):
+        await client.send_json_auto_id(
+            {"type": "ha_health_record/log_records", "entries": [*entries, bad]}
+        )
+        response = await client.receive_json()
+        assert response["error"]["code"] == code
+        assert response["error"]["message"].startswith("Entry 3:")
+
+    await hass.async_block_till_done()
+    assert config_entry.runtime_data.record_count == 0
+    assert ann.runtime_data.record_count == 0
+    assert events == []
+
+
+async def test_log_records_applies_batch_before_notifying(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    hass_ws_client: WebSocketGenerator,
+) -> None:
+    """Test each sensor updates once and events follow once all members logged."""
+    await async_setup_member(hass, config_entry)
+    ann = await _async_setup_ann(hass)
+    client = await hass_ws_client(hass)
+    counts: dict[str, list[tuple[int, int]]] = {}
+
+    def stored() -> tuple[int, int]:
+        return config_entry.runtime_data.record_count, ann.runtime_data.record_count
+
+    for member_id, type_id in (
+        (MEMBER_ID, "feeding"),
+        (MEMBER_ID, "weight"),
+        ("ann", "feeding"),
+    ):
+
+        @callback
+        def updated(name: str = f"{member_id}_{type_id}") -> None:
+            counts.setdefault(name, []).append(stored())
+
+        async_dispatcher_connect(
+            hass, signal_record_updated(member_id, type_id), updated
+        )
+
+    fire = HealthRecordCoordinator.async_fire_record_logged
+    with patch.object(
+        HealthRecordCoordinator,
+        "async_fire_record_logged",
+        autospec=True,
+        side_effect=lambda coordinator, type_id, record: (
+            counts.setdefault("event", []).append(stored()),
+            fire(coordinator, type_id, record),
+        ),
+    ):
+        await client.send_json_auto_id(
+            {
+                "type": "ha_health_record/log_records",
+                "entries": [
+                    {"member_id": MEMBER_ID, "record_type": "feeding", "value": 1},
+                    {"member_id": "ann", "record_type": "feeding", "value": 2},
+                    {"member_id": MEMBER_ID, "record_type": "feeding", "value": 3},
+                    {"member_id": MEMBER_ID, "record_type": "weight", "value": 4},
+                ],
+            }
+        )
+        response = await client.receive_json()
+
+    assert response["result"] == {"success": True, "logged": 4}
+    assert counts == {
+        f"{MEMBER_ID}_feeding": [(3, 1)],
+        f"{MEMBER_ID}_weight": [(3, 1)],
+        "ann_feeding": [(3, 1)],
+        "event": [(3, 1)] * 4,
+    }
+
+
+async def test_record_type_edit_applied_in_place(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    hass_ws_client: WebSocketGenerator,
+    entity_registry: er.EntityRegistry,
+) -> None:
+    """Test renaming a record type updates its sensor without a reload."""
+    await async_setup_member(hass, config_entry)
+    coordinator = config_entry.runtime_data
+    client = await hass_ws_client(hass)
+    entity_id = entity_registry.async_get_entity_id(
+        "sensor", DOMAIN, f"{MEMBER_ID}_feeding_record"
+    )
+    state = hass.states.get(entity_id)
+    assert state.attributes["unit_of_measurement"] == "ml"
+
+    with patch.object(hass.config_entries, "async_reload") as async_reload:
+        await client.send_json_auto_id(
+            {
+                "type": "ha_health_record/update_record_type",
+                "member_id": MEMBER_ID,
+                "type_id": "feeding",
+                "name": "Bottle",
+                "unit": "oz",
+            }
+        )
+        assert (await client.receive_json())["success"]
+        await hass.async_block_till_done()
+
+    async_reload.assert_not_called()
+    assert config_entry.runtime_data is coordinator
+    state = hass.states.get(entity_id)
+    assert state.attributes["unit_of_measurement"] == "oz"
+    [entity] = [
+        platform.entities[entity_id]
+        for platform in async_get_platforms(hass, DOMAIN)
+        if entity_id in platform.entities
+    ]
+    assert entity.translation_placeholders == {"record_name": "Bottle"}
@@ -0,0 +1,45 @@
+"""Tests for the column-oriented Ha Health Record history."""
+from __future__ import annotations
+
+import pytest
+
+from custom_components.ha_health_record.record_store import RecordStore
+
+HOUR = 3_600_000_000  # epoch microseconds
+
+
+def _row(number: int, note: str, record_id: str | None = None) -> dict:
+    """Return a feeding row logged ``number`` hours after the epoch."""
+    return {
+        "id": record_id or f"{number:032x}",
+        "record_type": "feeding",
+        "record_name": "Feeding",
+        "value": float(number),
+        "unit": "ml",
+        "note": note,
+        "ts": number * HOUR,
+        "tz": 0,
+    }
+
+
+@pytest.mark.parametrize("noted", [range(2), range(10)], ids=["sparse", "dense"])
+def test_snapshot_copies_sparse_entries_of_its_rows(noted: range) -> None:
+    """Test a snapshot holds the notes and legacy ids of its rows only."""
+    records = RecordStore()
+    records.insert_many(
+        _row(
+            number,
+            f"note {number}" if number in noted else "",
+            f"legacy-{number}" if number in (1, 7) else None,
+        )
+        for number in range(10)
+    )
+
+    snapshot = records.snapshot_between(5 * HOUR, 10 * HOUR)
+
+    assert [row["note"] for row in snapshot] == [
+        f"note {number}" if number in noted else "" for number in range(5, 10)
+    ]
+    assert [row["id"] for row in snapshot][2] == "legacy-7"
+    assert len(snapshot._notes) == len([n for n in noted if n >= 5])
+    assert list(snapshot._foreign_ids.values()) == ["legacy-7"]
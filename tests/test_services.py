@@ -0,0 +1,209 @@
+"""Tests for the Ha Health Record service actions."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_capture_events,
+)
+
+from custom_components.ha_health_record.const import DOMAIN, EVENT_RECORD_LOGGED
+
+from .conftest import MEMBER_ID, async_setup_member
+
+START = datetime(2024, 3, 10, 8, 0, tzinfo=dt_util.UTC)
+
+
+async def _async_setup_ann(hass: HomeAssistant) -> MockConfigEntry:
+    """Set up a second member with a feeding record type."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        version=2,
+        title="Ann",
+        unique_id="ann",
+        data={"member_id": "ann", "member_name": "Ann"},
+        options={
+            "record_sets": [
+                {
+                    "record_type": "feeding",
+                    "record_name": "Feeding",
+                    "record_unit": "ml",
+                }
+            ]
+        },
+    )
+    entry.add_to_hass(hass)
+    await async_setup_member(hass, entry)
+    return entry
+
+
+async def test_log_records_all_or_nothing(
+    hass: HomeAssistant, config_entry: MockConfigEntry
+) -> None:
+    """Test one invalid record rejects the whole batch, for every member."""
+    await async_setup_member(hass, config_entry)
+    ann = await _async_setup_ann(hass)
+    events = async_capture_events(hass, EVENT_RECORD_LOGGED)
+
+    with pytest.raises(ServiceValidationError, match="Record 3"):
+        await hass.services.async_call(
+            DOMAIN,
+            "log_records",
+            {
+                "member_id": MEMBER_ID,
+                "records": [
+                    {"record_type": "feeding", "value": 1},
+                    {"member_id": "ann", "record_type": "feeding", "value": 2},
+                    {"member_id": "ann", "record_type": "weight", "value": 3},
+                ],
+            },
+            blocking=True,
+        )
+    await hass.async_block_till_done()
+
+    assert config_entry.runtime_data.record_count == 0
+    assert ann.runtime_data.record_count == 0
+    assert events == []
+
+
+async def test_log_record_leaves_inputs(
+    hass: HomeAssistant, config_entry: MockConfigEntry
+) -> None:
+    """Test logged records leave the current value and note alone."""
+    await async_setup_member(hass, config_entry)
+    coordinator = config_entry.runtime_data
+    coordinator.set_record_value("feeding", 5)
+    coordinator.set_record_note("feeding", "typed in")
+
+    await hass.services.async_call(
+        DOMAIN,
+        "log_record",
+        {
+            "member_id": MEMBER_ID,
+            "record_type": "feeding",
+            "value": 120,
+            "note": "bottle",
+            "timestamp": START.isoformat(),
+        },
+        blocking=True,
+    )
+
+    record_set = coordinator.get_record_set("feeding")
+    assert (record_set.current_value, record_set.current_note) == (5, "typed in")
+    assert (record_set.last_record.value, record_set.last_record.note) == (
+        120,
+        "bottle",
+    )
+    [entry] = coordinator.get_records_in_range(START, START)
+    assert (entry["value"], entry["note"]) == (120, "bottle")
+
+
+async def test_naive_timestamps_in_configured_time_zone(
+    hass: HomeAssistant, config_entry: MockConfigEntry
+) -> None:
+    """Test timestamps without an offset are taken in the configured time zone."""
+    await hass.config.async_set_time_zone("Asia/Taipei")
+    await async_setup_member(hass, config_entry)
+
+    await hass.services.async_call(
+        DOMAIN,
+        "log_record",
+        {
+            "member_id": MEMBER_ID,
+            "record_type": "feeding",
+            "value": 120,
+            "timestamp": "2024-03-10 08:00:00",
+        },
+        blocking=True,
+    )
+    response = await hass.services.async_call(
+        DOMAIN,
+        "query_records",
+        {
+            "member_id": MEMBER_ID,
+            "start_time": "2024-03-10 08:00:00",
+            "end_time": "2024-03-10 08:00:00",
+        },
+        blocking=True,
+        return_response=True,
+    )
+
+    assert [record["timestamp"] for record in response["records"]] == [
+        "2024-03-10T08:00:00+08:00"
+    ]
+
+
+async def test_query_records(
+    hass: HomeAssistant, config_entry: MockConfigEntry
+) -> None:
+    """Test queries return the newest records across members, flagging truncation."""
+    await async_setup_member(hass, config_entry)
+    ann = await _async_setup_ann(hass)
+    config_entry.runtime_data.log_records(
+        [("feeding", 1, "", START), ("weight", 2, "", START + timedelta(hours=2))]
+    )
+    ann.runtime_data.log_records([("feeding", 3, "", START + timedelta(hours=1))])
+
+    async def query(**data) -> dict:
+        return await hass.services.async_call(
+            DOMAIN, "query_records", data, blocking=True, return_response=True
+        )
+
+    response = await query(limit=2)
+    assert response["truncated"]
+    assert [
+        (record["member_id"], record["value"]) for record in response["records"]
+    ] == [(MEMBER_ID, 2), ("ann", 3)]
+    assert set(response["records"][0]) == {
+        "member_id",
+        "member_name",
+        "record_type",
+        "record_name",
+        "value",
+        "unit",
+        "note",
+        "timestamp",
+        "id",
+    }
+
+    response = await query(limit=3)
+    assert not response["truncated"]
+    assert [record["value"] for record in response["records"]] == [2, 3, 1]
+
+    response = await query(member_id=MEMBER_ID, record_types=["feeding"])
+    assert not response["truncated"]
+    assert [record["value"] for record in response["records"]] == [1]
+
+
+async def test_record_logged_events(
+    hass: HomeAssistant, config_entry: MockConfigEntry
+) -> None:
+    """Test every logged record fires one record logged event."""
+    await async_setup_member(hass, config_entry)
+    await _async_setup_ann(hass)
+    events = async_capture_events(hass, EVENT_RECORD_LOGGED)
+
+    await hass.services.async_call(
+        DOMAIN,
+        "log_records",
+        {
+            "member_id": MEMBER_ID,
+            "records": [
+                {"record_type": "feeding", "value": 1},
+                {"record_type": "weight", "value": 2},
+                {"member_id": "ann", "record_type": "feeding", "value": 3},
+            ],
+        },
+        blocking=True,
+    )
+    await hass.async_block_till_done()
+
+    assert sorted(
+        (event.data["member_id"], event.data["record_type"], event.data["value"])
+        for event in events
+    ) == [("ann", "feeding", 3), (MEMBER_ID, "feeding", 1), (MEMBER_ID, "weight", 2)]
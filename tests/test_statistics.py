@@ -0,0 +1,246 @@
+"""Tests for the Ha Health Record statistics in the recorder."""
+from __future__ import annotations
+
+from collections.abc import Generator
+from datetime import datetime, timedelta
+from typing import Any
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from homeassistant.components.recorder import Recorder, get_instance
+from homeassistant.components.recorder.statistics import statistics_during_period
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+from pytest_homeassistant_custom_component.components.recorder.common import (
+    async_wait_recording_done,
+)
+
+from custom_components.ha_health_record import statistics
+from custom_components.ha_health_record.record_store import datetime_to_micros
+from custom_components.ha_health_record.statistics import STATISTICS_DELAY, statistic_id
+
+from .conftest import MEMBER_ID, async_reload_member, async_setup_member
+
+STATISTIC_ID = statistic_id(MEMBER_ID, "feeding")
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(
+    recorder_mock: Recorder,
+    enable_custom_integrations: None,
+    hass: HomeAssistant,
+    tmp_path,
+) -> Generator[None]:
+    """Enable the integration with the recorder set up first."""
+    hass.config.config_dir = str(tmp_path)
+    hass.config.components.add("frontend")
+    with (
+        patch("custom_components.ha_health_record.async_setup_panel", AsyncMock()),
+        patch("custom_components.ha_health_record.async_unload_panel", AsyncMock()),
+    ):
+        yield
+
+
+def _record(timestamp: datetime, value: float) -> tuple[int, dict[str, Any]]:
+    """Return an importable feeding record."""
+    return datetime_to_micros(timestamp), {
+        "record_type": "feeding",
+        "record_name": "Feeding",
+        "value": value,
+        "unit": "ml",
+        "note": "",
+        "timestamp": timestamp.isoformat(),
+    }
+
+
+async def _async_import_pending(hass: HomeAssistant) -> None:
+    """Let the delayed statistics import run and be recorded."""
+    async_fire_time_changed(
+        hass, dt_util.utcnow() + timedelta(seconds=STATISTICS_DELAY + 1)
+    )
+    await hass.async_block_till_done(wait_background_tasks=True)
+    await async_wait_recording_done(hass)
+
+
+async def _async_rows(hass: HomeAssistant) -> list[dict[str, Any]]:
+    """Return the hourly rows of the feeding statistic."""
+    result = await get_instance(hass).async_add_executor_job(
+        statistics_during_period,
+        hass,
+        datetime(2000, 1, 1, tzinfo=dt_util.UTC),
+        None,
+        {STATISTIC_ID},
+        "hour",
+        None,
+        {"mean", "min", "max", "sum", "state"},
+    )
+    return result.get(STATISTIC_ID, [])
+
+
+async def test_hourly_statistics(
+    hass: HomeAssistant, config_entry: MockConfigEntry
+) -> None:
+    """Test records are imported as hourly rows and follow edits."""
+    await async_setup_member(hass, config_entry)
+    coordinator = config_entry.runtime_data
+    await coordinator.async_import_records(
+        [
+            _record(datetime(2024, 1, 1, 10, 5, tzinfo=dt_util.UTC), 10),
+            _record(datetime(2024, 1, 1, 10, 50, tzinfo=dt_util.UTC), 30),
+            _record(datetime(2024, 1, 1, 12, 0, tzinfo=dt_util.UTC), 5),
+            _record(datetime(2024, 2, 3, 1, 0, tzinfo=dt_util.UTC), 7),
+        ],
+        False,
+    )
+    await _async_import_pending(hass)
+
+    assert [
+        (row["mean"], row["min"], row["max"], row["state"], row["sum"])
+        for row in await _async_rows(hass)
+    ] == [(20, 10, 30, 30, 40), (5, 5, 5, 5, 45), (7, 7, 7, 7, 52)]
+
+    coordinator.log_records(
+        [("feeding", 100, "", datetime(2023, 12, 31, 0, 10, tzinfo=dt_util.UTC))]
+    )
+    records = [
+        entry async for page in coordinator.async_iter_records() for entry in page
+    ]
+    removed = next(record for record in records if record["value"] == 5)
+    assert await coordinator.async_delete_record(
+        "feeding", removed["timestamp"], record_id=removed["id"]
+    )
+    await _async_import_pending(hass)
+
+    assert [(row["mean"], row["sum"]) for row in await _async_rows(hass)] == [
+        (100, 100),
+        (20, 140),
+        (None, 140),
+        (7, 147),
+    ]
+
+
+async def test_log_reimports_only_its_day(
+    hass: HomeAssistant, config_entry: MockConfigEntry
+) -> None:
+    """Test a record logged today only recomputes today's rows."""
+    await async_setup_member(hass, config_entry)
+    coordinator = config_entry.runtime_data
+    now = dt_util.now()
+    today = dt_util.start_of_local_day(now)
+    history = [
+        _record(today - timedelta(hours=hours), 1) for hours in range(1, 24 * 20)
+    ]
+    await coordinator.async_import_records(history, False)
+    await _async_import_pending(hass)
+    rows = await _async_rows(hass)
+    assert len(rows) == len(history)
+
+    add_statistics = statistics.async_add_external_statistics
+    with patch.object(
+        statistics, "async_add_external_statistics", wraps=add_statistics
+    ) as async_add:
+        coordinator.log_records([("feeding", 2, "", now)])
+        await _async_import_pending(hass)
+
+    imported = async_add.call_args.args[2]
+    assert len(imported) == 1
+    assert imported[0]["sum"] == len(history) + 2
+    assert (await _async_rows(hass))[-1]["sum"] == len(history) + 2
+
+
+async def test_statistics_without_mean_type(
+    hass: HomeAssistant, config_entry: MockConfigEntry
+) -> None:
+    """Test cores without mean types get the mean through has_mean."""
+    add_statistics = statistics.async_add_external_statistics
+    with (
+        patch.object(statistics, "StatisticMeanType", None),
+        patch.object(
+            statistics, "async_add_external_statistics", wraps=add_statistics
+        ) as async_add,
+    ):
+        await async_setup_member(hass, config_entry)
+        config_entry.runtime_data.log_records([("feeding", 2, "", dt_util.now())])
+        await _async_import_pending(hass)
+
+    metadata = async_add.call_args.args[1]
+    assert metadata["has_mean"]
+    assert "mean_type" not in metadata
+    assert [(row["mean"], row["sum"]) for row in await _async_rows(hass)] == [(2, 2)]
+
+
+@pytest.mark.parametrize("compact", [True, False], ids=["snapshot", "journal"])
+async def test_backdated_change_imported_after_restart(
+    hass: HomeAssistant, config_entry: MockConfigEntry, compact: bool
+) -> None:
+    """Test a change never imported before a restart is caught up on start."""
+    await async_setup_member(hass, config_entry)
+    coordinator = config_entry.runtime_data
+    await coordinator.async_import_records(
+        [_record(datetime(2024, 1, 2, 10, 0, tzinfo=dt_util.UTC), 10)], False
+    )
+    await _async_import_pending(hass)
+
+    with patch.object(statistics, "_recorder_loaded", return_value=False):
+        coordinator.log_records(
+            [("feeding", 5, "", datetime(2024, 1, 1, 10, 0, tzinfo=dt_util.UTC))]
+        )
+        await _async_import_pending(hass)
+    if compact:
+        await coordinator._storage.async_compact()
+    await async_reload_member(hass, config_entry)
+    await hass.async_block_till_done(wait_background_tasks=True)
+    await async_wait_recording_done(hass)
+
+    assert [(row["mean"], row["sum"]) for row in await _async_rows(hass)] == [
+        (5, 5),
+        (10, 15),
+    ]
+
+
+async def test_removed_type_statistics_cleared(
+    hass: HomeAssistant, config_entry: MockConfigEntry
+) -> None:
+    """Test removing a record type removes its entities and statistics."""
+    await async_setup_member(hass, config_entry)
+    coordinator = config_entry.runtime_data
+    coordinator.log_records([("feeding", 2, "", dt_util.now())])
+    await _async_import_pending(hass)
+    assert await _async_rows(hass)
+    entity_registry = er.async_get(hass)
+
+    def _feeding_entities() -> list[str]:
+        return [
+            entry.entity_id
+            for entry in er.async_entries_for_config_entry(
+                entity_registry, config_entry.entry_id
+            )
+            if entry.unique_id.startswith(f"{MEMBER_ID}_feeding_")
+        ]
+
+    entity_ids = _feeding_entities()
+    assert entity_ids
+
+    hass.config_entries.async_update_entry(
+        config_entry,
+        options={
+            "record_sets": [
+                rs_data
+                for rs_data in config_entry.options["record_sets"]
+                if rs_data["record_type"] != "feeding"
+            ]
+        },
+    )
+    coordinator.async_apply_entry()
+    await hass.async_block_till_done()
+    await async_wait_recording_done(hass)
+
+    assert await _async_rows(hass) == []
+    assert _feeding_entities() == []
+    assert all(hass.states.get(entity_id) is None for entity_id in entity_ids)
+    assert config_entry.runtime_data is coordinator
@@ -0,0 +1,398 @@
+"""Crash consistency of the Ha Health Record journal and snapshot."""
+from __future__ import annotations
+
+import gzip
+import json
+import uuid
+from datetime import timedelta, timezone
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.json import json_dumps
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from pytest_homeassistant_custom_component.typing import WebSocketGenerator
+
+from custom_components.ha_health_record.record_store import datetime_to_micros
+from custom_components.ha_health_record.storage import (
+    HOT_PARTITIONS,
+    RecordStorage,
+    partition_key,
+)
+
+from .conftest import MEMBER_ID, async_reload_member, async_setup_member
+
+TORN_LINE = '{"op": "add", "record": {"id": "'
+
+
+def _journal(hass: HomeAssistant) -> Path:
+    """Return the journal file of the test member."""
+    return Path(hass.config.path(".storage", f"ha_health_record_{MEMBER_ID}.journal"))
+
+
+def _log(entry: MockConfigEntry, *values: float) -> None:
+    """Log feeding records with the given values, one minute apart."""
+    now = dt_util.now()
+    entry.runtime_data.log_records(
+        [
+            ("feeding", value, "", now - timedelta(minutes=len(values) - number))
+            for number, value in enumerate(values)
+        ]
+    )
+
+
+def _values(entry: MockConfigEntry) -> list[float]:
+    """Return the values of the member's records, oldest first."""
+    return [record["value"] for record in entry.runtime_data.records]
+
+
+async def test_torn_final_line_dropped(
+    hass: HomeAssistant, config_entry: MockConfigEntry
+) -> None:
+    """Test a torn final journal line is dropped and the rest replayed."""
+    await async_setup_member(hass, config_entry)
+    _log(config_entry, 1, 2)
+    await config_entry.runtime_data._storage.async_flush()
+    with _journal(hass).open("a", encoding="utf-8") as file:
+        file.write(TORN_LINE)
+
+    await async_reload_member(hass, config_entry)
+
+    assert _values(config_entry) == [1, 2]
+    # Loading compacted the journal away, torn line included
+    assert _journal(hass).read_text(encoding="utf-8").count("\n") == 1
+
+
+async def test_stale_generation_journal_discarded(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    hass_storage: dict[str, dict],
+) -> None:
+    """Test a journal older than the snapshot generation is not replayed."""
+    await async_setup_member(hass, config_entry)
+    _log(config_entry, 1)
+    await config_entry.runtime_data._storage.async_compact()
+    generation = hass_storage[f"ha_health_record_{MEMBER_ID}"]["data"]["generation"]
+    assert generation == 1
+
+    now = dt_util.now()
+    stale = {
+        "op": "add",
+        "record": {
+            "id": uuid.uuid4().hex,
+            "record_type": "feeding",
+            "record_name": "Feeding",
+            "value": 99,
+            "unit": "ml",
+            "note": "",
+            "timestamp": now.isoformat(),
+            "ts": datetime_to_micros(now),
+            "tz": 0,
+        },
+    }
+    _journal(hass).write_text(
+        json_dumps({"generation": generation - 1}) + "\n" + json_dumps(stale) + "\n",
+        encoding="utf-8",
+    )
+
+    await async_reload_member(hass, config_entry)
+
+    assert _values(config_entry) == [1]
+
+
+async def test_crash_between_snapshot_and_journal_reset(
+    hass: HomeAssistant, config_entry: MockConfigEntry
+) -> None:
+    """Test the old journal is discarded after a crash following the snapshot write."""
+    await async_setup_member(hass, config_entry)
+    _log(config_entry, 1, 2)
+    storage = config_entry.runtime_data._storage
+    await storage.async_flush()
+    journal = _journal(hass).read_text(encoding="utf-8")
+
+    with (
+        patch(
+            "custom_components.ha_health_record.storage._reset_journal",
+            side_effect=OSError,
+        ),
+        pytest.raises(OSError),
+    ):
+        await storage.async_compact()
+    assert _journal(hass).read_text(encoding="utf-8") == journal
+
+    await async_reload_member(hass, config_entry)
+
+    assert _values(config_entry) == [1, 2]
+
+
+async def test_append_after_failed_journal_reset(
+    hass: HomeAssistant, config_entry: MockConfigEntry
+) -> None:
+    """Test entries logged after a failed journal reset survive a reload."""
+    await async_setup_member(hass, config_entry)
+    _log(config_entry, 1)
+    storage = config_entry.runtime_data._storage
+    await storage.async_flush()
+    with (
+        patch(
+            "custom_components.ha_health_record.storage._reset_journal",
+            side_effect=OSError,
+        ),
+        pytest.raises(OSError),
+    ):
+        await storage.async_compact()
+
+    _log(config_entry, 2)
+    await storage.async_flush()
+    await async_reload_member(hass, config_entry)
+
+    assert _values(config_entry) == [1, 2]
+
+
+async def test_append_after_torn_line_and_failed_compaction(
+    hass: HomeAssistant, config_entry: MockConfigEntry
+) -> None:
+    """Test an entry appended after a torn line is not lost with it."""
+    await async_setup_member(hass, config_entry)
+    _log(config_entry, 1)
+    await config_entry.runtime_data._storage.async_flush()
+    with _journal(hass).open("a", encoding="utf-8") as file:
+        file.write(TORN_LINE)
+
+    # The compaction on load fails, leaving the torn line in place
+    with patch.object(RecordStorage, "async_compact", AsyncMock()):
+        await async_reload_member(hass, config_entry)
+        assert _values(config_entry) == [1]
+        _log(config_entry, 2)
+        await config_entry.runtime_data._storage.async_flush()
+
+    await async_reload_member(hass, config_entry)
+
+    assert _values(config_entry) == [1, 2]
+
+
+async def test_replay_refreshes_rollups(
+    hass: HomeAssistant, config_entry: MockConfigEntry
+) -> None:
+    """Test replayed journal entries are reflected in the rollups."""
+    await async_setup_member(hass, config_entry)
+    _log(config_entry, 1)
+    await config_entry.runtime_data._storage.async_compact()
+    _log(config_entry, 2, 3)
+    await config_entry.runtime_data._storage.async_flush()
+
+    # Without the compaction on load, only the replay brings rollups up to date
+    with patch.object(RecordStorage, "async_compact", AsyncMock()):
+        await async_reload_member(hass, config_entry)
+
+    now = dt_util.now()
+    aggregates = config_entry.runtime_data.get_aggregates(
+        now - timedelta(days=1), now, "day", ["feeding"]
+    )
+    assert sum(entry["count"] for entry in aggregates) == 3
+    assert sum(entry["sum"] for entry in aggregates) == 6
+
+
+def _archive(hass: HomeAssistant, key: str) -> Path:
+    """Return the archive segment of a partition of the test member."""
+    return Path(
+        hass.config.path(".storage", f"ha_health_record_{MEMBER_ID}.{key}.json.gz")
+    )
+
+
+async def test_compaction_archives_old_months(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    hass_storage: dict[str, dict],
+    hass_ws_client: WebSocketGenerator,
+) -> None:
+    """Test months past the hot window move to segments that still read back."""
+    await async_setup_member(hass, config_entry)
+    now = dt_util.now()
+    old = now - timedelta(days=31 * (HOT_PARTITIONS + 2))
+    old_key = partition_key(datetime_to_micros(old))
+    config_entry.runtime_data.log_records(
+        [("feeding", 1, "old", old), ("feeding", 2, "", now)]
+    )
+    storage = config_entry.runtime_data._storage
+    await storage.async_compact()
+
+    assert _archive(hass, old_key).is_file()
+    assert f"ha_health_record_{MEMBER_ID}.{old_key}" not in hass_storage
+    snapshot = hass_storage[f"ha_health_record_{MEMBER_ID}"]["data"]
+    assert snapshot["partitions"][old_key]["archived"]
+    assert not snapshot["partitions"][storage.current_partition()]["archived"]
+
+    await async_reload_member(hass, config_entry)
+    coordinator = config_entry.runtime_data
+    assert not coordinator._storage.is_resident(old_key)
+    assert coordinator.record_count == 2
+    page = await coordinator.async_get_records_page(
+        old - timedelta(minutes=1), old + timedelta(minutes=1)
+    )
+    assert [(entry["value"], entry["note"]) for _, entry in page] == [(1, "old")]
+    # Loaded by the query above
+    entries = coordinator.get_records_in_range(old - timedelta(minutes=1), now)
+    assert [entry["value"] for entry in entries] == [1, 2]
+
+    client = await hass_ws_client(hass)
+    await client.send_json_auto_id(
+        {"type": "ha_health_record/export_csv", "member_id": MEMBER_ID}
+    )
+    result = (await client.receive_json())["result"]
+    assert result["record_count"] == 2
+    assert result["csv_content"].splitlines()[1].startswith(old.isoformat())
+
+
+async def test_crash_between_archive_and_snapshot(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    hass_storage: dict[str, dict],
+) -> None:
+    """Test the plain file of an archived month outlives a failed snapshot save."""
+    await async_setup_member(hass, config_entry)
+    old = dt_util.now() - timedelta(days=31 * (HOT_PARTITIONS - 1))
+    old_key = partition_key(datetime_to_micros(old))
+    config_entry.runtime_data.log_records([("feeding", 1, "", old)])
+    storage = config_entry.runtime_data._storage
+    await storage.async_compact()
+    plain = f"ha_health_record_{MEMBER_ID}.{old_key}"
+    assert plain in hass_storage
+
+    # The month has left the hot window by the next compaction
+    with (
+        patch(
+            "custom_components.ha_health_record.storage.HOT_PARTITIONS",
+            HOT_PARTITIONS - 1,
+        ),
+        patch.object(storage._store, "async_save", side_effect=OSError),
+        pytest.raises(OSError),
+    ):
+        await storage.async_compact()
+    assert _archive(hass, old_key).is_file()
+    assert plain in hass_storage
+
+    # The saved snapshot still points at the plain file
+    await async_reload_member(hass, config_entry)
+    assert config_entry.runtime_data.record_count == 1
+    assert [
+        entry["value"]
+        async for entries in config_entry.runtime_data.async_iter_entries()
+        for entry in entries
+    ] == [1]
+
+
+async def test_no_record_cap(
+    hass: HomeAssistant, config_entry: MockConfigEntry
+) -> None:
+    """Test members keep every record past the former 10,000 record cap."""
+    await async_setup_member(hass, config_entry)
+    start = dt_util.now() - timedelta(days=31 * (HOT_PARTITIONS + 1))
+    records = [
+        (
+            datetime_to_micros(timestamp := start + timedelta(minutes=number)),
+            {
+                "record_type": "feeding",
+                "record_name": "Feeding",
+                "value": number,
+                "unit": "ml",
+                "note": "",
+                "timestamp": timestamp.isoformat(),
+            },
+        )
+        for number in range(10_001)
+    ]
+    assert await config_entry.runtime_data.async_import_records(records, False) == {
+        "imported": 10_001,
+        "duplicates": 0,
+    }
+
+    await async_reload_member(hass, config_entry)
+
+    assert config_entry.runtime_data.record_count == 10_001
+    assert await config_entry.runtime_data.async_count_entries() == 10_001
+
+
+def _strip_record_times(rows) -> None:
+    """Drop ``ts``/``tz`` from records, as saved before minor version 2."""
+    for row in rows:
+        del row["ts"], row["tz"]
+
+
+async def test_minor_version_1_records_migrated(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    hass_storage: dict[str, dict],
+) -> None:
+    """Test records saved without ts/tz get them on load and written back."""
+    await hass.config.async_set_time_zone("Asia/Taipei")
+    await async_setup_member(hass, config_entry)
+    now = dt_util.now()
+    old = (now - timedelta(days=31 * (HOT_PARTITIONS + 2))).astimezone(
+        timezone(timedelta(hours=-5))
+    )
+    old_key = partition_key(datetime_to_micros(old))
+    config_entry.runtime_data.log_records(
+        [
+            ("feeding", 1, "", old),
+            ("feeding", 2, "", now - timedelta(minutes=1)),
+            ("weight", 3, "", now),
+        ]
+    )
+    storage = config_entry.runtime_data._storage
+    current_key = storage.current_partition()
+    await storage.async_compact()
+    await hass.config_entries.async_unload(config_entry.entry_id)
+
+    snapshot_key = f"ha_health_record_{MEMBER_ID}"
+    partition = f"{snapshot_key}.{current_key}"
+    snapshot = hass_storage[snapshot_key]["data"]["partitions"]
+    expected_latest = {
+        key: json.loads(json_dumps(summary["latest"]))
+        for key, summary in snapshot.items()
+    }
+    expected_rows = json.loads(json_dumps(hass_storage[partition]["data"]["records"]))
+    with gzip.open(_archive(hass, old_key), "rb") as file:
+        expected_archive = json.loads(file.read())["records"]
+    assert [(row["tz"], row["value"]) for row in expected_archive] == [(-5 * 3600, 1)]
+    assert {row["tz"] for row in expected_rows} == {8 * 3600}
+
+    # Rewrite everything as minor version 1 did
+    for key in (snapshot_key, partition):
+        hass_storage[key] = json.loads(json_dumps(hass_storage[key]))
+        hass_storage[key]["minor_version"] = 1
+    for summary in hass_storage[snapshot_key]["data"]["partitions"].values():
+        _strip_record_times(summary["latest"].values())
+    _strip_record_times(hass_storage[partition]["data"]["records"])
+    _strip_record_times(expected_archive)
+    with gzip.open(_archive(hass, old_key), "wb") as file:
+        file.write(json_dumps({"records": expected_archive}).encode())
+
+    # Loading writes the snapshot and the current month back
+    await async_setup_member(hass, config_entry)
+    assert hass_storage[snapshot_key]["minor_version"] == 2
+    assert hass_storage[partition]["minor_version"] == 2
+    assert {
+        key: summary["latest"]
+        for key, summary in hass_storage[snapshot_key]["data"]["partitions"].items()
+    } == expected_latest
+    assert hass_storage[partition]["data"]["records"] == expected_rows
+
+    # Archived months are written back by the compaction after they load
+    coordinator = config_entry.runtime_data
+    page = await coordinator.async_get_records_page(
+        old - timedelta(minutes=1), now + timedelta(minutes=1)
+    )
+    assert [(entry["value"], entry["timestamp"]) for _, entry in page] == [
+        (3, now.isoformat()),
+        (2, (now - timedelta(minutes=1)).isoformat()),
+        (1, old.isoformat()),
+    ]
+    await coordinator._storage.async_compact()
+    with gzip.open(_archive(hass, old_key), "rb") as file:
+        archive = json.loads(file.read())["records"]
+    assert [(row["ts"], row["tz"]) for row in archive] == [
+        (datetime_to_micros(old), -5 * 3600)
+    ]